@@ -0,0 +1,108 @@
+"""
+Benchmark row accumulation for the parser's output tables.
+
+Compares TableBuilder with the old ``df.loc[len(df)] = row`` pattern and
+prints the cost per appended row at each size. TableBuilder's per-row
+cost should stay flat from 1k to 500k rows (linear total cost); the
+``df.loc`` per-row cost grows with the table (quadratic total cost), so
+it is only measured up to --loc-limit rows.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_accumulators
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from parser.tables import TableBuilder
+
+
+COLUMNS = [
+    "org_id", "ein", "org_name", "year", "expense_category",
+    "total_amount", "program_services_amount",
+    "management_general_amount", "fundraising_amount",
+    "share_of_total_expenses", "program_services_share"
+]
+
+
+def make_row(i):
+    return {
+        "org_id": f"org{i % 997}_{2015 + i % 8}",
+        "ein": f"{100000000 + i % 997}",
+        "org_name": f"Org {i % 997}",
+        "year": 2015 + i % 8,
+        "expense_category": f"Category {i % 24}",
+        "total_amount": i * 7,
+        "program_services_amount": i * 5,
+        "management_general_amount": i,
+        "fundraising_amount": i,
+        "share_of_total_expenses": (i % 100) / 100,
+        "program_services_share": 5 / 7,
+    }
+
+
+def time_table_builder(rows):
+    start = time.perf_counter()
+
+    table = TableBuilder(COLUMNS)
+
+    for row in rows:
+        table.append(row)
+
+    table.to_frame()
+
+    return time.perf_counter() - start
+
+
+def time_loc_append(rows):
+    start = time.perf_counter()
+
+    df = pd.DataFrame(columns=COLUMNS)
+
+    for row in rows:
+        df.loc[len(df)] = row
+
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    arg_parser.add_argument(
+        "--sizes",
+        default="1000,10000,100000,500000",
+        help="Comma-separated row counts (default: %(default)s)"
+    )
+    arg_parser.add_argument(
+        "--loc-limit",
+        type=int,
+        default=10000,
+        help="Largest size measured with df.loc appends (default: %(default)s)"
+    )
+    args = arg_parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    print(f"{'rows':>10} {'method':>14} {'seconds':>10} {'us/row':>10}")
+
+    for size in sizes:
+        rows = [make_row(i) for i in range(size)]
+
+        seconds = time_table_builder(rows)
+        print(
+            f"{size:>10,} {'TableBuilder':>14} {seconds:>10.3f} "
+            f"{seconds / size * 1e6:>10.2f}"
+        )
+
+        if size <= args.loc_limit:
+            seconds = time_loc_append(rows)
+            print(
+                f"{size:>10,} {'df.loc':>14} {seconds:>10.3f} "
+                f"{seconds / size * 1e6:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Benchmark the parser on compressed versus uncompressed XML.
+
+Generates one synthetic corpus (see benchmarks/generate_corpus.py), writes
+a gzip, bzip2 and, when the zstandard package is installed, Zstandard
+copy of every file, then times two passes over each copy:
+
+    read     open_source and read every byte (decompression alone)
+    extract  process_xml_file: decompression, streaming parse and field
+             extraction
+
+Throughput is reported in files/sec and in uncompressed MB/sec, next to
+the size of each copy on disk.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_compression --preset typical --files 500
+"""
+
+import argparse
+import bz2
+import gzip
+import os
+import tempfile
+import time
+
+from benchmarks.generate_corpus import PRESETS, generate_corpus
+from parser.parse_990 import process_xml_file
+from parser.sources import open_source
+
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def zstd_compress(data):
+    import zstandard
+    return zstandard.ZstdCompressor(level=3).compress(data)
+
+
+# Name -> (file suffix, compress function)
+CODECS = {
+    "none": ("", None),
+    "gzip": (".gz", lambda data: gzip.compress(data, compresslevel=6)),
+    "bzip2": (".bz2", lambda data: bz2.compress(data, compresslevel=9)),
+    "zstd": (".zst", zstd_compress),
+}
+
+
+def available_codecs():
+    codecs = ["none", "gzip", "bzip2"]
+
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        print("zstandard is not installed; skipping zstd.")
+    else:
+        codecs.append("zstd")
+
+    return codecs
+
+
+def write_copies(xml_files, out_dir, codec):
+    """Compress every file into out_dir; return the new paths."""
+    suffix, compress = CODECS[codec]
+
+    if compress is None:
+        return list(xml_files)
+
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+
+    for xml_file in xml_files:
+        path = os.path.join(out_dir, os.path.basename(xml_file) + suffix)
+
+        with open(xml_file, "rb") as f:
+            data = f.read()
+
+        with open(path, "wb") as f:
+            f.write(compress(data))
+
+        paths.append(path)
+
+    return paths
+
+
+def bench_copy(paths):
+    """Time each pass over one copy; return {pass: seconds}."""
+    timings = {}
+
+    start = time.perf_counter()
+    for path in paths:
+        with open_source(path) as f:
+            while f.read(CHUNK_SIZE):
+                pass
+    timings["read"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for path in paths:
+        result = process_xml_file(path)
+
+        if result["status"] == "error":
+            raise RuntimeError(result["error"]["error"])
+    timings["extract"] = time.perf_counter() - start
+
+    return timings
+
+
+def print_report(codec, files, xml_bytes, disk_bytes, timings):
+    megabytes = xml_bytes / 1e6
+
+    print(
+        f"  {codec:<6} {disk_bytes / 1e6:>9.1f} {xml_bytes / disk_bytes:>6.1f}x "
+        f"{megabytes / timings['read']:>10.1f} "
+        f"{files / timings['extract']:>10.1f} "
+        f"{megabytes / timings['extract']:>10.2f}"
+    )
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    arg_parser.add_argument(
+        "--preset",
+        default="typical",
+        choices=sorted(PRESETS),
+        help="Corpus preset (default: %(default)s)"
+    )
+    arg_parser.add_argument(
+        "--files",
+        type=int,
+        help="Files in the corpus, overriding the preset's default"
+    )
+    arg_parser.add_argument(
+        "--work-dir",
+        help="Keep the generated corpus and its copies here "
+             "(default: a temporary folder that is removed afterwards)"
+    )
+    args = arg_parser.parse_args(argv)
+
+    sizes = dict(PRESETS[args.preset])
+
+    if args.files is not None:
+        sizes["files"] = args.files
+
+    codecs = available_codecs()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        work_dir = args.work_dir or tmp_dir
+
+        xml_files = generate_corpus(os.path.join(work_dir, "xml"), **sizes)
+        xml_bytes = sum(os.path.getsize(path) for path in xml_files)
+
+        print(
+            f"\n{args.preset}: {len(xml_files):,} files, "
+            f"{xml_bytes / 1e6:,.1f} MB uncompressed"
+        )
+        print(
+            f"  {'codec':<6} {'disk MB':>9} {'ratio':>7} "
+            f"{'read MB/s':>10} {'files/sec':>10} {'MB/sec':>10}"
+        )
+
+        for codec in codecs:
+            paths = write_copies(
+                xml_files,
+                os.path.join(work_dir, codec),
+                codec
+            )
+            disk_bytes = sum(os.path.getsize(path) for path in paths)
+
+            print_report(
+                codec,
+                len(paths),
+                xml_bytes,
+                disk_bytes,
+                bench_copy(paths)
+            )
+
+
+if __name__ == "__main__":
+    main()
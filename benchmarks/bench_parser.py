@@ -0,0 +1,240 @@
+"""
+Benchmark the Form 990 parser on synthetic corpora.
+
+For each corpus preset (see benchmarks/generate_corpus.py) this generates
+the files once, then times every stage of the pipeline separately:
+
+    read       reading the raw bytes of every file
+    parse      a bare lxml iterparse pass (no field extraction)
+    extract    process_xml_file: streaming parse, field extraction and
+               record building (includes its own parse)
+    dataframe  TableBuilder accumulation, to_frame(), the ratios and
+               financial_changes
+    csv        writing the output tables
+    html       rendering the summary cards
+
+read and parse are measured for attribution only; throughput is
+computed over extract + dataframe + csv + html, the work a serial run
+actually does. Each preset runs in a fresh process so its peak RSS is
+its own.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_parser --presets small,typical,huge
+"""
+
+import argparse
+import os
+import resource
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from lxml import etree
+
+from benchmarks.generate_corpus import PRESETS, generate_corpus
+from parser.analytics import (
+    RATIO_COLUMNS,
+    add_financial_ratios,
+    build_financial_changes,
+)
+from parser.parse_990 import (
+    EXPENSE_DETAIL_COLUMNS,
+    FINANCIAL_COLUMNS,
+    ORGS_COLUMNS,
+    PEOPLE_COLUMNS,
+    REVENUE_DETAIL_COLUMNS,
+    TOP_COMPENSATION_COLUMNS,
+    build_summary_card,
+    process_xml_file,
+    summary_detail_rows,
+)
+from parser.tables import TableBuilder
+
+
+STAGES = ["read", "parse", "extract", "dataframe", "csv", "html"]
+
+PIPELINE_STAGES = ["extract", "dataframe", "csv", "html"]
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process (Linux reports KiB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def bench_corpus(xml_files, out_dir):
+    """Time each stage over xml_files; return {stage: seconds}."""
+    timings = {}
+
+    start = time.perf_counter()
+    for xml_file in xml_files:
+        with open(xml_file, "rb") as f:
+            f.read()
+    timings["read"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for xml_file in xml_files:
+        for _, element in etree.iterparse(xml_file, recover=True):
+            element.clear()
+    timings["parse"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = [process_xml_file(xml_file) for xml_file in xml_files]
+    timings["extract"] = time.perf_counter() - start
+
+    processed = [
+        result for result in results
+        if result["status"] == "processed"
+    ]
+
+    start = time.perf_counter()
+
+    tables = {
+        "orgs": TableBuilder(ORGS_COLUMNS),
+        "financial": TableBuilder(FINANCIAL_COLUMNS),
+        "people": TableBuilder(PEOPLE_COLUMNS),
+        "top_compensation": TableBuilder(TOP_COMPENSATION_COLUMNS),
+        "expense_detail": TableBuilder(EXPENSE_DETAIL_COLUMNS),
+        "revenue_detail": TableBuilder(REVENUE_DETAIL_COLUMNS),
+    }
+
+    for result in processed:
+        tables["orgs"].append(result["org"])
+        tables["financial"].append(result["financial"])
+        tables["people"].extend(result["people"])
+        tables["top_compensation"].extend(result["top_compensation"])
+        tables["expense_detail"].extend(result["expense_detail"])
+        tables["revenue_detail"].extend(result["revenue_detail"])
+
+    frames = {name: table.to_frame() for name, table in tables.items()}
+    frames["financial"] = add_financial_ratios(frames["financial"])
+    frames["financial_changes"] = build_financial_changes(frames["financial"])
+
+    timings["dataframe"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for name, frame in frames.items():
+        frame.to_csv(os.path.join(out_dir, f"{name}.csv"), index=False)
+    timings["csv"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+
+    ratio_rows = frames["financial"][RATIO_COLUMNS].to_dict("records")
+    cards = [
+        build_summary_card(
+            result["org"],
+            {**result["financial"], **ratios},
+            summary_detail_rows(
+                result["revenue_detail"],
+                result["expense_detail"],
+                result["top_compensation"]
+            )
+        )
+        for result, ratios in zip(processed, ratio_rows)
+    ]
+
+    with open(os.path.join(out_dir, "summary.html"), "w", encoding="utf-8") as f:
+        f.write("".join(cards))
+
+    timings["html"] = time.perf_counter() - start
+
+    return timings
+
+
+def run_preset(preset, files, work_dir):
+    """Generate and benchmark one preset; runs in its own process."""
+    sizes = dict(PRESETS[preset])
+
+    if files is not None:
+        sizes["files"] = files
+
+    xml_dir = os.path.join(work_dir, preset, "xml")
+    out_dir = os.path.join(work_dir, preset, "results")
+    os.makedirs(out_dir, exist_ok=True)
+
+    xml_files = generate_corpus(xml_dir, **sizes)
+    total_bytes = sum(os.path.getsize(path) for path in xml_files)
+
+    timings = bench_corpus(xml_files, out_dir)
+
+    return {
+        "preset": preset,
+        "files": len(xml_files),
+        "bytes": total_bytes,
+        "timings": timings,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def print_report(report):
+    files = report["files"]
+    megabytes = report["bytes"] / 1e6
+    timings = report["timings"]
+    pipeline = sum(timings[stage] for stage in PIPELINE_STAGES)
+
+    print(
+        f"\n{report['preset']}: {files:,} files, {megabytes:,.1f} MB, "
+        f"peak RSS {report['peak_rss_mb']:,.0f} MB"
+    )
+    print(
+        f"  {files / pipeline:,.1f} files/sec, "
+        f"{megabytes / pipeline:,.2f} MB/sec "
+        f"({pipeline:.3f} s end to end)"
+    )
+    print(f"  {'stage':<10} {'seconds':>10} {'ms/file':>10} {'share':>7}")
+
+    for stage in STAGES:
+        seconds = timings[stage]
+        share = (
+            f"{seconds / pipeline:>6.1%}"
+            if stage in PIPELINE_STAGES
+            else f"{'-':>6}"
+        )
+        print(
+            f"  {stage:<10} {seconds:>10.3f} "
+            f"{seconds / files * 1000:>10.2f} {share:>7}"
+        )
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    arg_parser.add_argument(
+        "--presets",
+        default="small,typical,huge",
+        help="Comma-separated corpus presets (default: %(default)s)"
+    )
+    arg_parser.add_argument(
+        "--files",
+        type=int,
+        help="Files per corpus, overriding each preset's default"
+    )
+    arg_parser.add_argument(
+        "--work-dir",
+        help="Keep the generated corpora and outputs here "
+             "(default: a temporary folder that is removed afterwards)"
+    )
+    args = arg_parser.parse_args(argv)
+
+    presets = args.presets.split(",")
+
+    for preset in presets:
+        if preset not in PRESETS:
+            arg_parser.error(f"unknown preset: {preset}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        work_dir = args.work_dir or tmp_dir
+
+        for preset in presets:
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                report = executor.submit(
+                    run_preset,
+                    preset,
+                    args.files,
+                    work_dir
+                ).result()
+
+            print_report(report)
+
+
+if __name__ == "__main__":
+    main()
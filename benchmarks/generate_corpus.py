@@ -0,0 +1,367 @@
+"""
+Write a synthetic corpus of Form 990 XML filings.
+
+Every file is a well-formed IRS e-file ``Return`` in the efile namespace,
+with the header, Part I summary amounts, Part VII people, Part VIII
+program service revenue, Part IX functional expenses and a configurable
+number of schedules. Values come from a seeded random generator, so the
+same arguments always produce byte-identical files.
+
+Presets size the filings like the corpora the parser sees in practice:
+
+    small    a few people and expense lines, one short schedule
+    typical  a mid-size charity with the usual schedules
+    huge     a hospital or university system: thousands of Part VII
+             people and very long schedules
+
+Run from the repository root:
+
+    python -m benchmarks.generate_corpus /tmp/corpus --preset typical
+"""
+
+import argparse
+import os
+import random
+
+
+PRESETS = {
+    "small": {
+        "files": 500,
+        "people": 5,
+        "expense_groups": 8,
+        "program_revenue": 2,
+        "schedules": 1,
+        "schedule_rows": 5,
+    },
+    "typical": {
+        "files": 200,
+        "people": 25,
+        "expense_groups": 20,
+        "program_revenue": 6,
+        "schedules": 4,
+        "schedule_rows": 40,
+    },
+    "huge": {
+        "files": 10,
+        "people": 1500,
+        "expense_groups": 24,
+        "program_revenue": 300,
+        "schedules": 8,
+        "schedule_rows": 5000,
+    },
+}
+
+# Part IX line items, in form order
+EXPENSE_GROUPS = [
+    "GrantsToDomesticOrgsGrp",
+    "GrantsToDomesticIndividualsGrp",
+    "ForeignGrantsGrp",
+    "BenefitsToMembersGrp",
+    "CompCurrentOfcrDirectorsGrp",
+    "CompDisqualPersonsGrp",
+    "OtherSalariesAndWagesGrp",
+    "PensionPlanContributionsGrp",
+    "OtherEmployeeBenefitsGrp",
+    "PayrollTaxesGrp",
+    "FeesForServicesManagementGrp",
+    "FeesForServicesLegalGrp",
+    "FeesForServicesAccountingGrp",
+    "FeesForServicesLobbyingGrp",
+    "FeesForServicesProfFundraising",
+    "FeesForSrvcInvstMgmntFeesGrp",
+    "FeesForServicesOtherGrp",
+    "AdvertisingGrp",
+    "OfficeExpensesGrp",
+    "InformationTechnologyGrp",
+    "RoyaltiesGrp",
+    "OccupancyGrp",
+    "TravelGrp",
+    "ConferencesMeetingsGrp",
+    "InterestGrp",
+    "DepreciationDepletionGrp",
+    "InsuranceGrp",
+]
+
+SCHEDULES = [
+    "IRS990ScheduleA",
+    "IRS990ScheduleB",
+    "IRS990ScheduleD",
+    "IRS990ScheduleJ",
+    "IRS990ScheduleL",
+    "IRS990ScheduleM",
+    "IRS990ScheduleO",
+    "IRS990ScheduleR",
+]
+
+TITLES = [
+    "PRESIDENT", "TREASURER", "SECRETARY", "DIRECTOR", "TRUSTEE",
+    "CHIEF EXECUTIVE OFFICER", "CHIEF FINANCIAL OFFICER", "VP OPERATIONS",
+]
+
+PROGRAMS = [
+    "PATIENT SERVICES", "TUITION AND FEES", "MEMBERSHIP DUES",
+    "PROGRAM FEES", "CONTRACT SERVICES", "RESEARCH GRANTS",
+]
+
+
+def person_xml(rng, k):
+    role = (
+        "<IndividualTrusteeOrDirectorInd>X</IndividualTrusteeOrDirectorInd>"
+        if k % 3
+        else "<OfficerInd>X</OfficerInd>"
+    )
+    comp = rng.choice([0, 0, 0, rng.randint(40000, 900000)])
+
+    return (
+        "<Form990PartVIISectionAGrp>"
+        f"<PersonNm>PERSON {k} {rng.randint(1000, 9999)}</PersonNm>"
+        f"<TitleTxt>{rng.choice(TITLES)}</TitleTxt>"
+        f"<AverageHoursPerWeekRt>{rng.choice(['1.00', '5.00', '40.00'])}"
+        "</AverageHoursPerWeekRt>"
+        f"{role}"
+        f"<ReportableCompFromOrgAmt>{comp}</ReportableCompFromOrgAmt>"
+        f"<ReportableCompFromRltdOrgAmt>{comp // 10}"
+        "</ReportableCompFromRltdOrgAmt>"
+        f"<OtherCompensationAmt>{comp // 20}</OtherCompensationAmt>"
+        "</Form990PartVIISectionAGrp>"
+    )
+
+
+def program_revenue_xml(rng, k):
+    return (
+        "<ProgramServiceRevenueGrp>"
+        f"<Desc>{PROGRAMS[k % len(PROGRAMS)]} {k}</Desc>"
+        f"<BusinessCd>{900000 + k % 99}</BusinessCd>"
+        f"<TotalRevenueColumnAmt>{rng.randint(1000, 5000000)}"
+        "</TotalRevenueColumnAmt>"
+        f"<RelatedOrExemptFuncIncomeAmt>{rng.randint(1000, 5000000)}"
+        "</RelatedOrExemptFuncIncomeAmt>"
+        "</ProgramServiceRevenueGrp>"
+    )
+
+
+def expense_group_xml(rng, tag):
+    program = rng.randint(0, 2000000)
+    management = rng.randint(0, 500000)
+    fundraising = rng.randint(0, 100000)
+
+    return (
+        f"<{tag}>"
+        f"<TotalAmt>{program + management + fundraising}</TotalAmt>"
+        f"<ProgramServicesAmt>{program}</ProgramServicesAmt>"
+        f"<ManagementAndGeneralAmt>{management}</ManagementAndGeneralAmt>"
+        f"<FundraisingAmt>{fundraising}</FundraisingAmt>"
+        f"</{tag}>"
+    )
+
+
+def schedule_xml(rng, name, rows):
+    """A schedule document whose size grows with ``rows``."""
+    lines = "".join(
+        "<SupplementalInformationDetail>"
+        f"<FormAndLineReferenceDesc>PART {k % 12} LINE {k % 30}"
+        "</FormAndLineReferenceDesc>"
+        "<ExplanationTxt>"
+        + " ".join(
+            rng.choice(["THE", "ORGANIZATION", "BOARD", "REVIEWED",
+                        "POLICY", "ANNUALLY", "AND", "APPROVED"])
+            for _ in range(24)
+        )
+        + "</ExplanationTxt>"
+        "</SupplementalInformationDetail>"
+        for k in range(rows)
+    )
+
+    return f'<{name} documentId="{name}">{lines}</{name}>'
+
+
+def filing_xml(
+    index,
+    orgs,
+    people,
+    expense_groups,
+    program_revenue,
+    schedules,
+    schedule_rows,
+    seed
+):
+    """Return the XML text of one synthetic filing."""
+    rng = random.Random(seed * 1000003 + index)
+
+    ein = 200000000 + index % orgs
+    year = 2016 + (index // orgs) % 8
+
+    revenue = rng.randint(100000, 900000000)
+    expenses = rng.randint(100000, 900000000)
+
+    people_xml = "".join(person_xml(rng, k) for k in range(people))
+
+    revenue_xml = "".join(
+        program_revenue_xml(rng, k) for k in range(program_revenue)
+    )
+
+    expenses_xml = "".join(
+        expense_group_xml(rng, EXPENSE_GROUPS[k % len(EXPENSE_GROUPS)])
+        for k in range(min(expense_groups, len(EXPENSE_GROUPS)))
+    )
+    expenses_xml += "".join(
+        "<OtherExpensesGrp>"
+        f"<Desc>OTHER EXPENSE {k}</Desc>"
+        f"<TotalAmt>{rng.randint(0, 90000)}</TotalAmt>"
+        f"<ProgramServicesAmt>{rng.randint(0, 9000)}</ProgramServicesAmt>"
+        "</OtherExpensesGrp>"
+        for k in range(max(expense_groups - len(EXPENSE_GROUPS), 0))
+    )
+
+    schedules_xml = "".join(
+        schedule_xml(rng, SCHEDULES[k % len(SCHEDULES)], schedule_rows)
+        for k in range(schedules)
+    )
+
+    return f"""<?xml version="1.0" encoding="utf-8"?>
+<Return xmlns="http://www.irs.gov/efile" returnVersion="2021v4.2">
+  <ReturnHeader binaryAttachmentCnt="0">
+    <ReturnTs>{year + 1}-05-11T10:00:00-05:00</ReturnTs>
+    <TaxPeriodEndDt>{year}-12-31</TaxPeriodEndDt>
+    <ReturnTypeCd>990</ReturnTypeCd>
+    <TaxPeriodBeginDt>{year}-01-01</TaxPeriodBeginDt>
+    <Filer>
+      <EIN>{ein}</EIN>
+      <BusinessName>
+        <BusinessNameLine1Txt>SYNTHETIC ORGANIZATION {ein}</BusinessNameLine1Txt>
+      </BusinessName>
+      <BusinessNameControlTxt>SYNT</BusinessNameControlTxt>
+      <USAddress>
+        <AddressLine1Txt>{index % 900 + 1} MAIN STREET</AddressLine1Txt>
+        <CityNm>SPRINGFIELD</CityNm>
+        <StateAbbreviationCd>IL</StateAbbreviationCd>
+        <ZIPCd>62701</ZIPCd>
+      </USAddress>
+    </Filer>
+    <TaxYr>{year}</TaxYr>
+  </ReturnHeader>
+  <ReturnData documentCnt="{schedules + 1}">
+    <IRS990 documentId="IRS990">
+      <VotingMembersGoverningBodyCnt>{rng.randint(3, 40)}</VotingMembersGoverningBodyCnt>
+      <TotalEmployeeCnt>{rng.randint(0, 20000)}</TotalEmployeeCnt>
+      <CYContributionsGrantsAmt>{revenue // 4}</CYContributionsGrantsAmt>
+      <CYProgramServiceRevenueAmt>{revenue // 2}</CYProgramServiceRevenueAmt>
+      <CYInvestmentIncomeAmt>{revenue // 8}</CYInvestmentIncomeAmt>
+      <CYOtherRevenueAmt>{revenue - revenue // 4 - revenue // 2 - revenue // 8}</CYOtherRevenueAmt>
+      <CYTotalRevenueAmt>{revenue}</CYTotalRevenueAmt>
+      <CYSalariesCompEmpBnftPaidAmt>{expenses // 2}</CYSalariesCompEmpBnftPaidAmt>
+      <CYTotalExpensesAmt>{expenses}</CYTotalExpensesAmt>
+      <CYRevenuesLessExpensesAmt>{revenue - expenses}</CYRevenuesLessExpensesAmt>
+      <TotalLiabilitiesEOYAmt>{rng.randint(0, 500000000)}</TotalLiabilitiesEOYAmt>
+      <NetAssetsOrFundBalancesEOYAmt>{rng.randint(0, 900000000)}</NetAssetsOrFundBalancesEOYAmt>
+      {people_xml}
+      {revenue_xml}
+      <TotalProgramServiceExpensesAmt>{expenses * 3 // 4}</TotalProgramServiceExpensesAmt>
+      {expenses_xml}
+      <TotalFunctionalExpensesGrp>
+        <TotalAmt>{expenses}</TotalAmt>
+        <ProgramServicesAmt>{expenses * 3 // 4}</ProgramServicesAmt>
+      </TotalFunctionalExpensesGrp>
+      <NoDonorRestrictionNetAssetsGrp>
+        <BOYAmt>{rng.randint(0, 500000000)}</BOYAmt>
+        <EOYAmt>{rng.randint(0, 500000000)}</EOYAmt>
+      </NoDonorRestrictionNetAssetsGrp>
+    </IRS990>
+    {schedules_xml}
+  </ReturnData>
+</Return>
+"""
+
+
+def generate_corpus(
+    out_dir,
+    files,
+    people,
+    expense_groups,
+    program_revenue,
+    schedules,
+    schedule_rows,
+    orgs=None,
+    seed=990
+):
+    """
+    Write ``files`` filings into out_dir and return their paths.
+
+    Filings are spread over ``orgs`` organizations (default: one per
+    eight files) and eight consecutive tax years, so multi-year outputs
+    such as financial_changes.csv have work to do.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+
+    if orgs is None:
+        orgs = max(files // 8, 1)
+
+    paths = []
+
+    for index in range(files):
+        path = os.path.join(out_dir, f"{index:07d}_public.xml")
+
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(
+                filing_xml(
+                    index,
+                    orgs,
+                    people,
+                    expense_groups,
+                    program_revenue,
+                    schedules,
+                    schedule_rows,
+                    seed
+                )
+            )
+
+        paths.append(path)
+
+    return paths
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    arg_parser.add_argument("out_dir", help="Folder to write the XML files to")
+    arg_parser.add_argument(
+        "--preset",
+        choices=sorted(PRESETS),
+        default="typical",
+        help="Starting sizes for every option below (default: %(default)s)"
+    )
+
+    for option in PRESETS["typical"]:
+        arg_parser.add_argument(
+            "--" + option.replace("_", "-"),
+            type=int,
+            help=f"Override the preset's {option}"
+        )
+
+    arg_parser.add_argument("--orgs", type=int, help="Distinct organizations")
+    arg_parser.add_argument("--seed", type=int, default=990)
+    args = arg_parser.parse_args(argv)
+
+    sizes = dict(PRESETS[args.preset])
+
+    for option in sizes:
+        value = getattr(args, option)
+        if value is not None:
+            sizes[option] = value
+
+    paths = generate_corpus(
+        args.out_dir,
+        orgs=args.orgs,
+        seed=args.seed,
+        **sizes
+    )
+
+    total_bytes = sum(os.path.getsize(path) for path in paths)
+
+    print(
+        f"Wrote {len(paths):,} files ({total_bytes / 1e6:,.1f} MB) "
+        f"to {args.out_dir}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,21 @@
 import tkinter as tk
-from tkinter import filedialog, scrolledtext
+from tkinter import filedialog, scrolledtext, ttk
+import queue
 import threading
 import os
 
+# Standard library only, so importing them keeps startup fast
+from parser.control import RunCancelled, RunControl
+from parser.progress import ProgressMeter
+from parser.sources import is_xml
+
+
+# The parser thread only puts messages and progress events on a queue;
+# the Tk thread drains it every LOG_POLL_MS and writes each batch to the
+# log in one insert. The log keeps the last MAX_LOG_LINES lines.
+LOG_POLL_MS = 100
+
+MAX_LOG_LINES = 2000
 
 
 class GUI:
@@ -16,7 +29,7 @@ class GUI:
         )
 
         master.geometry(
-            "700x550"
+            "700x660"
         )
 
         master.resizable(
@@ -78,7 +91,71 @@ class GUI:
         )
 
         self.btn_run.pack(
-            pady=(5, 15)
+            pady=5
+        )
+
+        # -----------------------------------------------------
+        # Pause / cancel a running parser
+        # -----------------------------------------------------
+
+        run_controls = tk.Frame(
+            container
+        )
+
+        run_controls.pack(
+            pady=(0, 15)
+        )
+
+        self.btn_pause = tk.Button(
+            run_controls,
+            text="Pause",
+            width=10,
+            state="disabled",
+            command=self.toggle_pause
+        )
+
+        self.btn_pause.pack(
+            side="left",
+            padx=5
+        )
+
+        self.btn_cancel = tk.Button(
+            run_controls,
+            text="Cancel",
+            width=10,
+            state="disabled",
+            command=self.cancel_run
+        )
+
+        self.btn_cancel.pack(
+            side="left",
+            padx=5
+        )
+
+        # -----------------------------------------------------
+        # Progress bar and throughput
+        # -----------------------------------------------------
+
+        self.progress = ttk.Progressbar(
+            container,
+            orient="horizontal",
+            mode="determinate",
+            maximum=1.0
+        )
+
+        self.progress.pack(
+            fill="x"
+        )
+
+        self.progress_label = tk.Label(
+            container,
+            text="",
+            anchor="w"
+        )
+
+        self.progress_label.pack(
+            fill="x",
+            pady=(2, 10)
         )
 
         # -----------------------------------------------------
@@ -105,6 +182,21 @@ class GUI:
 
         self.results_dir = ""
 
+        self.control = None
+
+        # -----------------------------------------------------
+        # Message queue, drained on a timer
+        # -----------------------------------------------------
+
+        self.messages = queue.Queue()
+
+        self.meter = ProgressMeter()
+
+        self.master.after(
+            LOG_POLL_MS,
+            self.drain_messages
+        )
+
     # =========================================================
     # Select XML source folder
     # =========================================================
@@ -139,8 +231,8 @@ class GUI:
                         os.path.isfile(
                             full_path
                         )
-                        and filename.lower().endswith(
-                            ".xml"
+                        and is_xml(
+                            filename
                         )
                     ):
                         xml_count += 1
@@ -229,6 +321,21 @@ class GUI:
             state="disabled"
         )
 
+        # -----------------------------------------------------
+        # Enable pause / cancel for this run
+        # -----------------------------------------------------
+
+        self.control = RunControl()
+
+        self.btn_pause.config(
+            text="Pause",
+            state="normal"
+        )
+
+        self.btn_cancel.config(
+            state="normal"
+        )
+
         # -----------------------------------------------------
         # Start parser in background
         # -----------------------------------------------------
@@ -284,7 +391,10 @@ class GUI:
             outputs = run_990_parser(
                 xml_dir=self.xml_dir,
                 results_dir=self.results_dir,
-                progress_callback=self.log_message
+                progress_callback=self.log_message,
+                event_callback=self.progress_event,
+                control=self.control,
+                checkpoint=True
             )
 
             self.log_message(
@@ -309,6 +419,17 @@ class GUI:
                     f"{key}: {value}"
                 )
 
+        except RunCancelled:
+
+            self.log_message(
+                ""
+            )
+
+            self.log_message(
+                "Parser cancelled. Run it again with the same folders "
+                "to resume where it stopped."
+            )
+
         except Exception as e:
 
             self.log_message(
@@ -342,12 +463,75 @@ class GUI:
                 self.enable_buttons
             )
 
+    # =========================================================
+    # Pause / resume and cancel
+    # =========================================================
+
+    def toggle_pause(self):
+
+        if self.control is None:
+            return
+
+        if self.control.paused:
+
+            self.control.resume()
+
+            self.btn_pause.config(
+                text="Pause"
+            )
+
+            self.log_message(
+                "Resumed."
+            )
+
+        else:
+
+            self.control.pause()
+
+            self.btn_pause.config(
+                text="Resume"
+            )
+
+            self.log_message(
+                "Paused after the current file(s)."
+            )
+
+    def cancel_run(self):
+
+        if self.control is None:
+            return
+
+        self.control.cancel()
+
+        self.btn_pause.config(
+            state="disabled"
+        )
+
+        self.btn_cancel.config(
+            state="disabled"
+        )
+
+        self.log_message(
+            "Cancelling after the current file(s)..."
+        )
+
     # =========================================================
     # Re-enable GUI buttons
     # =========================================================
 
     def enable_buttons(self):
 
+        self.control = None
+
+        self.btn_pause.config(
+            text="Pause",
+            state="disabled"
+        )
+
+        self.btn_cancel.config(
+            state="disabled"
+        )
+
         self.btn_browse.config(
             state="normal"
         )
@@ -361,7 +545,7 @@ class GUI:
         )
 
     # =========================================================
-    # Thread-safe logging
+    # Thread-safe logging and progress
     # =========================================================
 
     def log_message(
@@ -369,10 +553,52 @@ class GUI:
         message
     ):
 
+        self.messages.put(
+            ("log", message)
+        )
+
+    def progress_event(
+        self,
+        event
+    ):
+
+        self.messages.put(
+            ("progress", event)
+        )
+
+    # =========================================================
+    # Drain queued messages (Tk thread)
+    # =========================================================
+
+    def drain_messages(self):
+
+        lines = []
+        progressed = False
+
+        while True:
+
+            try:
+                kind, item = self.messages.get_nowait()
+            except queue.Empty:
+                break
+
+            if kind == "log":
+                lines.append(item)
+            else:
+                self.meter.update(item)
+                progressed = True
+
+        if lines:
+            self._update_log(
+                lines
+            )
+
+        if progressed:
+            self._update_progress()
+
         self.master.after(
-            0,
-            self._update_log,
-            message
+            LOG_POLL_MS,
+            self.drain_messages
         )
 
     # =========================================================
@@ -381,18 +607,37 @@ class GUI:
 
     def _update_log(
         self,
-        message
+        lines
     ):
 
+        # A long backlog would be inserted only to be deleted again;
+        # messages may span lines, so trim by line, not by message
+        lines = "\n".join(lines).split("\n")[-MAX_LOG_LINES:]
+
         self.log.configure(
             state="normal"
         )
 
         self.log.insert(
             tk.END,
-            message + "\n"
+            "\n".join(lines) + "\n"
         )
 
+        # Keep only the last MAX_LOG_LINES lines; the text always
+        # ends with an empty line after the final newline
+        excess = (
+            int(self.log.index("end-1c").split(".")[0])
+            - 1
+            - MAX_LOG_LINES
+        )
+
+        if excess > 0:
+
+            self.log.delete(
+                "1.0",
+                f"{excess + 1}.0"
+            )
+
         self.log.see(
             tk.END
         )
@@ -401,6 +646,18 @@ class GUI:
             state="disabled"
         )
 
+    # =========================================================
+    # Update progress bar
+    # =========================================================
+
+    def _update_progress(self):
+
+        self.progress["value"] = self.meter.fraction()
+
+        self.progress_label.config(
+            text=self.meter.status_line()
+        )
+
 
 # =============================================================
 # Start application
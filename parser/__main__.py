@@ -0,0 +1,389 @@
+"""
+Parse Form 990 filings from the command line.
+
+A headless entry point around run_990_parser for cron jobs and batch
+servers. Progress messages go to stderr (or nowhere with --quiet), the
+browser is left closed with --no-open, and one JSON summary of the run is
+printed to stdout:
+
+    {"status": "ok", "exit_code": 0, "files": 120, "processed": 118,
+     "skipped": 1, "errors": 1, "elapsed_seconds": 4.2,
+     "results_dir": "/data/results", "outputs": {...}}
+
+Exit codes:
+
+    0    every file was parsed or skipped
+    1    the run completed, but some files could not be parsed
+         (see processing_errors.csv)
+    2    bad arguments, a missing optional package (such as pyarrow
+         for --format parquet), or no XML files in the sources; found
+         before anything is parsed or written
+    3    the run failed
+    130  the run was interrupted (Ctrl-C or SIGTERM); with --checkpoint
+         the next run resumes where it stopped
+
+Run from the repository root:
+
+    python -m parser data/xml --output results --workers 8 --no-open
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import signal
+import sys
+import time
+
+from parser.analytics import DEFAULT_CHANGE_WINDOWS, validate_change_windows
+from parser.cache import DEFAULT_MAX_BYTES as DEFAULT_CACHE_MAX_BYTES
+from parser.checkpoint import DEFAULT_CHECKPOINT_EVERY
+from parser.control import RunCancelled, RunControl
+from parser.index import select_filenames, validate_selection
+from parser.outputs import OUTPUT_FORMATS, validate_output_format
+from parser.parse_990 import run_990_parser
+from parser.sources import find_sources
+from parser.streaming import DEFAULT_CHUNK_ROWS
+
+
+EXIT_OK = 0
+EXIT_FILE_ERRORS = 1
+EXIT_USAGE = 2
+EXIT_FAILED = 3
+EXIT_INTERRUPTED = 130
+
+
+def change_windows(text):
+    """"overall,year_to_year,3" -> ("overall", "year_to_year", 3)."""
+    return tuple(
+        int(window) if window.isdigit() else window
+        for window in (part.strip() for part in text.split(","))
+        if window
+    )
+
+
+def build_arg_parser():
+    arg_parser = argparse.ArgumentParser(
+        prog="python -m parser",
+        description=__doc__.split("\n")[1]
+    )
+    arg_parser.add_argument(
+        "sources",
+        nargs="+",
+        help="Folders, ZIP archives or XML files to parse"
+    )
+    arg_parser.add_argument(
+        "-o", "--output",
+        required=True,
+        help="Results folder"
+    )
+    arg_parser.add_argument(
+        "--format",
+        default="csv",
+        choices=OUTPUT_FORMATS,
+        help="Output format of the tables (default: %(default)s)"
+    )
+    arg_parser.add_argument(
+        "--partition-by-year",
+        action="store_true",
+        help="With parquet or arrow, write one partition per tax year"
+    )
+    arg_parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Keep memory bounded on very large corpora (CSV only)"
+    )
+    arg_parser.add_argument(
+        "--chunk-rows",
+        type=int,
+        default=DEFAULT_CHUNK_ROWS,
+        help="With --streaming, rows each table buffers before spilling "
+             "them to disk (default: %d)" % DEFAULT_CHUNK_ROWS
+    )
+    arg_parser.add_argument(
+        "--html-pages",
+        action="store_true",
+        help="Write one summary page per organization"
+    )
+    arg_parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Parser processes; 0 uses every CPU core (default: %(default)s)"
+    )
+    arg_parser.add_argument(
+        "--cache-dir",
+        help="Parse cache folder, reused across runs"
+    )
+    arg_parser.add_argument(
+        "--cache-max-bytes",
+        type=int,
+        default=DEFAULT_CACHE_MAX_BYTES,
+        help="Size cap of the parse cache in bytes (default: %(default)s)"
+    )
+    arg_parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Parse only new or changed files since the last run"
+    )
+    arg_parser.add_argument(
+        "--change-windows",
+        type=change_windows,
+        default=DEFAULT_CHANGE_WINDOWS,
+        help="Comma-separated financial change windows: overall, "
+             "year_to_year, cagr or a number of years "
+             "(default: %s)" % ",".join(DEFAULT_CHANGE_WINDOWS)
+    )
+    arg_parser.add_argument(
+        "--index",
+        help="IRS e-file index (CSV or JSON) to select filings from"
+    )
+    arg_parser.add_argument(
+        "--ein",
+        action="append",
+        help="EIN to select from the index; may be repeated"
+    )
+    arg_parser.add_argument(
+        "--tax-year",
+        type=int,
+        action="append",
+        help="Tax year to select from the index; may be repeated"
+    )
+    arg_parser.add_argument(
+        "--return-type",
+        action="append",
+        help="Return type to select from the index; may be repeated"
+    )
+    arg_parser.add_argument(
+        "--checkpoint",
+        action="store_true",
+        help="Checkpoint parsed files and resume an interrupted run"
+    )
+    arg_parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=DEFAULT_CHECKPOINT_EVERY,
+        help="Parsed files between checkpoints (default: %(default)s)"
+    )
+    arg_parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Write run_profile.json with per-stage timings"
+    )
+    arg_parser.add_argument(
+        "--no-open",
+        action="store_true",
+        help="Do not open summary.html in a browser"
+    )
+    arg_parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Do not print progress messages to stderr"
+    )
+    arg_parser.add_argument(
+        "--summary-file",
+        help="Also write the JSON summary to this file"
+    )
+    return arg_parser
+
+
+class RunTotals:
+    """File counts of a run, taken from its progress events."""
+
+    def __init__(self):
+        self.files = 0
+        self.processed = 0
+        self.skipped = 0
+        self.errors = 0
+
+    def __call__(self, event):
+        if event["event"] == "start":
+            self.files = event["total_files"]
+
+        # Counted per file so that an interrupted run reports them too
+        elif event["event"] == "file":
+            if event["status"] == "processed":
+                self.processed += 1
+            elif event["status"] == "skipped":
+                self.skipped += 1
+            else:
+                self.errors += 1
+
+        # Includes the files an incremental run did not parse again
+        elif event["event"] == "finish":
+            self.processed = event["processed"]
+            self.skipped = event["skipped"]
+            self.errors = event["errors"]
+
+
+@contextlib.contextmanager
+def cancel_on_sigterm(control):
+    """Stop the run between files when the process receives SIGTERM."""
+    try:
+        previous = signal.signal(
+            signal.SIGTERM,
+            lambda signum, frame: control.cancel()
+        )
+    except ValueError:
+        # Not the main thread; leave signals alone
+        yield
+        return
+
+    try:
+        yield
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+
+
+def validate_arguments(args):
+    """
+    Check the arguments before the run starts.
+
+    Raises ValueError, or ImportError when the output format needs a
+    package that is not installed.
+    """
+    if args.workers < 0:
+        raise ValueError("--workers must be 0 or more.")
+
+    if args.checkpoint_every < 1:
+        raise ValueError("--checkpoint-every must be at least 1.")
+
+    if args.cache_max_bytes < 0:
+        raise ValueError("--cache-max-bytes must be 0 or more.")
+
+    if args.streaming and args.format != "csv":
+        raise ValueError("--streaming writes CSV output only.")
+
+    if args.streaming and args.incremental:
+        raise ValueError("--streaming cannot be combined with --incremental.")
+
+    if args.chunk_rows < 1:
+        raise ValueError("--chunk-rows must be at least 1.")
+
+    validate_change_windows(args.change_windows)
+    validate_output_format(args.format, args.partition_by_year)
+    validate_selection(args.index, args.ein, args.tax_year, args.return_type)
+
+    # Only the selected files are listed, as run_990_parser lists them
+    selected = None
+
+    if args.index is not None:
+        selected, _ = select_filenames(
+            args.index,
+            eins=args.ein,
+            tax_years=args.tax_year,
+            return_types=args.return_type
+        )
+
+    if not find_sources(args.sources, selected):
+        raise ValueError(
+            "No XML files were found in the sources."
+            if selected is None
+            else "None of the filings selected from the index were found "
+                 "in the sources."
+        )
+
+
+def write_summary(summary, summary_file=None):
+    text = json.dumps(summary, indent=2)
+
+    if summary_file:
+        with open(summary_file, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+    print(text)
+
+
+def run(args, totals, control):
+    """Run the parser; return (status, exit code, message, outputs)."""
+    if args.quiet:
+        messages = open(os.devnull, "w")
+    else:
+        messages = sys.stderr
+
+    try:
+        with contextlib.redirect_stdout(messages), cancel_on_sigterm(control):
+            outputs = run_990_parser(
+                args.sources,
+                args.output,
+                workers=args.workers or None,
+                cache_dir=args.cache_dir,
+                cache_max_bytes=args.cache_max_bytes,
+                incremental=args.incremental,
+                change_windows=args.change_windows,
+                profile=args.profile,
+                output_format=args.format,
+                partition_by_year=args.partition_by_year,
+                streaming=args.streaming,
+                chunk_rows=args.chunk_rows,
+                html_pages=args.html_pages,
+                index_file=args.index,
+                eins=args.ein,
+                tax_years=args.tax_year,
+                return_types=args.return_type,
+                event_callback=totals,
+                control=control,
+                checkpoint=args.checkpoint,
+                checkpoint_every=args.checkpoint_every,
+                open_browser=not args.no_open
+            )
+
+    except (RunCancelled, KeyboardInterrupt):
+        return "interrupted", EXIT_INTERRUPTED, None, {}
+
+    # Anything raised once the arguments are checked is a failed run
+    except Exception as e:
+        return "failed", EXIT_FAILED, repr(e), {}
+
+    finally:
+        if args.quiet:
+            messages.close()
+
+    if totals.errors:
+        return "file_errors", EXIT_FILE_ERRORS, None, outputs
+
+    return "ok", EXIT_OK, None, outputs
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+
+    totals = RunTotals()
+    control = RunControl()
+    outputs = {}
+    start = time.perf_counter()
+
+    try:
+        validate_arguments(args)
+
+    except (ValueError, ImportError) as e:
+        status, exit_code, message = "invalid_arguments", EXIT_USAGE, str(e)
+
+    else:
+        status, exit_code, message, outputs = run(args, totals, control)
+
+    summary = {
+        "status": status,
+        "exit_code": exit_code,
+        "files": totals.files,
+        "processed": totals.processed,
+        "skipped": totals.skipped,
+        "errors": totals.errors,
+        "elapsed_seconds": round(time.perf_counter() - start, 3),
+        "results_dir": os.path.abspath(args.output),
+        "outputs": {
+            name: os.path.abspath(path)
+            for name, path in outputs.items()
+        },
+    }
+
+    if message is not None:
+        summary["message"] = message
+
+    write_summary(summary, args.summary_file)
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,266 @@
+"""
+Table-level financial analytics.
+
+These run once over the assembled financial table instead of per file
+inside the parse loop, so they can be recomputed or extended without
+re-parsing any XML.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# (output column, numerator column, denominator column)
+# A ratio is 0 whenever its denominator is zero or negative.
+FINANCIAL_RATIOS = [
+    ("current_ratio", "assets", "liabilities"),
+    ("debt_ratio", "liabilities", "unrestricted_net_assets"),
+    ("savings_indicator_ratio", "rev_minus_exp", "total_expenses"),
+    ("operating_margin", "rev_minus_exp", "total_revenue"),
+    ("program_expense_ratio", "program_expenses", "total_expenses"),
+]
+
+RATIO_COLUMNS = [column for column, _, _ in FINANCIAL_RATIOS]
+
+
+def round_half_even(values, digits):
+    """
+    Round a float array exactly like Python's round(value, digits).
+
+    np.round scales by 10**digits before rounding, which can land on the
+    other side of a tie than Python's correctly rounded round(). Those
+    near-tie values are re-rounded with round(); everything else keeps
+    the vectorized result.
+    """
+    rounded = np.round(values, digits)
+
+    scaled = values * 10 ** digits
+    distance_to_tie = np.abs(scaled - np.floor(scaled) - 0.5)
+    near_tie = distance_to_tie <= 1e-6 + np.abs(scaled) * 1e-12
+
+    if near_tie.any():
+        rounded[near_tie] = [
+            round(value, digits)
+            for value in values[near_tie].tolist()
+        ]
+
+    return rounded
+
+
+def add_financial_ratios(df_financial):
+    """
+    Append the ratio columns to a financial table, in place.
+
+    Ratios are rounded to three decimals, and are 0 when the denominator
+    is not positive.
+    """
+    for column, numerator, denominator in FINANCIAL_RATIOS:
+        num = df_financial[numerator].to_numpy(dtype="float64")
+        den = df_financial[denominator].to_numpy(dtype="float64")
+
+        ratio = np.divide(
+            num,
+            den,
+            out=np.zeros(len(df_financial)),
+            where=den > 0
+        )
+
+        df_financial[column] = round_half_even(ratio, 3)
+
+    return df_financial
+
+
+# (output column, financial column, "diff" or "pct")
+CHANGE_MEASURES = [
+    ("revenue_change", "total_revenue", "diff"),
+    ("revenue_change_pct", "total_revenue", "pct"),
+    ("expenses_change", "total_expenses", "diff"),
+    ("expenses_change_pct", "total_expenses", "pct"),
+    ("assets_change", "assets", "diff"),
+    ("operating_margin_change_pct", "operating_margin", "pct"),
+    ("program_expense_ratio_change_pct", "program_expense_ratio", "pct"),
+    ("debt_ratio_change_pct", "debt_ratio", "pct"),
+    ("current_ratio_change_pct", "current_ratio", "pct"),
+]
+
+# (output column, financial column), added when "cagr" is requested
+CAGR_MEASURES = [
+    ("revenue_cagr_pct", "total_revenue"),
+    ("expenses_cagr_pct", "total_expenses"),
+    ("assets_cagr_pct", "assets"),
+]
+
+# Comparison windows written to financial_changes.csv:
+#   "overall"       first vs. last tax year of each organization
+#   "year_to_year"  each filing vs. the organization's previous filing
+#   N (int)         each filing vs. the filing exactly N tax years earlier
+#   "cagr"          adds compound annual growth columns to every row
+DEFAULT_CHANGE_WINDOWS = ("overall", "year_to_year")
+
+
+def change_columns(windows=DEFAULT_CHANGE_WINDOWS):
+    """Column order of financial_changes.csv for a set of windows."""
+    columns = ["org_name", "start_year", "end_year", "type"]
+    columns += [column for column, _, _ in CHANGE_MEASURES]
+
+    if "cagr" in windows:
+        columns += [column for column, _ in CAGR_MEASURES]
+
+    return columns
+
+
+def validate_change_windows(windows):
+    for window in windows:
+        if window in ("overall", "year_to_year", "cagr"):
+            continue
+
+        if isinstance(window, int) and not isinstance(window, bool) and window > 0:
+            continue
+
+        raise ValueError(
+            f"Unknown financial change window: {window!r}. Use "
+            "'overall', 'year_to_year', 'cagr' or a positive number of years."
+        )
+
+
+def pct_change(curr, prev):
+    """Percent change per element; 0 where the earlier value is 0."""
+    return np.divide(
+        curr - prev,
+        prev,
+        out=np.zeros(len(curr)),
+        where=prev != 0
+    ) * 100
+
+
+def compound_growth(curr, prev, years):
+    """Compound annual growth in percent; 0 unless both values are positive."""
+    valid = (prev > 0) & (curr > 0) & (years > 0)
+
+    ratio = np.divide(
+        curr,
+        prev,
+        out=np.ones(len(curr)),
+        where=valid
+    )
+
+    exponent = np.divide(
+        1.0,
+        years,
+        out=np.zeros(len(curr)),
+        where=valid
+    )
+
+    return np.where(valid, (ratio ** exponent - 1) * 100, 0.0)
+
+
+def compare_rows(start, end, change_type, cagr):
+    """Build change rows from two aligned frames of financial rows."""
+    changes = {
+        "org_name": end["org_name"].to_numpy(),
+        "start_year": start["year"].to_numpy(),
+        "end_year": end["year"].to_numpy(),
+        "type": change_type,
+    }
+
+    for column, source, kind in CHANGE_MEASURES:
+        prev = start[source].to_numpy()
+        curr = end[source].to_numpy()
+
+        if kind == "diff":
+            changes[column] = curr - prev
+        else:
+            changes[column] = pct_change(curr, prev)
+
+    if cagr:
+        years = (
+            changes["end_year"] - changes["start_year"]
+        ).astype("float64")
+
+        for column, source in CAGR_MEASURES:
+            changes[column] = compound_growth(
+                end[source].to_numpy(dtype="float64"),
+                start[source].to_numpy(dtype="float64"),
+                years
+            )
+
+    frame = pd.DataFrame(changes)
+    frame["_org"] = end["_org"].to_numpy()
+    frame["_position"] = end["_position"].to_numpy()
+
+    return frame
+
+
+def build_financial_changes(df_financial, windows=DEFAULT_CHANGE_WINDOWS):
+    """
+    Build the financial_changes.csv table from financial rows.
+
+    Every window pairs rows by position (or, for N-year windows, by a
+    merge on organization and year) and computes all measures with
+    whole-column arithmetic; there is no per-row Python.
+    Rows are ordered by organization name, then by window in the order
+    given, then by tax year.
+    """
+    validate_change_windows(windows)
+
+    if df_financial.empty:
+        return pd.DataFrame()
+
+    cagr = "cagr" in windows
+
+    df = df_financial.sort_values(
+        ["org_name", "year"],
+        kind="stable"
+    ).reset_index(drop=True)
+
+    df["_org"] = pd.factorize(df["org_name"])[0]
+    df["_position"] = np.arange(len(df))
+
+    org_names = df["org_name"]
+    frames = []
+
+    for rank, window in enumerate(windows):
+
+        if window == "cagr":
+            continue
+
+        if window == "overall":
+            start = df[~org_names.duplicated(keep="first")]
+            end = df[~org_names.duplicated(keep="last")]
+            frame = compare_rows(start, end, "overall", cagr)
+
+            # The overall row leads its organization's rows
+            frame["_position"] = start["_position"].to_numpy()
+
+        elif window == "year_to_year":
+            # Rows whose previous row belongs to the same organization;
+            # positional take keeps integer columns integer (shift() would
+            # upcast them to float)
+            positions = np.flatnonzero(
+                org_names.eq(org_names.shift(1)).to_numpy()
+            )
+            start = df.take(positions - 1)
+            end = df.take(positions)
+            frame = compare_rows(start, end, "year_to_year", cagr)
+
+        else:
+            # Pair each filing with the one filed `window` tax years earlier
+            keys = df[["org_name", "year", "_position"]]
+            pairs = keys.merge(
+                keys.assign(year=keys["year"] + window),
+                on=["org_name", "year"],
+                suffixes=("", "_start")
+            )
+            start = df.iloc[pairs["_position_start"].to_numpy()]
+            end = df.iloc[pairs["_position"].to_numpy()]
+            frame = compare_rows(start, end, f"{window}_year", cagr)
+
+        frame["_window"] = rank
+        frames.append(frame)
+
+    changes = pd.concat(frames, ignore_index=True).sort_values(
+        ["_org", "_window", "_position"],
+        kind="stable"
+    )
+
+    return changes[change_columns(windows)].reset_index(drop=True)
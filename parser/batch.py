@@ -0,0 +1,384 @@
+"""
+Update a results folder in place for a few new or changed files.
+
+run_990_parser writes every output from every file. That is what a
+one-off or incremental run needs, but it makes each update as slow as
+the whole corpus. update_outputs, used by parser.watch, parses only the
+files it is given and touches only their rows:
+
+    - output_format="sqlite": their filings are upserted, the filings of
+      removed files are deleted (see parser.sqlite_store), and
+      financial_changes is recomputed for the organizations touched.
+    - output_format="csv": their rows are appended to each table, in the
+      table's order within the batch, and the financial_changes rows of
+      the organizations touched are recomputed (patch_financial_changes).
+      Rows cannot be taken out of a CSV file without rewriting it, so
+      files that changed or were deleted need a run_990_parser run.
+
+Their processing errors are added to processing_errors.csv, and the
+manifest is updated through its journal (see parser.manifest), so a
+later incremental run starts from the updated outputs.
+field_coverage.csv and summary.html are left as the last run_990_parser
+run wrote them.
+
+run_990_parser needs at least one file, so clear_outputs empties the
+outputs of a folder whose files have all been deleted.
+"""
+
+import os
+
+import pandas as pd
+
+from parser.analytics import (
+    DEFAULT_CHANGE_WINDOWS,
+    RATIO_COLUMNS,
+    add_financial_ratios,
+    change_columns,
+    validate_change_windows,
+)
+from parser.cache import (
+    DEFAULT_MAX_BYTES as DEFAULT_CACHE_MAX_BYTES,
+    ParseCache,
+)
+from parser.manifest import (
+    load_manifest,
+    manifest_key,
+    save_manifest,
+    update_manifest,
+)
+from parser.outputs import (
+    output_path,
+    read_table,
+    validate_output_format,
+    write_table,
+)
+from parser.parse_990 import (
+    ERROR_COLUMNS,
+    EXPENSE_DETAIL_COLUMNS,
+    EXTRACTOR_VERSION,
+    FIELD_COVERAGE_COLUMNS,
+    FINANCIAL_COLUMNS,
+    ORGS_COLUMNS,
+    PEOPLE_COLUMNS,
+    REVENUE_DETAIL_COLUMNS,
+    SORT_KEYS,
+    TOP_COMPENSATION_COLUMNS,
+    build_summary_card,
+    iter_file_results,
+    open_store,
+    patch_financial_changes,
+    without_profile,
+)
+from parser.report import SummaryReport
+from parser.sources import source_key, source_name
+from parser.tables import TableBuilder
+
+
+# Output formats that can be updated without rewriting them
+UPDATABLE_FORMATS = ("csv", "sqlite")
+
+# Output table -> (columns, result entry holding its row or rows, float
+# columns). Float columns are written as floats even when every value in
+# a batch is a whole number, as in a table built from the whole corpus.
+TABLES = {
+    "orgs": (ORGS_COLUMNS, "org", ()),
+    "people": (PEOPLE_COLUMNS, "people", ()),
+    "top_compensation": (TOP_COMPENSATION_COLUMNS, "top_compensation", ()),
+    "financial": (FINANCIAL_COLUMNS, "financial", ()),
+    "expense_detail": (
+        EXPENSE_DETAIL_COLUMNS,
+        "expense_detail",
+        ("share_of_total_expenses", "program_services_share")
+    ),
+    "revenue_detail": (
+        REVENUE_DETAIL_COLUMNS,
+        "revenue_detail",
+        ("share_of_total_revenue",)
+    ),
+}
+
+
+def append_csv(df, path):
+    """Append rows to a CSV table, writing its header if it is new."""
+    df.to_csv(
+        path,
+        mode="a",
+        header=not os.path.exists(path),
+        index=False
+    )
+
+
+def append_csv_tables(results_dir, results, change_windows):
+    """Append the processed filings of results to the CSV tables."""
+    affected_orgs = set()
+
+    for name, (columns, entry, float_columns) in TABLES.items():
+        rows = []
+
+        for result in results:
+            records = result[entry]
+            rows.extend([records] if isinstance(records, dict) else records)
+
+        if name == "orgs":
+            affected_orgs.update(row["org_name"] for row in rows)
+
+        table = TableBuilder(columns)
+        table.extend(sorted(rows, key=SORT_KEYS[name]))
+
+        df = table.to_frame().astype(
+            {column: "float64" for column in float_columns}
+        )
+
+        if name == "financial":
+            df = add_financial_ratios(df)
+
+        append_csv(df, output_path(results_dir, name, "csv"))
+
+    if not affected_orgs:
+        return
+
+    # financial.csv now holds the new filings too
+    df_financial = read_table(output_path(results_dir, "financial", "csv"))
+
+    df_changes = patch_financial_changes(
+        output_path(results_dir, "financial_changes", "csv"),
+        df_financial[df_financial["org_name"].isin(affected_orgs)],
+        affected_orgs,
+        change_windows,
+        "csv"
+    )
+
+    write_table(df_changes, results_dir, "financial_changes", "csv")
+
+
+def update_errors(results_dir, error_rows, removed):
+    """Replace the processing errors of removed files and add new ones."""
+    errors_csv = os.path.join(results_dir, "processing_errors.csv")
+
+    if removed and os.path.exists(errors_csv):
+        df_errors = pd.read_csv(errors_csv, dtype=str, keep_default_na=False)
+        removed = set(removed)
+
+        kept = [
+            source_key(file_path) not in removed
+            for file_path in df_errors["file_path"]
+        ]
+
+        if not all(kept):
+            df_errors[kept].to_csv(errors_csv, index=False)
+
+    if error_rows:
+        append_csv(pd.DataFrame(error_rows, columns=ERROR_COLUMNS), errors_csv)
+
+
+def clear_outputs(
+    results_dir,
+    output_format="csv",
+    change_windows=DEFAULT_CHANGE_WINDOWS
+):
+    """
+    Empty the outputs of results_dir once every file they came from is
+    gone.
+
+    The tables are written without rows; with SQLite, the filings of the
+    manifest's files are deleted. field_coverage.csv and summary.html are
+    written empty, processing_errors.csv is removed and the manifest is
+    emptied.
+    """
+    validate_output_format(output_format)
+    validate_change_windows(change_windows)
+
+    if output_format == "sqlite":
+        store = open_store(results_dir)
+
+        try:
+            store.remove_sources(
+                list(load_manifest(results_dir, EXTRACTOR_VERSION))
+            )
+            store.update_financial_changes(change_windows)
+
+        finally:
+            store.close()
+
+    else:
+        for name, (columns, _, _) in TABLES.items():
+            if name == "financial":
+                columns = columns + RATIO_COLUMNS
+
+            write_table(
+                pd.DataFrame(columns=columns),
+                results_dir,
+                name,
+                output_format
+            )
+
+        write_table(
+            pd.DataFrame(columns=change_columns(change_windows)),
+            results_dir,
+            "financial_changes",
+            output_format
+        )
+
+    pd.DataFrame(columns=FIELD_COVERAGE_COLUMNS).to_csv(
+        os.path.join(results_dir, "field_coverage.csv"),
+        index=False
+    )
+
+    SummaryReport(
+        os.path.join(results_dir, "summary.html"),
+        build_summary_card,
+        FINANCIAL_COLUMNS
+    ).write_html()
+
+    try:
+        os.remove(os.path.join(results_dir, "processing_errors.csv"))
+    except FileNotFoundError:
+        pass
+
+    save_manifest(results_dir, EXTRACTOR_VERSION, {})
+
+
+def update_outputs(
+    results_dir,
+    files,
+    removed=(),
+    workers=1,
+    cache_dir=None,
+    cache_max_bytes=DEFAULT_CACHE_MAX_BYTES,
+    output_format="csv",
+    change_windows=DEFAULT_CHANGE_WINDOWS,
+    progress_callback=None,
+    control=None,
+    executor=None
+):
+    """
+    Parse files and add their records to the outputs of results_dir.
+
+    The results folder must have been written by an incremental
+    run_990_parser run with the same output_format and change_windows.
+
+    Args:
+        files:
+            {source: signature} of the sources to parse, with their
+            signatures from parser.manifest.file_signature. None of them
+            may already be in the outputs unless it is also removed.
+
+        removed:
+            Manifest keys of files whose records are dropped first:
+            files that changed or no longer exist. SQLite output only.
+
+        workers, cache_dir, cache_max_bytes, executor:
+            As for run_990_parser.
+
+        control:
+            Optional parser.control.RunControl. A cancelled update stops
+            before anything is written.
+
+    Returns (processed, skipped, errors) file counts.
+    """
+    def report(message):
+        print(message)
+
+        if progress_callback is not None:
+            progress_callback(message)
+
+    if output_format not in UPDATABLE_FORMATS:
+        raise ValueError(
+            f"{output_format} output cannot be updated in place; use "
+            "run_990_parser."
+        )
+
+    if removed and output_format != "sqlite":
+        raise ValueError(
+            "Records can only be removed from sqlite output; use "
+            "run_990_parser."
+        )
+
+    validate_change_windows(change_windows)
+
+    sources = list(files)
+    results = []
+
+    file_results = iter_file_results(
+        sources,
+        workers=workers,
+        cache_dir=cache_dir,
+        executor=executor
+    )
+
+    try:
+        for index, source in enumerate(sources, 1):
+            if control is not None:
+                control.check()
+
+            result = next(file_results)
+
+            report(
+                f"Processing file {index}/{len(sources)}: "
+                f"{source_name(source)}"
+            )
+
+            for message in result["messages"]:
+                report(message)
+
+            results.append(without_profile(result))
+
+    finally:
+        file_results.close()
+
+    processed = [
+        result for result in results
+        if result["status"] == "processed"
+    ]
+    error_rows = [
+        result["error"] for result in results
+        if result["error"] is not None
+    ]
+
+    if output_format == "sqlite":
+        store = open_store(results_dir)
+
+        try:
+            store.remove_sources(removed)
+
+            for source, result in zip(sources, results):
+                if result["status"] == "processed":
+                    store.add(result, manifest_key(source))
+
+            store.update_financial_changes(change_windows)
+
+        finally:
+            store.close()
+
+    elif processed:
+        append_csv_tables(results_dir, processed, change_windows)
+
+    update_errors(results_dir, error_rows, removed)
+
+    # Last: until the journal lists them, the files count as not in
+    # the outputs, so an update that failed part way is redone
+    manifest_files = {key: None for key in removed}
+
+    for source, result in zip(sources, results):
+        manifest_files[manifest_key(source)] = dict(
+            files[source],
+            result=result
+        )
+
+    update_manifest(results_dir, EXTRACTOR_VERSION, manifest_files)
+
+    if cache_dir is not None:
+        ParseCache(cache_dir, EXTRACTOR_VERSION, cache_max_bytes).prune()
+
+    counts = (
+        len(processed),
+        sum(result["status"] == "skipped" for result in results),
+        sum(result["status"] == "error" for result in results),
+    )
+
+    report(
+        f"Updated outputs: {counts[0]} processed, {counts[1]} skipped, "
+        f"{counts[2]} with errors."
+    )
+
+    return counts
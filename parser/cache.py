@@ -0,0 +1,212 @@
+"""
+On-disk, content-addressed cache of per-file parse results.
+
+Entries are keyed by the SHA-256 of the XML bytes together with an
+extractor version string, so an unchanged filing is never parsed twice
+and bumping the version invalidates everything at once. Each entry is the
+record dict returned by ``process_xml_file``, stored as zlib-compressed
+JSON.
+
+Reading an entry refreshes its modification time; ``prune()`` then evicts
+the least recently used entries until the cache fits its size cap.
+
+The cache's size is tracked in SIZE_FILENAME, one line per change in
+bytes: every ``put`` appends the size of the entry it wrote, and every
+walk of the directory replaces the file with the exact total. ``prune()``
+only walks the directory when the tracked size is over the cap (or not
+known yet), so a run that stays under it does not stat every entry.
+Appends are atomic, so worker processes can share the file; an entry
+written twice is counted twice, which only makes the next prune walk
+sooner.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import zlib
+
+
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+ENTRY_SUFFIX = ".json.z"
+
+SIZE_FILENAME = "size.log"
+
+# Tracked size changes that are folded into one line
+MAX_SIZE_LINES = 1000
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """Hash a file without reading it into memory at once."""
+    digest = hashlib.sha256()
+
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """A directory of cached parse results with size-capped LRU eviction."""
+
+    def __init__(self, cache_dir, version, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.version = version
+        self.max_bytes = max_bytes
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, content_sha256):
+        """Combine a content hash with the extractor version."""
+        return hashlib.sha256(
+            f"{self.version}\0{content_sha256}".encode("utf-8")
+        ).hexdigest()
+
+    def size_path(self):
+        return os.path.join(self.cache_dir, SIZE_FILENAME)
+
+    def tracked_size(self):
+        """Return (bytes, lines) from the size file, or (None, 0)."""
+        try:
+            with open(self.size_path(), encoding="ascii") as f:
+                lines = f.read().split()
+        except FileNotFoundError:
+            return None, 0
+
+        try:
+            return sum(map(int, lines)), len(lines)
+        except ValueError:
+            return None, 0
+
+    def track(self, change):
+        """Append a size change; one small O_APPEND write per call."""
+        fd = os.open(
+            self.size_path(),
+            os.O_WRONLY | os.O_CREAT | os.O_APPEND,
+            0o644
+        )
+
+        try:
+            os.write(fd, f"{change}\n".encode("ascii"))
+        finally:
+            os.close(fd)
+
+    def set_tracked_size(self, total):
+        """Replace the size file with one line."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+
+        with os.fdopen(fd, "w", encoding="ascii") as f:
+            f.write(f"{total}\n")
+
+        os.replace(tmp_path, self.size_path())
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ENTRY_SUFFIX)
+
+    def get(self, key):
+        """Return the cached record for a key, or None on a miss."""
+        path = self.path(key)
+
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+
+        try:
+            record = json.loads(zlib.decompress(data).decode("utf-8"))
+        except (zlib.error, ValueError):
+            # A damaged entry is treated as a miss and rewritten.
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        return record
+
+    def put(self, key, record):
+        """Store a record atomically; concurrent writers are harmless."""
+        path = self.path(key)
+        directory = os.path.dirname(path)
+
+        os.makedirs(directory, exist_ok=True)
+
+        data = zlib.compress(
+            json.dumps(record, separators=(",", ":")).encode("utf-8"),
+            6
+        )
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+
+            os.replace(tmp_path, path)
+
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        self.track(len(data))
+
+    def prune(self):
+        """
+        Evict least recently used entries until the cache fits max_bytes.
+
+        The directory is only walked when the tracked size is over
+        max_bytes. Returns the number of entries removed.
+        """
+        tracked, lines = self.tracked_size()
+
+        if tracked is not None and tracked <= self.max_bytes:
+            if lines > MAX_SIZE_LINES:
+                self.set_tracked_size(tracked)
+
+            return 0
+
+        entries = []
+        total = 0
+
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(ENTRY_SUFFIX):
+                    continue
+
+                path = os.path.join(root, name)
+
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        removed = 0
+
+        if total > self.max_bytes:
+            entries.sort()
+
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+
+                total -= size
+                removed += 1
+
+        self.set_tracked_size(total)
+
+        return removed
@@ -0,0 +1,279 @@
+"""
+Checkpoints for long runs.
+
+With ``run_990_parser(checkpoint=True)`` the records of every parsed file
+are appended to ``checkpoint.jsonl.gz`` in the results folder, together
+with the file's size and modification time. They are written every
+DEFAULT_CHECKPOINT_EVERY files, when the run is cancelled and when it
+fails, each time as a new gzip member, so a crash loses at most the files
+since the last checkpoint.
+
+A later run with checkpoint=True over the same results folder resumes:
+files whose records are in the checkpoint and whose size and mtime have
+not changed are not parsed again, and every output is built from the
+checkpointed records plus the newly parsed files. The checkpoint is
+removed once a run completes.
+
+Only the size, modification time and gzip member of each checkpointed
+file are kept in memory. When a run resumes, the stored records are read
+back one member at a time as the outputs are built, so resuming a large
+run does not load every record at once.
+
+A checkpoint written by another extractor version, or by a run with a
+different ``incremental`` setting, is discarded.
+"""
+
+import gzip
+import json
+import os
+import tempfile
+import zlib
+
+from parser.manifest import manifest_key
+from parser.sources import source_stat
+
+
+CHECKPOINT_FILENAME = "checkpoint.jsonl.gz"
+
+# Parsed files between two checkpoints
+DEFAULT_CHECKPOINT_EVERY = 500
+
+
+# Compressed bytes read at a time
+READ_SIZE = 1024 * 1024
+
+
+def checkpoint_path(results_dir):
+    return os.path.join(results_dir, CHECKPOINT_FILENAME)
+
+
+def read_member(f, data=b""):
+    """
+    Decompress the gzip member that starts at ``data`` followed by the
+    rest of ``f``.
+
+    Returns (its JSON records, compressed bytes it took up, the bytes
+    read past its end). Raises EOFError if the member is cut short, and
+    zlib.error or ValueError if it is damaged.
+    """
+    decompressor = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+    chunks = []
+    length = 0
+
+    while True:
+        if not data:
+            data = f.read(READ_SIZE)
+
+            if not data:
+                raise EOFError("The checkpoint member is incomplete.")
+
+        chunks.append(decompressor.decompress(data))
+
+        if decompressor.eof:
+            rest = decompressor.unused_data
+            length += len(data) - len(rest)
+            break
+
+        length += len(data)
+        data = b""
+
+    text = b"".join(chunks).decode("utf-8")
+    records = [json.loads(line) for line in text.splitlines()]
+
+    return records, length, rest
+
+
+def read_checkpoint(path):
+    """
+    Return (header, {key: (size, mtime_ns, member offset)}, end) from a
+    checkpoint file.
+
+    Records are read one gzip member at a time and only their
+    signatures are kept. A member cut short by a crash ends the
+    checkpoint; ``end`` is the offset where the readable members end,
+    the file size when there is no such member. A missing or unreadable
+    file yields (None, {}, 0).
+    """
+    header = None
+    entries = {}
+    offset = 0
+
+    try:
+        with open(path, "rb") as f:
+            data = b""
+
+            while True:
+                if not data:
+                    data = f.read(READ_SIZE)
+
+                    if not data:
+                        break
+
+                records, length, data = read_member(f, data)
+
+                for record in records:
+                    if header is None:
+                        header = record
+                    else:
+                        entries[record["key"]] = (
+                            record["size"],
+                            record["mtime_ns"],
+                            offset
+                        )
+
+                offset += length
+
+    except FileNotFoundError:
+        return None, {}, 0
+
+    except (OSError, EOFError, zlib.error, ValueError, KeyError):
+        pass
+
+    if header is None:
+        return None, {}, 0
+
+    return header, entries, offset
+
+
+def write_member(raw, records):
+    """Write records as one gzip member of JSON lines and sync it."""
+    with gzip.open(raw, "wt", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, separators=(",", ":")))
+            f.write("\n")
+
+    raw.flush()
+    os.fsync(raw.fileno())
+
+
+class Checkpoint:
+    """The checkpoint of one results folder."""
+
+    def __init__(
+        self,
+        results_dir,
+        version,
+        incremental=False,
+        every=DEFAULT_CHECKPOINT_EVERY
+    ):
+        self.path = checkpoint_path(results_dir)
+        self.every = every
+        self.pending = []
+
+        # The records of the member read last: {key: result}
+        self.member_offset = None
+        self.member_results = {}
+
+        header = {
+            "extractor_version": version,
+            "incremental": incremental,
+        }
+
+        existing_header, self.entries, end = read_checkpoint(self.path)
+
+        if existing_header != header:
+            self.entries = {}
+            self.rewrite([header])
+
+        elif end < os.path.getsize(self.path):
+            # Nothing appended after a damaged member could be read back
+            os.truncate(self.path, end)
+
+    def resumable(self, xml_files):
+        """The xml_files whose records can be reused, as a set."""
+        resumed = set()
+
+        for xml_file in xml_files:
+            entry = self.entries.get(manifest_key(xml_file))
+
+            if entry is None:
+                continue
+
+            if entry[:2] == source_stat(xml_file):
+                resumed.add(xml_file)
+
+        return resumed
+
+    def result(self, xml_file):
+        """
+        Read back the checkpointed result of a file from resumable().
+
+        Its member is decompressed and kept until a file from another
+        member is asked for, so files resumed in the order they were
+        checkpointed read every member once.
+        """
+        key = manifest_key(xml_file)
+        offset = self.entries[key][2]
+
+        if offset != self.member_offset:
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                records, _, _ = read_member(f)
+
+            self.member_results = {
+                record["key"]: record["result"]
+                for record in records
+                if "key" in record
+            }
+            self.member_offset = offset
+
+        return self.member_results[key]
+
+    def add(self, xml_file, result, signature=None):
+        """
+        Queue one parsed file's result; ``signature`` is its manifest
+        signature in incremental runs.
+        """
+        if signature is None:
+            size, mtime_ns = source_stat(xml_file)
+            signature = {"size": size, "mtime_ns": mtime_ns}
+
+        self.pending.append(
+            {
+                "key": manifest_key(xml_file),
+                **signature,
+                "result": result,
+            }
+        )
+
+        if len(self.pending) >= self.every:
+            self.save()
+
+    def save(self):
+        """Append the queued results as one gzip member."""
+        if not self.pending:
+            return
+
+        with open(self.path, "ab") as raw:
+            write_member(raw, self.pending)
+
+        self.pending = []
+
+    def rewrite(self, records):
+        """Replace the checkpoint file atomically."""
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(self.path),
+            suffix=".tmp"
+        )
+
+        try:
+            with os.fdopen(fd, "wb") as raw:
+                write_member(raw, records)
+
+            os.replace(tmp_path, self.path)
+
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def remove(self):
+        """Delete the checkpoint after a completed run."""
+        self.pending = []
+
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
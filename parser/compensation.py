@@ -0,0 +1,43 @@
+"""
+Per-filing top-N compensation.
+
+process_xml_file passes every Part VII Section A person to a
+TopCompensation tracker as it builds the people rows. The tracker keeps
+a min-heap of at most ``n`` people, so each person costs O(log n) and the
+filing's people are never sorted or scanned again.
+
+Ties are broken by document order: of two people with the same total
+compensation, the one listed first in the filing ranks higher.
+"""
+
+import heapq
+
+
+# People per filing written to top_compensation.csv
+TOP_COMPENSATION_COUNT = 5
+
+
+class TopCompensation:
+    """The ``n`` highest-paid people of one filing."""
+
+    def __init__(self, n=TOP_COMPENSATION_COUNT):
+        self.n = n
+        self.heap = []
+        self.seen = 0
+
+    def add(self, person):
+        """Offer one people row; it needs a "total_comp" value."""
+        # The heap root is the lowest total, and among equal totals the
+        # person listed last. The position makes every entry unique, so
+        # the rows themselves are never compared.
+        entry = (person["total_comp"], -self.seen, person)
+        self.seen += 1
+
+        if len(self.heap) < self.n:
+            heapq.heappush(self.heap, entry)
+        else:
+            heapq.heappushpop(self.heap, entry)
+
+    def ranked(self):
+        """The tracked people, highest-paid first."""
+        return [person for _, _, person in sorted(self.heap, reverse=True)]
@@ -0,0 +1,51 @@
+"""
+Cooperative cancellation and pausing of a run.
+
+A RunControl is shared between run_990_parser and another thread, such
+as the GUI. The parser calls ``check()`` before it takes each next file:
+while the run is paused the call blocks, and once the run is cancelled it
+raises RunCancelled. Files already being parsed are finished first, so a
+run always stops between files.
+"""
+
+import threading
+
+
+class RunCancelled(Exception):
+    """Raised inside run_990_parser when its RunControl is cancelled."""
+
+
+class RunControl:
+    """Cancel, pause and resume a run from another thread."""
+
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    @property
+    def paused(self):
+        return not self._running.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+        # A paused run has to wake up to notice
+        self._running.set()
+
+    def pause(self):
+        if not self.cancelled:
+            self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    def check(self):
+        """Block while paused; raise RunCancelled once cancelled."""
+        self._running.wait()
+
+        if self._cancelled.is_set():
+            raise RunCancelled("The run was cancelled.")
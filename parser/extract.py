@@ -0,0 +1,332 @@
+"""
+Single-pass streaming extraction of Form 990 XML.
+
+The parser walks each filing once with ``lxml.etree.iterparse`` and picks up
+everything ``run_990_parser`` needs while it streams:
+
+- scalar header and summary fields, as mapped in ``parser.fields``
+- Part VII Section A people
+- Part VIII program-service revenue groups
+- Part IX functional-expense groups
+
+Form 990-EZ and 990-PF filings are read with their own field map and
+their own list of officers, directors and trustees (FORM_LAYOUTS); they
+have no revenue or expense detail groups.
+
+Elements are cleared as soon as they have been consumed, so memory stays
+flat no matter how large the filing is.
+"""
+
+from collections import namedtuple
+
+from lxml import etree
+
+from parser.fields import compile_fields
+from parser.profiling import TimedReader, timed_events
+
+
+PERSON_FIELDS = (
+    "PersonNm",
+    "TitleTxt",
+    "ReportableCompFromOrgAmt",
+    "ReportableCompFromRltdOrgAmt",
+    "OtherCompensationAmt",
+)
+
+# Values read from the revenue and expense groups directly under IRS990.
+GROUP_FIELDS = (
+    "Desc",
+    "BusinessCd",
+    "TotalRevenueColumnAmt",
+    "TotalAmt",
+    "ProgramServicesAmt",
+    "ManagementAndGeneralAmt",
+    "FundraisingAmt",
+)
+
+# Officers, directors, trustees and key employees on 990-EZ Part IV and
+# 990-PF Part VIII.
+OFFICER_FIELDS = (
+    "PersonNm",
+    "TitleTxt",
+    "CompensationAmt",
+    "EmployeeBenefitProgramAmt",
+    "ExpenseAccountOtherAllwncAmt",
+)
+
+PEOPLE_GROUP = "Form990PartVIISectionAGrp"
+
+
+# Where each return type keeps its data.
+#   form:          form element under ReturnData
+#   people_group:  element of one listed person
+#   person_fields: values read from each person
+#   groups:        collect the revenue and expense groups under ``form``
+FormLayout = namedtuple(
+    "FormLayout",
+    ["form", "people_group", "person_fields", "groups"]
+)
+
+FORM_LAYOUTS = {
+    "990": FormLayout("IRS990", PEOPLE_GROUP, PERSON_FIELDS, True),
+    "990EZ": FormLayout(
+        "IRS990EZ",
+        "OfficerDirectorTrusteeEmplGrp",
+        OFFICER_FIELDS,
+        False
+    ),
+    "990PF": FormLayout(
+        "IRS990PF",
+        "OfficerDirTrstKeyEmplGrp",
+        OFFICER_FIELDS,
+        False
+    ),
+}
+
+
+# A repeating XML group reduced to plain values.
+#   tag:      local element name of the group
+#   values:   {field: stripped text} for the first descendant of each field
+#   children: local names of the group's direct child elements
+ExtractedGroup = namedtuple(
+    "ExtractedGroup",
+    ["tag", "values", "children"]
+)
+
+
+class ExtractedFiling:
+    """Plain values pulled from one Form 990 XML document."""
+
+    def __init__(self, return_type="990"):
+        self.return_type = return_type
+        self.return_found = False
+        self.filer_found = False
+        self.return_version = ""
+        self.field_map = None
+        self.values = {}
+        self.people = []
+        self.groups = []
+
+
+def local_name(tag):
+    """Strip the ``{namespace}`` prefix lxml adds to element tags."""
+    return tag.rpartition("}")[2]
+
+
+def element_text(element):
+    """Return the stripped text of an element and all its descendants."""
+    return "".join(element.itertext()).strip()
+
+
+def group_values(element, fields):
+    """Read the first descendant of each field inside a small subtree."""
+    values = {}
+
+    for field in fields:
+        found = element.find(".//{*}" + field)
+
+        if found is not None:
+            values[field] = element_text(found)
+
+    return values
+
+
+def child_names(element):
+    return [
+        local_name(child.tag)
+        for child in element
+        if isinstance(child.tag, str)
+    ]
+
+
+def extract_filing(source, timer=None, return_type="990"):
+    """
+    Stream one filing and return an ExtractedFiling.
+
+    ``source`` may be a filename or a binary file object, and
+    ``return_type`` picks the form's field map and layout ("990",
+    "990EZ" or "990PF"; see parser.prefilter). Malformed
+    documents are recovered the same way BeautifulSoup's "xml" parser
+    recovers them: whatever was read before the damage is kept.
+
+    With a ``parser.profiling.StageTimer``, the time spent reading the
+    file, inside lxml and in extraction is added to it.
+    """
+    if timer is not None:
+        if not hasattr(source, "read"):
+            with open(source, "rb") as f:
+                return extract_filing(f, timer, return_type)
+
+        source = TimedReader(source)
+
+    layout = FORM_LAYOUTS[return_type]
+
+    filing = ExtractedFiling(return_type)
+    values = filing.values
+
+    field_map = None
+    form_element = None
+    form_seen = False
+
+    # Registry mode: the lookup-tree node for every open element.
+    path_nodes = []
+
+    # Fallback mode: {tag: column} maps for the scopes currently open.
+    scope_maps = []
+    open_scopes = []
+    seen_scopes = set()
+
+    # Elements whose subtree is kept until their end event, together with
+    # what to do with them. Scalar claims only need their own text.
+    open_items = []
+
+    context = etree.iterparse(
+        source,
+        events=("start", "end"),
+        recover=True,
+        remove_comments=True,
+        remove_pis=True
+    )
+
+    if timer is not None:
+        context = timed_events(context, source, timer)
+
+    try:
+
+        for event, element in context:
+
+            name = local_name(element.tag)
+
+            if event == "start":
+
+                node = None
+
+                if name == "Return" and field_map is None:
+                    filing.return_found = True
+                    filing.return_version = element.get("returnVersion", "")
+                    field_map = compile_fields(
+                        filing.return_version,
+                        return_type
+                    )
+                    filing.field_map = field_map
+                    node = field_map.root
+
+                    if None in field_map.scopes:
+                        scope_maps.append(field_map.scopes[None])
+
+                elif path_nodes and path_nodes[-1] is not None:
+                    node = path_nodes[-1].children.get(name)
+
+                path_nodes.append(node)
+
+                if name == "Filer":
+                    filing.filer_found = True
+
+                elif name == layout.form and not form_seen:
+                    form_seen = True
+
+                    if layout.groups:
+                        form_element = element
+
+                elif name == layout.people_group:
+                    open_items.append((element, "person", None))
+
+                elif (
+                    form_element is not None
+                    and name.endswith("Grp")
+                    and element.getparent() is form_element
+                ):
+                    open_items.append((element, "group", None))
+
+                if field_map is None:
+                    continue
+
+                # ---------------------------------------------
+                # Scalar fields
+                # ---------------------------------------------
+
+                columns = []
+
+                if (
+                    node is not None
+                    and node.column is not None
+                    and node.column not in values
+                ):
+                    columns.append(node.column)
+
+                for scope_map in scope_maps:
+                    column = scope_map.get(name)
+
+                    if column is not None and column not in values:
+                        columns.append(column)
+
+                if name in field_map.scopes and name not in seen_scopes:
+                    seen_scopes.add(name)
+                    scope_maps.append(field_map.scopes[name])
+                    open_scopes.append(element)
+
+                if columns:
+                    for column in columns:
+                        values[column] = ""
+
+                    open_items.append((element, "field", columns))
+
+                continue
+
+            # -------------------------------------------------
+            # End events
+            # -------------------------------------------------
+
+            path_nodes.pop()
+
+            if open_scopes and open_scopes[-1] is element:
+                open_scopes.pop()
+                scope_maps.pop()
+
+            while open_items and open_items[-1][0] is element:
+
+                _, kind, columns = open_items.pop()
+
+                if kind == "field":
+                    text = element_text(element)
+
+                    for column in columns:
+                        values[column] = text
+
+                elif kind == "person":
+                    filing.people.append(
+                        ExtractedGroup(
+                            name,
+                            group_values(element, layout.person_fields),
+                            child_names(element)
+                        )
+                    )
+
+                elif kind == "group":
+                    filing.groups.append(
+                        ExtractedGroup(
+                            name,
+                            group_values(element, GROUP_FIELDS),
+                            child_names(element)
+                        )
+                    )
+
+            if element is form_element:
+                form_element = None
+
+            # Free everything that has been consumed, unless an enclosing
+            # group or field still needs to read this subtree.
+            if not open_items:
+                element.clear(keep_tail=True)
+
+                parent = element.getparent()
+
+                if parent is not None:
+                    while element.getprevious() is not None:
+                        del parent[0]
+
+    except etree.XMLSyntaxError:
+        # Empty or unreadable documents simply produce no elements.
+        pass
+
+    return filing
@@ -0,0 +1,359 @@
+"""
+Declarative map of output columns to IRS e-file element paths.
+
+Each schema family lists the element path (relative to ``Return``) that
+feeds every scalar output column. Form 990, 990-EZ and 990-PF have their
+own families, keyed by the return type the prefilter reads from the
+header (see parser.prefilter). A family is compiled once per return type
+and ``returnVersion`` into a lookup tree that ``extract_filing`` walks in
+the same single pass it already makes over the document. Columns a form
+has no line for are not mapped and stay 0.
+
+Versions no family claims fall back to the original tag-name search: the
+first element with the field's tag name, anywhere inside ``scope`` (or
+anywhere in the document when ``scope`` is None).
+"""
+
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+
+FieldSpec = namedtuple(
+    "FieldSpec",
+    ["column", "path", "scope"]
+)
+
+
+# Header fields, the same on every return type
+HEADER_FIELDS = (
+    FieldSpec("ein", "ReturnHeader/Filer/EIN", "Filer"),
+    FieldSpec("org_name", "ReturnHeader/Filer/BusinessName", "Filer"),
+    FieldSpec("year", "ReturnHeader/TaxYr", None),
+    FieldSpec("return_ts", "ReturnHeader/ReturnTs", None),
+)
+
+
+FORM_990_FIELDS = HEADER_FIELDS + (
+    FieldSpec(
+        "voting_members",
+        "ReturnData/IRS990/VotingMembersGoverningBodyCnt",
+        None
+    ),
+    FieldSpec("employees", "ReturnData/IRS990/TotalEmployeeCnt", None),
+    FieldSpec("total_revenue", "ReturnData/IRS990/CYTotalRevenueAmt", None),
+    FieldSpec(
+        "salaries",
+        "ReturnData/IRS990/CYSalariesCompEmpBnftPaidAmt",
+        None
+    ),
+    FieldSpec("total_expenses", "ReturnData/IRS990/CYTotalExpensesAmt", None),
+    FieldSpec(
+        "rev_minus_exp",
+        "ReturnData/IRS990/CYRevenuesLessExpensesAmt",
+        None
+    ),
+    FieldSpec(
+        "assets",
+        "ReturnData/IRS990/NetAssetsOrFundBalancesEOYAmt",
+        None
+    ),
+    FieldSpec("liabilities", "ReturnData/IRS990/TotalLiabilitiesEOYAmt", None),
+    FieldSpec(
+        "unrestricted_net_assets",
+        "ReturnData/IRS990/NoDonorRestrictionNetAssetsGrp/EOYAmt",
+        "NoDonorRestrictionNetAssetsGrp"
+    ),
+    FieldSpec(
+        "program_expenses",
+        "ReturnData/IRS990/TotalProgramServiceExpensesAmt",
+        None
+    ),
+    FieldSpec(
+        "contributions_grants",
+        "ReturnData/IRS990/CYContributionsGrantsAmt",
+        "IRS990"
+    ),
+    FieldSpec(
+        "program_service_revenue",
+        "ReturnData/IRS990/CYProgramServiceRevenueAmt",
+        "IRS990"
+    ),
+    FieldSpec(
+        "investment_income",
+        "ReturnData/IRS990/CYInvestmentIncomeAmt",
+        "IRS990"
+    ),
+    FieldSpec(
+        "other_revenue",
+        "ReturnData/IRS990/CYOtherRevenueAmt",
+        "IRS990"
+    ),
+)
+
+
+FORM_990EZ_FIELDS = HEADER_FIELDS + (
+    FieldSpec(
+        "total_revenue",
+        "ReturnData/IRS990EZ/TotalRevenueAmt",
+        "IRS990EZ"
+    ),
+    FieldSpec(
+        "salaries",
+        "ReturnData/IRS990EZ/SalariesOtherCompEmplBnftAmt",
+        "IRS990EZ"
+    ),
+    FieldSpec(
+        "total_expenses",
+        "ReturnData/IRS990EZ/TotalExpensesAmt",
+        "IRS990EZ"
+    ),
+    FieldSpec(
+        "rev_minus_exp",
+        "ReturnData/IRS990EZ/ExcessOrDeficitForYearAmt",
+        "IRS990EZ"
+    ),
+    FieldSpec(
+        "assets",
+        "ReturnData/IRS990EZ/NetAssetsOrFundBalancesEOYAmt",
+        "IRS990EZ"
+    ),
+    FieldSpec(
+        "liabilities",
+        "ReturnData/IRS990EZ/SumOfTotalLiabilitiesGrp/EOYAmt",
+        "SumOfTotalLiabilitiesGrp"
+    ),
+    FieldSpec(
+        "program_expenses",
+        "ReturnData/IRS990EZ/TotalProgramServiceExpensesAmt",
+        "IRS990EZ"
+    ),
+    FieldSpec(
+        "contributions_grants",
+        "ReturnData/IRS990EZ/ContributionsGiftsGrantsEtcAmt",
+        "IRS990EZ"
+    ),
+    FieldSpec(
+        "program_service_revenue",
+        "ReturnData/IRS990EZ/ProgramServiceRevenueAmt",
+        "IRS990EZ"
+    ),
+    FieldSpec(
+        "investment_income",
+        "ReturnData/IRS990EZ/InvestmentIncomeAmt",
+        "IRS990EZ"
+    ),
+    FieldSpec(
+        "other_revenue",
+        "ReturnData/IRS990EZ/OtherRevenueTotalAmt",
+        "IRS990EZ"
+    ),
+)
+
+
+FORM_990PF_FIELDS = HEADER_FIELDS + (
+    FieldSpec(
+        "total_revenue",
+        "ReturnData/IRS990PF/AnalysisOfRevenueAndExpenses/"
+        "TotalRevAndExpnssAmt",
+        "AnalysisOfRevenueAndExpenses"
+    ),
+    FieldSpec(
+        "total_expenses",
+        "ReturnData/IRS990PF/AnalysisOfRevenueAndExpenses/"
+        "TotalExpensesRevAndExpnssAmt",
+        "AnalysisOfRevenueAndExpenses"
+    ),
+    FieldSpec(
+        "rev_minus_exp",
+        "ReturnData/IRS990PF/AnalysisOfRevenueAndExpenses/"
+        "ExcessRevenueOverExpensesAmt",
+        "AnalysisOfRevenueAndExpenses"
+    ),
+    FieldSpec(
+        "program_expenses",
+        "ReturnData/IRS990PF/AnalysisOfRevenueAndExpenses/"
+        "TotalExpensesDsbrsChrtblAmt",
+        "AnalysisOfRevenueAndExpenses"
+    ),
+    FieldSpec(
+        "contributions_grants",
+        "ReturnData/IRS990PF/AnalysisOfRevenueAndExpenses/"
+        "ContriRcvdRevAndExpnssAmt",
+        "AnalysisOfRevenueAndExpenses"
+    ),
+    FieldSpec(
+        "assets",
+        "ReturnData/IRS990PF/Form990PFBalanceSheetsGrp/"
+        "TotNetAstOrFundBalancesEOYAmt",
+        "Form990PFBalanceSheetsGrp"
+    ),
+    FieldSpec(
+        "liabilities",
+        "ReturnData/IRS990PF/Form990PFBalanceSheetsGrp/"
+        "TotalLiabilitiesEOYAmt",
+        "Form990PFBalanceSheetsGrp"
+    ),
+)
+
+
+# Schema families per return type, keyed by the year part of
+# returnVersion ("2019v5.1").
+# (first year, last year or None for open-ended, fields)
+SCHEMA_FIELDS = {
+    "990": (
+        (2013, None, FORM_990_FIELDS),
+    ),
+    "990EZ": (
+        (2013, None, FORM_990EZ_FIELDS),
+    ),
+    "990PF": (
+        (2013, None, FORM_990PF_FIELDS),
+    ),
+}
+
+# Fields used when a version is not covered by any family.
+FALLBACK_FIELDS = {
+    "990": FORM_990_FIELDS,
+    "990EZ": FORM_990EZ_FIELDS,
+    "990PF": FORM_990PF_FIELDS,
+}
+
+VERSION_PATTERN = re.compile(r"^(\d{4})v\d+(?:\.\d+)?$")
+
+
+class PathNode:
+    """One step in a compiled element-path lookup tree."""
+
+    __slots__ = ("column", "children")
+
+    def __init__(self):
+        self.column = None
+        self.children = {}
+
+
+class CompiledFields:
+    """
+    Lookup tables for one return type and returnVersion.
+
+    In "registry" mode ``root`` is a PathNode tree matching the ``Return``
+    element. In "fallback" mode ``scopes`` maps each scope element name
+    (None for the whole document) to {tag name: column}.
+    """
+
+    def __init__(self, version, fields, mode, return_type="990"):
+        self.version = version
+        self.return_type = return_type
+        self.mode = mode
+        self.columns = [field.column for field in fields]
+        self.root = None
+        self.scopes = {}
+
+        if mode == "registry":
+            self.root = PathNode()
+
+            for field in fields:
+                node = self.root
+
+                for step in field.path.split("/"):
+                    node = node.children.setdefault(step, PathNode())
+
+                node.column = field.column
+
+        else:
+            for field in fields:
+                tag = field.path.rsplit("/", 1)[-1]
+                self.scopes.setdefault(field.scope, {})[tag] = field.column
+
+
+def schema_fields(version, return_type="990"):
+    """Return the registry fields for a returnVersion, or None if unknown."""
+    match = VERSION_PATTERN.match(version or "")
+
+    if match is None:
+        return None
+
+    year = int(match.group(1))
+
+    for first_year, last_year, fields in SCHEMA_FIELDS[return_type]:
+        if year >= first_year and (last_year is None or year <= last_year):
+            return fields
+
+    return None
+
+
+@lru_cache(maxsize=None)
+def compile_fields(version, return_type="990"):
+    """
+    Compile (once) the field lookup tables for a return type
+    ("990", "990EZ" or "990PF") and returnVersion.
+    """
+    fields = schema_fields(version, return_type)
+
+    if fields is None:
+        return CompiledFields(
+            version,
+            FALLBACK_FIELDS[return_type],
+            "fallback",
+            return_type
+        )
+
+    return CompiledFields(version, fields, "registry", return_type)
+
+
+class FieldCoverage:
+    """Count how often each field was found, per return type and version."""
+
+    def __init__(self):
+        self.filings = {}
+        self.hits = {}
+
+    def add(self, version, found_columns, return_type="990"):
+        key = (return_type, version or "")
+        self.filings[key] = self.filings.get(key, 0) + 1
+        hits = self.hits.setdefault(key, {})
+
+        for column in found_columns:
+            hits[column] = hits.get(column, 0) + 1
+
+    def rows(self):
+        """One row per form, version and field, for field_coverage.csv."""
+        rows = []
+
+        for return_type, version in sorted(self.filings):
+            compiled = compile_fields(version, return_type)
+            filings = self.filings[return_type, version]
+            hits = self.hits[return_type, version]
+
+            for column in compiled.columns:
+                rows.append(
+                    {
+                        "return_type": return_type,
+                        "return_version": version or "unknown",
+                        "mapping": compiled.mode,
+                        "filings": filings,
+                        "field": column,
+                        "hits": hits.get(column, 0),
+                        "misses": filings - hits.get(column, 0),
+                    }
+                )
+
+        return rows
+
+    def summary_lines(self):
+        """Short per-version hit/miss lines for the run summary."""
+        lines = []
+
+        for return_type, version in sorted(self.filings):
+            compiled = compile_fields(version, return_type)
+            filings = self.filings[return_type, version]
+            expected = filings * len(compiled.columns)
+            found = sum(self.hits[return_type, version].values())
+
+            lines.append(
+                f"Form {return_type} schema {version or 'unknown'} "
+                f"({compiled.mode}): {filings} filing(s), "
+                f"{found}/{expected} field values found"
+            )
+
+        return lines
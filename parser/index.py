@@ -0,0 +1,201 @@
+"""
+Selective ingestion driven by an IRS e-file index.
+
+The IRS publishes an index of every e-filed return next to the XML: a
+CSV (RETURN_ID, EIN, TAX_PERIOD, RETURN_TYPE, OBJECT_ID, ...) per year,
+and, for older years, a JSON file ({"Filings2019": [{"EIN", "TaxPeriod",
+"FormType", "ObjectId", ...}]}). Each filing's XML is named
+``<OBJECT_ID>_public.xml``, both on disk and inside the bulk ZIP
+archives.
+
+``select_filenames`` reads an index and returns the XML file names of
+the filings that match an EIN list, a tax-year range and a set of return
+types, so run_990_parser only opens those files or archive members. The
+index is read row by row and only matching rows are kept.
+
+The tax year is derived from the tax period (the month the period ends)
+the way the IRS assigns TaxYr: a period ending in December belongs to
+that year, any other period to the year before.
+"""
+
+import csv
+import json
+import os
+import re
+
+from parser.prefilter import normalize_return_type
+
+
+# Canonical field -> accepted index column names (compared in lower case)
+INDEX_COLUMNS = {
+    "object_id": ("object_id", "objectid"),
+    "ein": ("ein",),
+    "tax_period": ("tax_period", "taxperiod"),
+    "return_type": ("return_type", "formtype"),
+}
+
+
+def normalize_ein(ein):
+    """EINs as nine digits, so "12-3456789" and "023456789" both match."""
+    digits = re.sub(r"\D", "", str(ein))
+    return digits.zfill(9) if digits else ""
+
+
+def tax_year(tax_period):
+    """Tax year of a YYYYMM tax period, or None if it cannot be read."""
+    digits = re.sub(r"\D", "", str(tax_period))
+
+    if len(digits) < 6:
+        return None
+
+    year = int(digits[:4])
+    month = int(digits[4:6])
+
+    return year if month == 12 else year - 1
+
+
+def xml_filename(object_id):
+    return f"{object_id}_public.xml"
+
+
+def column_map(fieldnames):
+    """Map canonical fields to the index's own column names."""
+    lookup = {name.strip().lower(): name for name in fieldnames}
+    columns = {}
+
+    for field, aliases in INDEX_COLUMNS.items():
+        for alias in aliases:
+            if alias in lookup:
+                columns[field] = lookup[alias]
+                break
+
+    missing = [field for field in INDEX_COLUMNS if field not in columns]
+
+    if missing:
+        raise ValueError(
+            f"The index is missing column(s): {', '.join(missing)}."
+        )
+
+    return columns
+
+
+def iter_index(index_path):
+    """
+    Yield one {object_id, ein, tax_period, return_type} row per filing.
+
+    CSV indexes are streamed. JSON indexes are a list of filings, either
+    at the top level or under a single key such as "Filings2019".
+    """
+    if index_path.lower().endswith(".json"):
+        with open(index_path, encoding="utf-8") as f:
+            data = json.load(f)
+
+        if isinstance(data, dict):
+            data = next(
+                (value for value in data.values() if isinstance(value, list)),
+                []
+            )
+
+        if not data:
+            return
+
+        columns = column_map(data[0].keys())
+
+        for row in data:
+            yield {
+                field: str(row.get(column, "") or "")
+                for field, column in columns.items()
+            }
+
+        return
+
+    with open(index_path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+
+        if reader.fieldnames is None:
+            return
+
+        columns = column_map(reader.fieldnames)
+
+        for row in reader:
+            yield {
+                field: (row.get(column) or "").strip()
+                for field, column in columns.items()
+            }
+
+
+def validate_selection(index_path, eins, tax_years, return_types):
+    if index_path is None:
+        if eins is not None or tax_years is not None or return_types is not None:
+            raise ValueError(
+                "Selecting by EIN, tax year or return type needs an "
+                "index_file."
+            )
+        return
+
+    if not os.path.isfile(index_path):
+        raise ValueError(f"The index file does not exist:\n{index_path}")
+
+
+def select_filenames(
+    index_path,
+    eins=None,
+    tax_years=None,
+    return_types=None
+):
+    """
+    Return (file names, rows read) for the index rows that match.
+
+    ``eins`` is an iterable of EINs, ``tax_years`` an iterable of years
+    (for example range(2019, 2024)) and ``return_types`` an iterable such
+    as ("990",); None matches everything. Return types are compared the
+    way the prefilter reads them, so "990-EZ" matches "990EZ". File
+    names are lower case.
+    """
+    # A single value is accepted as well as a collection
+    if isinstance(eins, str):
+        eins = [eins]
+
+    if isinstance(tax_years, (int, str)):
+        tax_years = [tax_years]
+
+    if isinstance(return_types, str):
+        return_types = [return_types]
+
+    if eins is not None:
+        eins = {normalize_ein(ein) for ein in eins}
+
+    if tax_years is not None:
+        tax_years = {int(year) for year in tax_years}
+
+    if return_types is not None:
+        return_types = {
+            normalize_return_type(return_type)
+            for return_type in return_types
+        }
+
+    filenames = set()
+    rows = 0
+
+    for row in iter_index(index_path):
+        rows += 1
+
+        if eins is not None and normalize_ein(row["ein"]) not in eins:
+            continue
+
+        if (
+            tax_years is not None
+            and tax_year(row["tax_period"]) not in tax_years
+        ):
+            continue
+
+        if (
+            return_types is not None
+            and normalize_return_type(row["return_type"]) not in return_types
+        ):
+            continue
+
+        if row["object_id"]:
+            filenames.add(xml_filename(row["object_id"]).lower())
+
+    return filenames, rows
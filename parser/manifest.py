@@ -0,0 +1,185 @@
+"""
+Results-folder manifest for incremental runs.
+
+The manifest records, for every XML file that contributed to a results
+folder, its size, modification time, SHA-256 and the records it produced.
+A later incremental run only parses files that are new or whose contents
+changed, reuses the stored records for everything else, and drops the
+records of files that have been deleted.
+
+Rewriting the manifest costs as much as the whole results folder, so
+small updates (see parser.batch) are appended to a journal next to it
+instead. load_manifest applies the journal and save_manifest folds it
+into the manifest.
+"""
+
+import gzip
+import json
+import os
+import tempfile
+
+from parser.sources import source_key, source_sha256, source_stat
+
+
+MANIFEST_FILENAME = "manifest.json.gz"
+
+JOURNAL_FILENAME = "manifest.journal.jsonl"
+
+
+def manifest_path(results_dir):
+    return os.path.join(results_dir, MANIFEST_FILENAME)
+
+
+def journal_path(results_dir):
+    return os.path.join(results_dir, JOURNAL_FILENAME)
+
+
+def manifest_key(xml_file):
+    """Files (and archive members) are tracked by absolute path."""
+    return source_key(xml_file)
+
+
+def load_manifest(results_dir, version):
+    """
+    Return {path: entry} from a results folder's manifest.
+
+    A missing or unreadable manifest, or one written by a different
+    extractor version, yields an empty mapping (everything is reparsed).
+    Journal entries of the same extractor version are applied on top.
+    """
+    try:
+        with gzip.open(manifest_path(results_dir), "rt", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        data = {}
+
+    files = {}
+
+    if data.get("extractor_version") == version:
+        files = data.get("files", {})
+
+    try:
+        with open(journal_path(results_dir), encoding="utf-8") as f:
+            for line in f:
+                try:
+                    update = json.loads(line)
+                except ValueError:
+                    # A line cut short by a crash, and anything after it
+                    break
+
+                if update.get("extractor_version") != version:
+                    continue
+
+                for key, entry in update["files"].items():
+                    if entry is None:
+                        files.pop(key, None)
+                    else:
+                        files[key] = entry
+    except OSError:
+        pass
+
+    return files
+
+
+def save_manifest(results_dir, version, files):
+    """Write the manifest atomically."""
+    fd, tmp_path = tempfile.mkstemp(dir=results_dir, suffix=".tmp")
+
+    try:
+        with os.fdopen(fd, "wb") as raw, gzip.open(raw, "wt", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "extractor_version": version,
+                    "files": files,
+                },
+                f,
+                separators=(",", ":")
+            )
+
+        os.replace(tmp_path, manifest_path(results_dir))
+
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    # Everything in the journal is in the manifest now
+    try:
+        os.remove(journal_path(results_dir))
+    except OSError:
+        pass
+
+
+def update_manifest(results_dir, version, files):
+    """
+    Record changes to the manifest without rewriting it.
+
+    ``files`` maps keys to their new entries, or to None for files whose
+    records are gone. The changes are appended to the journal as one
+    line.
+    """
+    line = json.dumps(
+        {
+            "extractor_version": version,
+            "files": files,
+        },
+        separators=(",", ":")
+    )
+
+    with open(journal_path(results_dir), "a", encoding="utf-8") as f:
+        f.write(line + "\n")
+
+
+def file_signature(xml_file, sha256=None):
+    """Size, mtime and content hash of a file, as stored in the manifest."""
+    size, mtime_ns = source_stat(xml_file)
+
+    return {
+        "size": size,
+        "mtime_ns": mtime_ns,
+        "sha256": sha256 if sha256 is not None else source_sha256(xml_file),
+    }
+
+
+def plan_incremental(xml_files, previous):
+    """
+    Compare the current files against a previous manifest.
+
+    Size and mtime are checked first; only files whose stat changed are
+    hashed, so a touched but otherwise identical file is still reused.
+
+    Returns (reused, changed, deleted):
+        reused:  {xml_file: manifest entry} for unchanged files
+        changed: {xml_file: signature} for new or modified files
+        deleted: manifest keys whose files no longer exist
+    """
+    reused = {}
+    changed = {}
+
+    for xml_file in xml_files:
+        old = previous.get(manifest_key(xml_file))
+        size, mtime_ns = source_stat(xml_file)
+
+        if (
+            old is not None
+            and old["size"] == size
+            and old["mtime_ns"] == mtime_ns
+        ):
+            reused[xml_file] = old
+            continue
+
+        signature = file_signature(xml_file)
+
+        if old is not None and old["sha256"] == signature["sha256"]:
+            reused[xml_file] = dict(old, **signature)
+            continue
+
+        changed[xml_file] = signature
+
+    current = {manifest_key(xml_file) for xml_file in xml_files}
+
+    deleted = [key for key in previous if key not in current]
+
+    return reused, changed, deleted
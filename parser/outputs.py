@@ -0,0 +1,201 @@
+"""
+Writers for the parser's output tables.
+
+CSV is the default. "parquet" and "arrow" (Arrow IPC, the Feather v2 file
+format) write the same tables with typed columns, and dictionary-encode
+the text columns that repeat from row to row: organization names, EINs
+and the category columns.
+
+With partition_by_year, tables that have a ``year`` column are written as
+hive-partitioned datasets instead of single files: a folder named after
+the table with one ``year=YYYY`` subfolder per tax year, so readers can
+skip whole years and read only the columns they ask for.
+
+pyarrow is only needed for the columnar formats and is imported on
+first use.
+
+"sqlite" writes the tables into a single database instead of separate
+files; see parser.sqlite_store.
+"""
+
+import os
+import shutil
+
+import pandas as pd
+
+
+OUTPUT_FORMATS = ("csv", "parquet", "arrow", "sqlite")
+
+COLUMNAR_FORMATS = ("parquet", "arrow")
+
+FILE_EXTENSIONS = {
+    "csv": ".csv",
+    "parquet": ".parquet",
+    "arrow": ".arrow",
+}
+
+# Repeated text columns stored as dictionaries in the columnar formats
+DICTIONARY_COLUMNS = {
+    "org_id",
+    "org_name",
+    "ein",
+    "return_type",
+    "role",
+    "type",
+    "category_level",
+    "expense_category",
+    "revenue_category",
+    "business_code",
+}
+
+
+def validate_output_format(output_format, partition_by_year=False):
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(
+            f"Unknown output format: {output_format!r}. "
+            f"Use one of: {', '.join(OUTPUT_FORMATS)}."
+        )
+
+    if partition_by_year and output_format not in COLUMNAR_FORMATS:
+        raise ValueError(
+            "partition_by_year needs output_format='parquet' or 'arrow'."
+        )
+
+    # Fail before any parsing rather than when the first table is written
+    if output_format in COLUMNAR_FORMATS:
+        load_pyarrow()
+
+
+def load_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError(
+            "Parquet and Arrow output need the pyarrow package "
+            "(pip install pyarrow)."
+        ) from e
+
+    return pyarrow
+
+
+def output_path(results_dir, name, output_format, partitioned=False):
+    """Where a table is written: a file, or a folder when partitioned."""
+    if partitioned:
+        return os.path.join(results_dir, name)
+
+    return os.path.join(results_dir, name + FILE_EXTENSIONS[output_format])
+
+
+def to_arrow_table(df):
+    """Convert a DataFrame to an Arrow table with dictionary text columns."""
+    pa = load_pyarrow()
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    for index, field in enumerate(table.schema):
+        if (
+            field.name in DICTIONARY_COLUMNS
+            and not pa.types.is_dictionary(field.type)
+        ):
+            table = table.set_column(
+                index,
+                field.name,
+                table.column(index).dictionary_encode()
+            )
+
+    return table
+
+
+def remove_output(path):
+    """Clear a previous run's file or partition folder."""
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def write_table(
+    df,
+    results_dir,
+    name,
+    output_format="csv",
+    partition_by_year=False
+):
+    """
+    Write one output table and return the path written.
+
+    Only tables with a year column and at least one row are partitioned
+    (an empty dataset folder would carry no schema); the rest are written
+    as single files even when partition_by_year is set.
+    """
+    partitioned = (
+        partition_by_year
+        and "year" in df.columns
+        and not df.empty
+    )
+    path = output_path(results_dir, name, output_format, partitioned)
+
+    if output_format == "csv":
+        df.to_csv(path, index=False)
+        return path
+
+    pa = load_pyarrow()
+    table = to_arrow_table(df)
+
+    remove_output(path)
+
+    if partitioned:
+        import pyarrow.dataset
+
+        pyarrow.dataset.write_dataset(
+            table,
+            path,
+            format="parquet" if output_format == "parquet" else "ipc",
+            partitioning=pyarrow.dataset.partitioning(
+                pa.schema([table.schema.field("year")]),
+                flavor="hive"
+            )
+        )
+
+    elif output_format == "parquet":
+        import pyarrow.parquet
+
+        pyarrow.parquet.write_table(table, path)
+
+    else:
+        import pyarrow.feather
+
+        pyarrow.feather.write_feather(table, path)
+
+    return path
+
+
+def read_table(path, output_format="csv"):
+    """
+    Read back a single-file table written by write_table.
+
+    CSV values are read exactly as written: empty cells stay empty
+    strings and floats round-trip.
+    """
+    if output_format == "csv":
+        return pd.read_csv(
+            path,
+            dtype={"org_name": str, "type": str},
+            keep_default_na=False,
+            float_precision="round_trip"
+        )
+
+    load_pyarrow()
+
+    if output_format == "parquet":
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_feather(path)
+
+    # Dictionary columns come back as categoricals; use plain values so
+    # they concatenate with freshly built rows.
+    for column in df.columns:
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype(object)
+
+    return df
@@ -1,10 +1,200 @@
 import os
 import re
+import time
 import webbrowser
 import html
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+
 import pandas as pd
-from bs4 import BeautifulSoup
 
+from parser.analytics import (
+    DEFAULT_CHANGE_WINDOWS,
+    RATIO_COLUMNS,
+    add_financial_ratios,
+    build_financial_changes,
+    change_columns,
+    validate_change_windows,
+)
+from parser.cache import (
+    DEFAULT_MAX_BYTES as DEFAULT_CACHE_MAX_BYTES,
+    ParseCache,
+)
+from parser.checkpoint import Checkpoint, DEFAULT_CHECKPOINT_EVERY
+from parser.compensation import TopCompensation
+from parser.control import RunCancelled
+from parser.extract import extract_filing
+from parser.fields import FieldCoverage
+from parser.index import select_filenames, validate_selection
+from parser.manifest import (
+    load_manifest,
+    manifest_key,
+    manifest_path,
+    plan_incremental,
+    save_manifest,
+)
+from parser.prefilter import (
+    PrefixedReader,
+    RoutingCounts,
+    route_filing,
+    sniff_header,
+)
+from parser.outputs import (
+    output_path,
+    read_table,
+    validate_output_format,
+    write_table,
+)
+from parser.profiling import RunProfile, StageTimer
+from parser.report import SummaryReport
+from parser.sources import (
+    find_sources,
+    open_source,
+    plain_name,
+    source_name,
+    source_sha256,
+    source_size,
+)
+from parser.sqlite_store import SQLiteStore, database_path
+from parser.streaming import (
+    DEFAULT_CHUNK_ROWS,
+    SortedCSVWriter,
+    financial_chunk_with_ratios,
+    stream_financial_changes,
+)
+from parser.tables import TableBuilder
+
+# Identifies the records process_xml_file produces. Bump it whenever the
+# same XML would produce different records, so cached results are reparsed.
+EXTRACTOR_VERSION = "5"
+
+# Columns of orgs.csv; return_type is the form filed ("990", "990EZ"
+# or "990PF")
+ORGS_COLUMNS = [
+    "org_id",
+    "ein",
+    "org_name",
+    "year",
+    "return_type",
+    "voting_members",
+    "employees",
+]
+
+# Columns of people.csv
+PEOPLE_COLUMNS = [
+    "org_id",
+    "org_name",
+    "year",
+    "name",
+    "role",
+    "job_title",
+    "comp",
+    "reportable_comp",
+    "other_comp",
+    "total_comp",
+]
+
+# Columns of top_compensation.csv: the highest-paid people of each filing
+TOP_COMPENSATION_COLUMNS = [
+    "org_id",
+    "ein",
+    "org_name",
+    "year",
+    "rank",
+    "name",
+    "role",
+    "job_title",
+    "comp",
+    "reportable_comp",
+    "other_comp",
+    "total_comp",
+]
+
+# Columns of financial.csv, before the ratio columns are added
+FINANCIAL_COLUMNS = [
+    "org_id",
+    "ein",
+    "org_name",
+    "year",
+    "employees",
+    "total_revenue",
+    "total_expenses",
+    "salaries",
+    "rev_minus_exp",
+    "assets",
+    "liabilities",
+    "unrestricted_net_assets",
+    "program_expenses",
+]
+
+# Columns of expense_detail.csv
+EXPENSE_DETAIL_COLUMNS = [
+    "org_id",
+    "ein",
+    "org_name",
+    "year",
+    "expense_category",
+    "total_amount",
+    "program_services_amount",
+    "management_general_amount",
+    "fundraising_amount",
+    "share_of_total_expenses",
+    "program_services_share",
+]
+
+# Columns of revenue_detail.csv
+REVENUE_DETAIL_COLUMNS = [
+    "org_id",
+    "ein",
+    "org_name",
+    "year",
+    "category_level",
+    "revenue_category",
+    "business_code",
+    "amount",
+    "share_of_total_revenue",
+]
+
+
+# Columns of processing_errors.csv
+ERROR_COLUMNS = [
+    "filename",
+    "file_path",
+    "error",
+]
+
+
+# Columns of field_coverage.csv
+FIELD_COVERAGE_COLUMNS = [
+    "return_type",
+    "return_version",
+    "mapping",
+    "filings",
+    "field",
+    "hits",
+    "misses",
+]
+
+
+# Output order of the main tables: org_name ascending, newest year first
+SORT_KEYS = {
+    "people": lambda row: (row["org_name"], -row["year"]),
+    "top_compensation": lambda row: (
+        row["org_name"], -row["year"], row["rank"]
+    ),
+    "orgs": lambda row: (row["org_name"], -row["year"]),
+    "financial": lambda row: (row["org_name"], -row["year"]),
+    "expense_detail": lambda row: (
+        row["org_name"], -row["year"], -row["total_amount"]
+    ),
+    "revenue_detail": lambda row: (
+        row["org_name"], -row["year"], row["category_level"], -row["amount"]
+    ),
+    # Processing order; the streaming sort and merge are stable
+    "processing_errors": lambda row: 0,
+}
 
 
 def makedirs(directory):
@@ -18,28 +208,27 @@ def write_file(filename, content):
         output_file.write(content)
 
 
-def safe_text(parent, tag, default=""):
+def safe_text(values, tag, default=""):
     """
-    Safely retrieve text from an XML tag.
+    Safely retrieve the text extracted for an XML tag.
 
     Returns the default value if:
-    - parent is None
+    - values is None (the enclosing element was not found)
     - tag is not found
-    - tag has no text
     """
-    if parent is None:
+    if values is None:
         return default
 
-    el = parent.find(tag)
+    text = values.get(tag)
 
-    if el is None or el.text is None:
+    if text is None:
         return default
 
-    return el.text.strip()
+    return text
 
 
-def safe_int(parent, tag):
-    val = safe_text(parent, tag)
+def safe_int(values, tag):
+    val = safe_text(values, tag)
 
     try:
         return int(val)
@@ -94,28 +283,903 @@ def html_table(headers, rows):
     return f'<div class="table-wrap"><table><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table></div>'
 
 
-def find_xml_files(xml_dir):
+def find_xml_files(xml_dir, names=None):
+    """
+    List the XML sources in a folder, a ZIP archive or a list of both.
 
-    if not os.path.isdir(xml_dir):
-        raise ValueError(
-            f"The XML source folder does not exist or is not a folder:\n{xml_dir}"
+    Folders are listed by file name; members of ZIP archives are
+    returned as "archive.zip::member" sources (see parser.sources).
+    Gzip, bzip2 and Zstandard files (*.xml.gz, *.xml.bz2, *.xml.zst)
+    are listed too and decompressed as they are parsed.
+    With ``names``, only files with those (lower-case) names are listed.
+    """
+    return find_sources(xml_dir, names)
+
+
+def process_xml_file(xml_file, profile=False):
+    """
+    Parse one local Form 990 XML file into plain records.
+
+    This is the per-file unit of work. It has no side effects, so it can
+    run in a worker process; everything it produces is returned:
+
+        status:          "processed", "skipped" or "error"
+        messages:        progress lines for this file, in order
+        error:           processing_errors.csv row, or None
+        route:           where the prefilter sent the file: "990",
+                         "990EZ", "990PF" or a reason for skipping it
+                         (see parser.prefilter); None after an error
+        return_type:     ReturnTypeCd from the header ("" if missing)
+        return_version:  returnVersion of the Return element, or None if
+                         the file was skipped before its header was read
+        return_ts:       ReturnTs of the return header ("" if missing);
+                         with EIN and tax year it identifies a filing
+        found_fields:    registry fields present in the filing
+        org:             orgs.csv row
+        financial:       financial.csv row, without the ratio columns
+        people:          people.csv rows
+        top_compensation: top_compensation.csv rows, highest-paid first
+        revenue_detail:  revenue_detail.csv rows
+        expense_detail:  expense_detail.csv rows
+
+    With profile=True the result also carries a "profile" entry: the
+    file's size, total seconds and seconds per stage (see
+    parser.profiling).
+    """
+
+    filename = source_name(xml_file)
+
+    started = time.perf_counter()
+    timer = StageTimer() if profile else None
+
+    result = {
+        "status": "processed",
+        "messages": [],
+        "error": None,
+        "route": None,
+        "return_type": "",
+        "return_version": None,
+        "return_ts": None,
+        "found_fields": [],
+        "org": None,
+        "financial": None,
+        "people": [],
+        "top_compensation": [],
+        "revenue_detail": [],
+        "expense_detail": [],
+    }
+
+    messages = result["messages"]
+
+    def finish():
+        if timer is not None:
+            result["profile"] = {
+                "bytes": source_size(xml_file),
+                "seconds": time.perf_counter() - started,
+                "stages": timer.stages,
+            }
+        return result
+
+    def skip(message, error):
+        messages.append(message)
+        result["status"] = "skipped"
+        result["error"] = {
+            "filename": filename,
+            "file_path": xml_file,
+            "error": error
+        }
+        return finish()
+
+    try:
+
+        with open_source(xml_file) as source:
+
+            # -------------------------------------------------
+            # Read the return header and route the filing
+            # -------------------------------------------------
+
+            header, head = sniff_header(source)
+            route = route_filing(header)
+
+            result["route"] = route
+            result["return_type"] = header.return_type
+
+            if timer is not None:
+                timer.lap("prefilter")
+
+            if route == "no_return":
+
+                return skip(
+                    f"Skipping invalid XML: {filename} "
+                    "(Return element not found)",
+                    "Invalid Form 990 XML: Return element not found"
+                )
+
+            if route == "no_filer":
+
+                return skip(
+                    f"Skipping invalid XML: {filename} "
+                    "(Filer element not found)",
+                    "Filer element not found"
+                )
+
+            if route == "unsupported":
+
+                return skip(
+                    f"Skipping {filename}: Form {header.return_type} "
+                    f"(EIN {header.ein or 'unknown'}, tax year "
+                    f"{header.tax_year or 'unknown'}) is not supported",
+                    f"Unsupported return type: {header.return_type}"
+                )
+
+            # -------------------------------------------------
+            # Stream the rest of the file (or archive member)
+            # through the form's extractor in a single pass
+            # -------------------------------------------------
+
+            filing = extract_filing(
+                PrefixedReader(head, source),
+                timer,
+                route
+            )
+
+        if timer is not None:
+            timer.lap()
+
+        # -------------------------------------------------
+        # Validate XML
+        # -------------------------------------------------
+
+        if not filing.return_found:
+
+            result["route"] = "no_return"
+
+            return skip(
+                f"Skipping invalid XML: {filename} "
+                "(Return element not found)",
+                "Invalid Form 990 XML: Return element not found"
+            )
+
+        # -------------------------------------------------
+        # Filer information
+        # -------------------------------------------------
+
+        if not filing.filer_found:
+
+            result["route"] = "no_filer"
+
+            return skip(
+                f"Skipping invalid XML: {filename} "
+                "(Filer element not found)",
+                "Filer element not found"
+            )
+
+        values = filing.values
+
+        result["return_version"] = filing.return_version
+        result["return_ts"] = safe_text(values, "return_ts")
+        result["found_fields"] = list(values)
+
+        ein = safe_text(
+            values,
+            "ein"
+        )
+
+        org_name = safe_text(
+            values,
+            "org_name"
+        ).title()
+
+        year = int(
+            safe_text(
+                values,
+                "year",
+                0
+            )
+        )
+
+        # -------------------------------------------------
+        # Create organization ID
+        # -------------------------------------------------
+
+        org_id = re.sub(
+            "[^a-zA-Z0-9]",
+            "",
+            f"{org_name}_{year}"
+            .replace(" ", "_")
+            .lower()
         )
 
-    xml_files = []
+        # -------------------------------------------------
+        # Financial / organization information
+        # -------------------------------------------------
 
-    for filename in os.listdir(xml_dir):
-        full_path = os.path.join(xml_dir, filename)
+        voting_members = safe_int(
+            values,
+            "voting_members"
+        )
+
+        employees = safe_int(
+            values,
+            "employees"
+        )
+
+        total_revenue = safe_int(
+            values,
+            "total_revenue"
+        )
+
+        salaries = safe_int(
+            values,
+            "salaries"
+        )
+
+        total_expenses = safe_int(
+            values,
+            "total_expenses"
+        )
+
+        rev_minus_exp = safe_int(
+            values,
+            "rev_minus_exp"
+        )
+
+        assets = safe_int(
+            values,
+            "assets"
+        )
+
+        liabilities = safe_int(
+            values,
+            "liabilities"
+        )
 
-        if (
-            os.path.isfile(full_path)
-            and filename.lower().endswith(".xml")
-        ):
-            xml_files.append(full_path)
+        unrestricted_net_assets = safe_int(
+            values,
+            "unrestricted_net_assets"
+        )
+
+        program_expenses = safe_int(
+            values,
+            "program_expenses"
+        )
+
+        messages.append(
+            f"  Organization: {org_name}"
+        )
+
+        messages.append(
+            f"  Tax Year: {year}"
+        )
 
-    # Sort files alphabetically for predictable processing order
-    xml_files.sort(key=lambda x: os.path.basename(x).lower())
+        if timer is not None:
+            timer.lap("field_extraction")
 
-    return xml_files
+        # -------------------------------------------------
+        # Detailed revenue and expense categories
+        # -------------------------------------------------
+
+        revenue_rows = result["revenue_detail"]
+        expense_rows = result["expense_detail"]
+
+        # Broad Part VIII revenue categories.
+        broad_revenue_fields = [
+            ("Contributions and Grants", "contributions_grants"),
+            ("Program Service Revenue", "program_service_revenue"),
+            ("Investment Income", "investment_income"),
+            ("Other Revenue", "other_revenue"),
+        ]
+
+        for revenue_category, revenue_field in broad_revenue_fields:
+            amount = safe_int(values, revenue_field)
+            share = amount / total_revenue if total_revenue else 0
+            revenue_rows.append(
+                {
+                    "org_id": org_id,
+                    "ein": ein,
+                    "org_name": org_name,
+                    "year": year,
+                    "category_level": "broad_source",
+                    "revenue_category": revenue_category,
+                    "business_code": "",
+                    "amount": amount,
+                    "share_of_total_revenue": share,
+                }
+            )
+
+        # Named Part VIII program-service revenue sources.
+        for revenue_group in filing.groups:
+            if revenue_group.tag != "ProgramServiceRevenueGrp":
+                continue
+
+            revenue_category = safe_text(
+                revenue_group.values,
+                "Desc",
+                "Unnamed Program Service Revenue"
+            )
+            amount = safe_int(
+                revenue_group.values,
+                "TotalRevenueColumnAmt"
+            )
+            business_code = safe_text(revenue_group.values, "BusinessCd")
+            share = amount / total_revenue if total_revenue else 0
+            revenue_rows.append(
+                {
+                    "org_id": org_id,
+                    "ein": ein,
+                    "org_name": org_name,
+                    "year": year,
+                    "category_level": "program_service",
+                    "revenue_category": revenue_category,
+                    "business_code": business_code,
+                    "amount": amount,
+                    "share_of_total_revenue": share,
+                }
+            )
+
+        # Part IX functional-expense groups. Each group may report
+        # total, program-service, management/general, and fundraising.
+        expense_groups = []
+        for child in filing.groups:
+            if child.tag == "OtherExpensesGrp":
+                expense_groups.append(child)
+            elif (
+                child.tag.endswith("Grp")
+                and "TotalAmt" in child.children
+                and (
+                    "ProgramServicesAmt" in child.children
+                    or "ManagementAndGeneralAmt" in child.children
+                    or "FundraisingAmt" in child.children
+                )
+                and child.tag not in {
+                    "TotalFunctionalExpensesGrp",
+                    "TotalRevenueGrp",
+                }
+            ):
+                expense_groups.append(child)
+
+        for expense_group in expense_groups:
+            group_values = expense_group.values
+
+            if expense_group.tag == "OtherExpensesGrp":
+                expense_category = safe_text(
+                    group_values,
+                    "Desc",
+                    "Other Expense"
+                )
+            else:
+                expense_category = format_category_name(expense_group.tag)
+
+            total_amount = safe_int(group_values, "TotalAmt")
+            program_amount = safe_int(group_values, "ProgramServicesAmt")
+            management_amount = safe_int(
+                group_values,
+                "ManagementAndGeneralAmt"
+            )
+            fundraising_amount = safe_int(group_values, "FundraisingAmt")
+            share = total_amount / total_expenses if total_expenses else 0
+            program_share = (
+                program_amount / total_amount if total_amount else 0
+            )
+
+            expense_rows.append(
+                {
+                    "org_id": org_id,
+                    "ein": ein,
+                    "org_name": org_name,
+                    "year": year,
+                    "expense_category": expense_category,
+                    "total_amount": total_amount,
+                    "program_services_amount": program_amount,
+                    "management_general_amount": management_amount,
+                    "fundraising_amount": fundraising_amount,
+                    "share_of_total_expenses": share,
+                    "program_services_share": program_share,
+                }
+            )
+
+        if timer is not None:
+            timer.lap("detail_groups")
+
+        # -------------------------------------------------
+        # People & compensation
+        # -------------------------------------------------
+
+        people_rows = result["people"]
+        top_compensation = TopCompensation()
+
+        for x in filing.people:
+
+            name = safe_text(
+                x.values,
+                "PersonNm",
+                "Unknown"
+            ).title()
+
+            job_title = safe_text(
+                x.values,
+                "TitleTxt",
+                "Unknown"
+            ).title()
+
+            if filing.return_type == "990":
+
+                comp = safe_int(
+                    x.values,
+                    "ReportableCompFromOrgAmt"
+                )
+
+                reportable_comp = safe_int(
+                    x.values,
+                    "ReportableCompFromRltdOrgAmt"
+                )
+
+                other_comp = safe_int(
+                    x.values,
+                    "OtherCompensationAmt"
+                )
+
+                tag_names = x.children
+
+                role = (
+                    "Board Member"
+                    if (
+                        "IndividualTrusteeOrDirectorInd"
+                        in tag_names
+                        or
+                        "InstitutionalTrusteeInd"
+                        in tag_names
+                    )
+                    else "Employee"
+                )
+
+            else:
+
+                # 990-EZ and 990-PF list officers, directors, trustees
+                # and key employees together, with benefits and expense
+                # allowances instead of related-organization pay.
+                comp = safe_int(
+                    x.values,
+                    "CompensationAmt"
+                )
+
+                reportable_comp = 0
+
+                other_comp = (
+                    safe_int(x.values, "EmployeeBenefitProgramAmt")
+                    + safe_int(x.values, "ExpenseAccountOtherAllwncAmt")
+                )
+
+                role = "Officer/Director"
+
+            total_comp = (
+                comp
+                + reportable_comp
+                + other_comp
+            )
+
+            person = {
+                "org_id": org_id,
+                "org_name": org_name,
+                "year": year,
+                "name": name,
+                "role": role,
+                "job_title": job_title,
+                "comp": comp,
+                "reportable_comp": reportable_comp,
+                "other_comp": other_comp,
+                "total_comp": total_comp
+            }
+
+            people_rows.append(person)
+            top_compensation.add(person)
+
+        if timer is not None:
+            timer.lap("people")
+
+        # -------------------------------------------------
+        # Highest compensation
+        # -------------------------------------------------
+
+        result["top_compensation"] = [
+            {
+                "org_id": org_id,
+                "ein": ein,
+                "org_name": org_name,
+                "year": year,
+                "rank": rank,
+                "name": person["name"],
+                "role": person["role"],
+                "job_title": person["job_title"],
+                "comp": person["comp"],
+                "reportable_comp": person["reportable_comp"],
+                "other_comp": person["other_comp"],
+                "total_comp": person["total_comp"],
+            }
+            for rank, person in enumerate(top_compensation.ranked(), 1)
+        ]
+
+        result["org"] = {
+            "org_id": org_id,
+            "ein": ein,
+            "org_name": org_name,
+            "year": year,
+            "return_type": filing.return_type,
+            "voting_members": voting_members,
+            "employees": employees
+        }
+
+        result["financial"] = {
+            "org_id": org_id,
+            "ein": ein,
+            "org_name": org_name,
+            "year": year,
+            "employees": employees,
+            "total_revenue": total_revenue,
+            "total_expenses": total_expenses,
+            "salaries": salaries,
+            "rev_minus_exp": rev_minus_exp,
+            "assets": assets,
+            "liabilities": liabilities,
+            "unrestricted_net_assets": unrestricted_net_assets,
+            "program_expenses": program_expenses
+        }
+
+        messages.append(
+            f"  Successfully processed: "
+            f"{org_name} - {year}"
+        )
+
+    except Exception as e:
+
+        error_message = str(e)
+
+        messages.append(
+            f"  ERROR processing {filename}: "
+            f"{error_message}"
+        )
+
+        result["status"] = "error"
+        result["error"] = {
+            "filename": filename,
+            "file_path": xml_file,
+            "error": error_message
+        }
+
+    return finish()
+
+
+def cached_process_xml_file(xml_file, cache_dir, profile=False):
+    """
+    process_xml_file backed by the content-addressed parse cache.
+
+    Successfully processed files are stored under the SHA-256 of their
+    bytes, so a file that has not changed is loaded instead of parsed.
+    Skipped and failed files are always parsed again, since their
+    messages name the file.
+    """
+    started = time.perf_counter()
+
+    cache = ParseCache(cache_dir, EXTRACTOR_VERSION)
+    key = cache.key(source_sha256(xml_file))
+
+    result = cache.get(key)
+
+    if result is not None:
+        result["cache_hit"] = True
+
+        if profile:
+            seconds = time.perf_counter() - started
+            result["profile"] = {
+                "bytes": source_size(xml_file),
+                "seconds": seconds,
+                "stages": {"cache_read": seconds},
+            }
+
+        return result
+
+    result = process_xml_file(xml_file, profile)
+
+    if result["status"] == "processed":
+        cache.put(key, without_profile(result))
+
+    return result
+
+
+def without_profile(result):
+    """A result as stored in the parse cache and the manifest."""
+    if "profile" not in result:
+        return result
+
+    return {
+        key: value
+        for key, value in result.items()
+        if key != "profile"
+    }
+
+
+def summary_detail_rows(revenue_rows, expense_rows, top_compensation):
+    """Pick the detail rows shown on a filing's summary card."""
+
+    top_expenses = sorted(
+        expense_rows,
+        key=lambda row: row["total_amount"],
+        reverse=True
+    )[:10]
+    top_revenue_sources = sorted(
+        [
+            row for row in revenue_rows
+            if row["category_level"] == "broad_source"
+        ],
+        key=lambda row: row["amount"],
+        reverse=True
+    )
+    top_program_revenue = sorted(
+        [
+            row for row in revenue_rows
+            if row["category_level"] == "program_service"
+        ],
+        key=lambda row: row["amount"],
+        reverse=True
+    )[:10]
+
+    return (
+        top_expenses,
+        top_revenue_sources,
+        top_program_revenue,
+        top_compensation
+    )
+
+
+def build_summary_card(org, financial, detail_rows):
+    """
+    Render the summary.html section for one processed filing.
+
+    ``financial`` must include the ratio columns; ``detail_rows`` comes
+    from summary_detail_rows().
+    """
+
+    (
+        top_expenses,
+        top_revenue_sources,
+        top_program_revenue,
+        top_compensation
+    ) = detail_rows
+
+    expense_table = html_table(
+        ["Expense category", "Total", "% of expenses", "Program", "Management", "Fundraising"],
+        [
+            [
+                row["expense_category"],
+                f'${row["total_amount"]:,}',
+                f'{row["share_of_total_expenses"]:.1%}',
+                f'${row["program_services_amount"]:,}',
+                f'${row["management_general_amount"]:,}',
+                f'${row["fundraising_amount"]:,}',
+            ]
+            for row in top_expenses
+        ]
+    )
+
+    revenue_table = html_table(
+        ["Revenue source", "Amount", "% of revenue"],
+        [
+            [
+                row["revenue_category"],
+                f'${row["amount"]:,}',
+                f'{row["share_of_total_revenue"]:.1%}',
+            ]
+            for row in top_revenue_sources
+        ]
+    )
+
+    program_revenue_table = html_table(
+        ["Program revenue source", "Amount", "% of revenue"],
+        [
+            [
+                row["revenue_category"],
+                f'${row["amount"]:,}',
+                f'{row["share_of_total_revenue"]:.1%}',
+            ]
+            for row in top_program_revenue
+        ]
+    )
+
+    compensation_table = html_table(
+        ["Rank", "Name", "Title", "Role", "Total compensation"],
+        [
+            [
+                row["rank"],
+                row["name"],
+                row["job_title"],
+                row["role"],
+                f'${row["total_comp"]:,}',
+            ]
+            for row in top_compensation
+        ]
+    )
+
+    return f"""
+            <section class="organization-card" id="{org["org_id"]}">
+                <h2>{org["org_name"]} - {org["year"]}</h2>
+
+                <h3>Organization Overview</h3>
+                <ul>
+                    <li><b>Tax Year:</b> {org["year"]}</li>
+                    <li><b>EIN:</b> {org["ein"]}</li>
+                    <li><b>Voting Members:</b> {org["voting_members"]:,}</li>
+                    <li><b>Employees:</b> {org["employees"]:,}</li>
+                </ul>
+
+                <h3>Financial Overview</h3>
+                <ul>
+                    <li><b>Total Revenue:</b> ${financial["total_revenue"]:,}</li>
+                    <li><b>Total Expenses:</b> ${financial["total_expenses"]:,}</li>
+                    <li><b>Revenue Less Expenses:</b> ${financial["rev_minus_exp"]:,}</li>
+                    <li><b>Salaries and Employee Benefits:</b> ${financial["salaries"]:,}</li>
+                    <li><b>Program Service Expenses:</b> ${financial["program_expenses"]:,}</li>
+                    <li><b>Total Assets:</b> ${financial["assets"]:,}</li>
+                    <li><b>Total Liabilities:</b> ${financial["liabilities"]:,}</li>
+                    <li><b>Unrestricted Net Assets:</b> ${financial["unrestricted_net_assets"]:,}</li>
+                </ul>
+
+                <h3>Financial Ratios</h3>
+                <ul>
+                    <li><b>Current Ratio:</b> {financial["current_ratio"]:.3f}</li>
+                    <li><b>Debt Ratio:</b> {financial["debt_ratio"]:.3f}</li>
+                    <li><b>Savings Indicator Ratio:</b> {financial["savings_indicator_ratio"]:.1%}</li>
+                    <li><b>Operating Margin:</b> {financial["operating_margin"]:.1%}</li>
+                    <li><b>Program Expense Ratio:</b> {financial["program_expense_ratio"]:.1%}</li>
+                </ul>
+
+                <h3>Largest Expense Categories</h3>
+                {expense_table}
+
+                <h3>Revenue Sources</h3>
+                {revenue_table}
+
+                <h3>Program Service Revenue Sources</h3>
+                {program_revenue_table}
+
+                <h3>Highest Compensation</h3>
+                {compensation_table}
+            </section>
+            """
+
+
+def patch_financial_changes(
+    financial_changes_path,
+    df_financial,
+    affected_orgs,
+    windows=DEFAULT_CHANGE_WINDOWS,
+    output_format="csv"
+):
+    """
+    Update an existing financial_changes table for an incremental run.
+
+    Rows of unaffected organizations are kept as written; rows of the
+    affected organizations are recomputed from df_financial. Falls back
+    to a full rebuild if the existing file cannot be read or was written
+    with different change windows.
+    """
+    try:
+        df_existing = read_table(financial_changes_path, output_format)
+    except (OSError, ValueError, pd.errors.EmptyDataError):
+        return build_financial_changes(df_financial, windows)
+
+    if list(df_existing.columns) != change_columns(windows):
+        return build_financial_changes(df_financial, windows)
+
+    df_kept = df_existing[
+        ~df_existing["org_name"].isin(affected_orgs)
+    ]
+
+    df_recomputed = build_financial_changes(
+        df_financial[
+            df_financial["org_name"].isin(affected_orgs)
+        ],
+        windows
+    )
+
+    if df_recomputed.empty:
+        return df_kept
+
+    if df_kept.empty:
+        return df_recomputed
+
+    # Organizations appear in org_name order, each one's rows together
+    return pd.concat(
+        [df_kept, df_recomputed],
+        ignore_index=True
+    ).sort_values(
+        "org_name",
+        kind="stable"
+    )
+
+
+def open_store(results_dir):
+    """The SQLite store of a results folder, with the parser's tables."""
+    return SQLiteStore(
+        database_path(results_dir),
+        {
+            "orgs": ORGS_COLUMNS,
+            "people": PEOPLE_COLUMNS,
+            "top_compensation": TOP_COMPENSATION_COLUMNS,
+            "financial": FINANCIAL_COLUMNS + RATIO_COLUMNS,
+            "expense_detail": EXPENSE_DETAIL_COLUMNS,
+            "revenue_detail": REVENUE_DETAIL_COLUMNS,
+        }
+    )
+
+
+def iter_file_results(
+    xml_files,
+    workers=1,
+    cache_dir=None,
+    profile=False,
+    executor=None
+):
+    """
+    Yield process_xml_file results in file order.
+
+    With workers > 1 the files are parsed in a process pool. Only a small
+    window of files is in flight at once, so results never pile up in
+    memory while an earlier, slower file is still being parsed.
+
+    An ``executor`` that is already running (see parser.watch) is used
+    instead of a new pool and left running afterwards.
+
+    With a cache_dir, unchanged files are loaded from the parse cache.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if cache_dir is not None:
+        task = partial(
+            cached_process_xml_file,
+            cache_dir=cache_dir,
+            profile=profile
+        )
+    else:
+        task = partial(process_xml_file, profile=profile)
+
+    if executor is not None:
+        yield from iter_pool_results(executor, task, xml_files, workers)
+        return
+
+    if workers <= 1:
+        for xml_file in xml_files:
+            yield task(xml_file)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from iter_pool_results(executor, task, xml_files, workers)
+
+
+def iter_pool_results(executor, task, xml_files, workers):
+    """Run task over xml_files in executor, a window at a time, in order."""
+    files = iter(xml_files)
+
+    pending = deque(
+        executor.submit(task, xml_file)
+        for xml_file in islice(files, max(workers, 1) * 4)
+    )
+
+    try:
+        while pending:
+            result = pending.popleft().result()
+
+            for xml_file in islice(files, 1):
+                pending.append(
+                    executor.submit(task, xml_file)
+                )
+
+            yield result
+
+    finally:
+        # A run that stops early does not wait for queued files
+        for future in pending:
+            future.cancel()
 
 
 def run_990_parser(
@@ -123,14 +1187,47 @@ def run_990_parser(
     results_dir,
     show_board="Yes",
     show_staff="Yes",
-    progress_callback=None
+    progress_callback=None,
+    workers=1,
+    cache_dir=None,
+    cache_max_bytes=DEFAULT_CACHE_MAX_BYTES,
+    incremental=False,
+    change_windows=DEFAULT_CHANGE_WINDOWS,
+    profile=False,
+    output_format="csv",
+    partition_by_year=False,
+    streaming=False,
+    chunk_rows=DEFAULT_CHUNK_ROWS,
+    html_pages=False,
+    index_file=None,
+    eins=None,
+    tax_years=None,
+    return_types=None,
+    event_callback=None,
+    control=None,
+    checkpoint=False,
+    checkpoint_every=DEFAULT_CHECKPOINT_EVERY,
+    open_browser=True,
+    executor=None
 ):
     """
     Parse Form 990 XML files stored in a local directory.
 
+    The return header of every file is read first (see parser.prefilter).
+    Form 990, 990-EZ and 990-PF filings go to their own extractors;
+    other return types and files without a Return or Filer element are
+    skipped without a full parse.
+
     Args:
         xml_dir:
-            Folder containing downloaded Form 990 XML files.
+            Folder containing downloaded Form 990 XML files, a ZIP
+            archive of them (such as the IRS bulk downloads), or a list
+            of folders and archives. Archive members are read straight
+            from the archive, and archives inside a folder are read
+            too. processing_errors.csv names the member and gives its
+            path as "archive.zip::member". Files may be compressed
+            one by one (*.xml.gz, *.xml.bz2, *.xml.zst); they are
+            decompressed while they are parsed.
 
         results_dir:
             Folder where output files will be written.
@@ -146,15 +1243,137 @@ def run_990_parser(
         progress_callback:
             Optional function used by the GUI to receive status messages.
 
+        event_callback:
+            Optional function that receives structured progress events
+            (dicts): the run's start with the number and total size of
+            the files to parse, one event per parsed file and the
+            finish. See parser.progress.
+
+        control:
+            Optional parser.control.RunControl. Another thread can
+            pause the run with it, or cancel it; a cancelled run stops
+            between files and raises RunCancelled without writing
+            outputs.
+
+        checkpoint:
+            Save the records of parsed files to checkpoint.jsonl.gz in
+            results_dir every checkpoint_every files, and when the run
+            is cancelled or fails. A later run with checkpoint=True
+            resumes from it instead of parsing those files again. The
+            checkpoint is removed when the run completes (see
+            parser.checkpoint).
+
+        checkpoint_every:
+            Parsed files between two checkpoints.
+
+        workers:
+            Number of processes used to parse files. The default of 1
+            parses in the calling process; None uses every CPU core.
+            Results are always merged in file order.
+
+        executor:
+            Optional running ProcessPoolExecutor to parse in, for callers
+            that keep a warm pool across runs (see parser.watch). It is
+            not shut down; workers sets how many files are queued.
+
+        cache_dir:
+            Optional folder for the parse cache. Files whose bytes have
+            not changed since an earlier run are loaded from the cache
+            instead of being parsed again.
+
+        cache_max_bytes:
+            Size cap of the parse cache. Least recently used entries are
+            evicted at the end of a run that takes it over the cap.
+
+        incremental:
+            Keep a manifest of every source file and the rows it produced
+            in results_dir. Later incremental runs parse only new or
+            changed files, drop rows from deleted files, rebuild the
+            outputs from the stored rows and recompute
+            financial_changes.csv only for the affected organizations.
+
+        change_windows:
+            Comparisons written to financial_changes.csv. Any of
+            "overall" (first vs. last year), "year_to_year", a whole
+            number of years N (each filing vs. the one N tax years
+            earlier) and "cagr" (adds compound annual growth columns).
+
+        profile:
+            Time every stage of every file and of the run, and write
+            run_profile.json with a per-stage summary, the slowest
+            files and per-file durations and sizes.
+
+        output_format:
+            "csv" (default), "parquet" or "arrow" (Arrow IPC) for the
+            people, top_compensation, orgs, financial,
+            financial_changes, expense_detail and revenue_detail
+            tables. The columnar formats need
+            pyarrow and store repeated text columns as dictionaries.
+            "sqlite" upserts the tables into form990.sqlite, keyed on
+            EIN, tax year and return timestamp; filings stored by
+            earlier runs are kept, and financial_changes is recomputed
+            only for the organizations a run touches.
+
+        partition_by_year:
+            With a columnar output_format, write every table that has a
+            year column as a folder with one year=YYYY partition per tax
+            year instead of a single file.
+
+        streaming:
+            Keep memory bounded on very large corpora. Rows are sorted
+            in chunks that are spilled to disk and merged into the CSVs
+            at the end, summary cards and processing errors are
+            spooled to disk, and financial_changes.csv is built from
+            the sorted financial.csv. Output is the same as a normal
+            CSV run. Cannot be combined with incremental, whose
+            manifest keeps every file's rows until the run ends.
+
+        chunk_rows:
+            With streaming, the rows each table buffers before they are
+            sorted and spilled to disk. Memory grows with it (about a
+            gigabyte over all tables at the default; see
+            parser.streaming), smaller values write more run files.
+
+        html_pages:
+            Split the HTML report: one page per organization (by EIN)
+            in summary_pages/, and summary.html as an index linking
+            every filing to its card.
+
+        index_file:
+            Optional IRS e-file index (CSV or JSON) for the source.
+            With it, only filings matching eins, tax_years and
+            return_types are opened; the rest of the source is never
+            read (see parser.index).
+
+        eins:
+            EINs to select from the index, e.g. ["12-3456789"].
+
+        tax_years:
+            Tax years to select from the index, e.g. range(2019, 2024).
+
+        return_types:
+            Return types to select from the index, e.g. ["990"].
+
+        open_browser:
+            Open summary.html in the web browser when the run is done.
+            Turn off on servers and in scheduled jobs.
+
     Generates:
         - people.csv
+        - top_compensation.csv (the highest-paid people of each filing)
         - orgs.csv
         - financial.csv
         - financial_changes.csv
         - expense_detail.csv
         - revenue_detail.csv
+          (.parquet or .arrow files, or partition folders, for the
+          columnar output formats; one form990.sqlite database for
+          output_format="sqlite")
+        - field_coverage.csv
         - summary.html
+        - summary_pages/ (only with html_pages=True)
         - processing_errors.csv (only if errors occur)
+        - run_profile.json (only with profile=True)
 
     Returns:
         Dictionary containing the paths to generated output files.
@@ -170,6 +1389,34 @@ def run_990_parser(
         if progress_callback is not None:
             progress_callback(message)
 
+    def emit(event, **values):
+        if event_callback is not None:
+            event_callback({"event": event, **values})
+
+    validate_change_windows(change_windows)
+    validate_output_format(output_format, partition_by_year)
+    validate_selection(index_file, eins, tax_years, return_types)
+
+    if streaming and output_format != "csv":
+        raise ValueError("streaming=True writes CSV output only.")
+
+    if chunk_rows < 1:
+        raise ValueError("chunk_rows must be at least 1.")
+
+    # The manifest holds every file's rows until it is saved
+    if streaming and incremental:
+        raise ValueError(
+            "streaming=True cannot be combined with incremental=True."
+        )
+
+    if checkpoint and checkpoint_every < 1:
+        raise ValueError("checkpoint_every must be at least 1.")
+
+    if cache_max_bytes < 0:
+        raise ValueError("cache_max_bytes must be 0 or more.")
+
+    profiler = RunProfile()
+
     # ---------------------------------------------------------
     # Create output directory
     # ---------------------------------------------------------
@@ -185,806 +1432,483 @@ def run_990_parser(
         "summary.html"
     )
 
-    people_csv = os.path.join(
-        results_dir,
-        "people.csv"
-    )
-
-    orgs_csv = os.path.join(
-        results_dir,
-        "orgs.csv"
-    )
+    # output_format="sqlite" keeps financial_changes in the database
+    financial_changes_path = None
 
-    financial_csv = os.path.join(
-        results_dir,
-        "financial.csv"
-    )
-
-    financial_changes_csv = os.path.join(
-        results_dir,
-        "financial_changes.csv"
-    )
-
-    expense_detail_csv = os.path.join(
-        results_dir,
-        "expense_detail.csv"
-    )
+    if output_format != "sqlite":
+        financial_changes_path = output_path(
+            results_dir,
+            "financial_changes",
+            output_format
+        )
 
-    revenue_detail_csv = os.path.join(
+    errors_csv = os.path.join(
         results_dir,
-        "revenue_detail.csv"
+        "processing_errors.csv"
     )
 
-    errors_csv = os.path.join(
+    field_coverage_csv = os.path.join(
         results_dir,
-        "processing_errors.csv"
+        "field_coverage.csv"
     )
 
     # ---------------------------------------------------------
     # Find XML files
     # ---------------------------------------------------------
 
-    xml_files = find_xml_files(xml_dir)
+    selected = None
+
+    if index_file is not None:
+
+        selected, index_rows = select_filenames(
+            index_file,
+            eins=eins,
+            tax_years=tax_years,
+            return_types=return_types
+        )
+
+        report(
+            f"Index: selected {len(selected)} of {index_rows} filing(s)."
+        )
+
+    xml_files = find_xml_files(xml_dir, selected)
 
     if not xml_files:
         raise ValueError(
             "No XML files were found in the selected source folder."
+            if selected is None
+            else "None of the filings selected from the index were "
+                 "found in the selected source."
+        )
+
+    if selected is not None:
+
+        missing = len(selected) - len(
+            {
+                plain_name(source_name(xml_file)).lower()
+                for xml_file in xml_files
+            }
         )
 
+        if missing:
+            report(
+                f"{missing} selected filing(s) were not found in the "
+                f"source."
+            )
+
     report(
         f"Found {len(xml_files)} XML file(s) in source folder."
     )
 
     # ---------------------------------------------------------
-    # Initialize DataFrames
+    # Initialize output tables
     # ---------------------------------------------------------
 
-    df_orgs = pd.DataFrame(
-        columns=[
-            "org_id",
-            "ein",
-            "org_name",
-            "year",
-            "voting_members",
-            "employees",
-            "highest_comp_name",
-            "highest_comp_title",
-            "highest_comp_amount"
-        ]
-    )
-
-    df_people = pd.DataFrame(
-        columns=[
-            "org_id",
-            "org_name",
-            "year",
-            "name",
-            "role",
-            "job_title",
-            "comp",
-            "reportable_comp",
-            "other_comp",
-            "total_comp"
-        ]
-    )
-
-    df_report = pd.DataFrame(
-        columns=[
-            "org_id",
-            "summary_text"
-        ]
-    )
-
-    df_financial = pd.DataFrame(
-        columns=[
-            "org_id",
-            "ein",
-            "org_name",
-            "year",
-            "employees",
-            "total_revenue",
-            "total_expenses",
-            "salaries",
-            "rev_minus_exp",
-            "assets",
-            "liabilities",
-            "unrestricted_net_assets",
-            "program_expenses",
-            "current_ratio",
-            "debt_ratio",
-            "savings_indicator_ratio",
-            "operating_margin",
-            "program_expense_ratio"
-        ]
-    )
-
-    df_expense_detail = pd.DataFrame(
-        columns=[
-            "org_id", "ein", "org_name", "year", "expense_category",
-            "total_amount", "program_services_amount",
-            "management_general_amount", "fundraising_amount",
-            "share_of_total_expenses", "program_services_share"
-        ]
-    )
+    store = None
 
-    df_revenue_detail = pd.DataFrame(
-        columns=[
-            "org_id", "ein", "org_name", "year", "category_level",
-            "revenue_category", "business_code", "amount",
-            "share_of_total_revenue"
-        ]
+    summary_report = SummaryReport(
+        html_filename,
+        build_summary_card,
+        FINANCIAL_COLUMNS,
+        pages=html_pages
     )
 
-    # ---------------------------------------------------------
-    # Track processing errors
-    # ---------------------------------------------------------
-
-    error_rows = []
-
-    processed_count = 0
-    skipped_count = 0
-    error_count = 0
+    if streaming:
 
-    # ---------------------------------------------------------
-    # Process each local XML file
-    # ---------------------------------------------------------
+        def sorted_writer(name, columns, **kwargs):
+            return SortedCSVWriter(
+                output_path(results_dir, name, "csv"),
+                columns,
+                SORT_KEYS[name],
+                chunk_rows=chunk_rows,
+                **kwargs
+            )
 
-    for index, xml_file in enumerate(xml_files, start=1):
+        orgs_table = sorted_writer("orgs", ORGS_COLUMNS)
 
-        filename = os.path.basename(xml_file)
+        people_table = sorted_writer("people", PEOPLE_COLUMNS)
 
-        report(
-            f"Processing file {index}/{len(xml_files)}: {filename}"
+        top_compensation_table = sorted_writer(
+            "top_compensation",
+            TOP_COMPENSATION_COLUMNS
         )
 
-        try:
+        financial_table = sorted_writer(
+            "financial",
+            FINANCIAL_COLUMNS + RATIO_COLUMNS,
+            float_columns=RATIO_COLUMNS,
+            prepare_chunk=financial_chunk_with_ratios(FINANCIAL_COLUMNS)
+        )
 
-            # -------------------------------------------------
-            # Read local XML file
-            # -------------------------------------------------
+        expense_detail_table = sorted_writer(
+            "expense_detail",
+            EXPENSE_DETAIL_COLUMNS,
+            float_columns=("share_of_total_expenses", "program_services_share")
+        )
 
-            with open(
-                xml_file,
-                "rb"
-            ) as f:
+        revenue_detail_table = sorted_writer(
+            "revenue_detail",
+            REVENUE_DETAIL_COLUMNS,
+            float_columns=("share_of_total_revenue",)
+        )
 
-                xml_content = f.read()
+    elif output_format == "sqlite":
 
-            soup = BeautifulSoup(
-                xml_content,
-                "xml"
-            )
+        store = open_store(results_dir)
 
-            # -------------------------------------------------
-            # Validate XML
-            # -------------------------------------------------
+    else:
 
-            if not soup.find("Return"):
+        orgs_table = TableBuilder(ORGS_COLUMNS)
 
-                message = (
-                    f"Skipping invalid XML: {filename} "
-                    "(Return element not found)"
-                )
+        people_table = TableBuilder(PEOPLE_COLUMNS)
 
-                report(message)
+        top_compensation_table = TableBuilder(TOP_COMPENSATION_COLUMNS)
 
-                error_rows.append(
-                    {
-                        "filename": filename,
-                        "file_path": xml_file,
-                        "error": "Invalid Form 990 XML: Return element not found"
-                    }
-                )
+        financial_table = TableBuilder(FINANCIAL_COLUMNS)
 
-                skipped_count += 1
+        expense_detail_table = TableBuilder(EXPENSE_DETAIL_COLUMNS)
 
-                continue
-
-            # -------------------------------------------------
-            # Filer information
-            # -------------------------------------------------
+        revenue_detail_table = TableBuilder(REVENUE_DETAIL_COLUMNS)
 
-            filer = soup.find("Filer")
+    # ---------------------------------------------------------
+    # Track processing errors
+    # ---------------------------------------------------------
 
-            if filer is None:
+    if streaming:
+        error_rows = sorted_writer("processing_errors", ERROR_COLUMNS)
+    else:
+        error_rows = []
 
-                message = (
-                    f"Skipping invalid XML: {filename} "
-                    "(Filer element not found)"
-                )
+    processed_count = 0
+    skipped_count = 0
+    error_count = 0
 
-                report(message)
+    # Per-form and returnVersion hit/miss counts for the field registry
+    field_coverage = FieldCoverage()
 
-                error_rows.append(
-                    {
-                        "filename": filename,
-                        "file_path": xml_file,
-                        "error": "Filer element not found"
-                    }
-                )
+    # Where the prefilter sent each file
+    routing = RoutingCounts()
 
-                skipped_count += 1
+    cache_hits = 0
+    cache_misses = 0
 
-                continue
+    # ---------------------------------------------------------
+    # Incremental mode: reuse rows from the previous manifest
+    # ---------------------------------------------------------
 
-            ein = safe_text(
-                filer,
-                "EIN"
-            )
+    previous_manifest = {}
+    reused = {}
+    changed = {}
+    manifest_files = {}
+    affected_orgs = set()
 
-            org_name = safe_text(
-                filer,
-                "BusinessName"
-            ).title()
+    if incremental:
 
-            year = int(
-                safe_text(
-                    soup,
-                    "TaxYr",
-                    0
-                )
-            )
+        previous_manifest = load_manifest(
+            results_dir,
+            EXTRACTOR_VERSION
+        )
 
-            # -------------------------------------------------
-            # Create organization ID
-            # -------------------------------------------------
+        reused, changed, deleted = plan_incremental(
+            xml_files,
+            previous_manifest
+        )
 
-            org_id = re.sub(
-                "[^a-zA-Z0-9]",
-                "",
-                f"{org_name}_{year}"
-                .replace(" ", "_")
-                .lower()
-            )
+        files_to_parse = [
+            xml_file
+            for xml_file in xml_files
+            if xml_file in changed
+        ]
 
-            # -------------------------------------------------
-            # Financial / organization information
-            # -------------------------------------------------
+        # Organizations whose old rows are replaced or removed
+        for key in deleted + [manifest_key(f) for f in files_to_parse]:
+            old = previous_manifest.get(key)
 
-            voting_members = safe_int(
-                soup,
-                "VotingMembersGoverningBodyCnt"
-            )
+            if old is not None and old["result"]["org"] is not None:
+                affected_orgs.add(old["result"]["org"]["org_name"])
 
-            employees = safe_int(
-                soup,
-                "TotalEmployeeCnt"
-            )
+        report(
+            f"Incremental run: {len(files_to_parse)} new or changed, "
+            f"{len(reused)} unchanged, {len(deleted)} deleted file(s)."
+        )
 
-            total_revenue = safe_int(
-                soup,
-                "CYTotalRevenueAmt"
+        # A changed file may now hold a filing with another key (EIN,
+        # year, ReturnTs); drop what it stored before it is added again
+        if store is not None:
+            store.remove_sources(
+                deleted
+                + [
+                    manifest_key(xml_file)
+                    for xml_file in files_to_parse
+                    if manifest_key(xml_file) in previous_manifest
+                ]
             )
 
-            salaries = safe_int(
-                soup,
-                "CYSalariesCompEmpBnftPaidAmt"
-            )
+    else:
 
-            total_expenses = safe_int(
-                soup,
-                "CYTotalExpensesAmt"
-            )
+        files_to_parse = xml_files
 
-            rev_minus_exp = safe_int(
-                soup,
-                "CYRevenuesLessExpensesAmt"
-            )
+    # ---------------------------------------------------------
+    # Checkpoint: resume from an interrupted run
+    # ---------------------------------------------------------
 
-            assets = safe_int(
-                soup,
-                "NetAssetsOrFundBalancesEOYAmt"
-            )
+    run_checkpoint = None
+    resumed = set()
 
-            liabilities = safe_int(
-                soup,
-                "TotalLiabilitiesEOYAmt"
-            )
+    if checkpoint:
 
-            unr_grp = soup.find(
-                "NoDonorRestrictionNetAssetsGrp"
-            )
+        run_checkpoint = Checkpoint(
+            results_dir,
+            EXTRACTOR_VERSION,
+            incremental,
+            checkpoint_every
+        )
 
-            unrestricted_net_assets = (
-                safe_int(
-                    unr_grp,
-                    "EOYAmt"
-                )
-                if unr_grp
-                else 0
-            )
+        resumed = run_checkpoint.resumable(files_to_parse)
 
-            program_expenses = safe_int(
-                soup,
-                "TotalProgramServiceExpensesAmt"
-            )
+        if resumed:
 
-            report(
-                f"  Organization: {org_name}"
-            )
+            files_to_parse = [
+                xml_file
+                for xml_file in files_to_parse
+                if xml_file not in resumed
+            ]
 
             report(
-                f"  Tax Year: {year}"
+                f"Resuming from checkpoint: {len(resumed)} file(s) "
+                f"already parsed, {len(files_to_parse)} to go."
             )
 
-            # -------------------------------------------------
-            # Financial ratios
-            # -------------------------------------------------
-
-            current_ratio = (
-                round(
-                    assets / liabilities,
-                    3
-                )
-                if liabilities > 0
-                else 0
-            )
+    def iter_all_results():
+        """Yield (xml_file, result, parsed) for every file, in order."""
+        file_results = iter_file_results(
+            files_to_parse,
+            workers=workers,
+            cache_dir=cache_dir,
+            profile=profile,
+            executor=executor
+        )
 
-            debt_ratio = (
-                round(
-                    liabilities / unrestricted_net_assets,
-                    3
-                )
-                if unrestricted_net_assets > 0
-                else 0
-            )
+        try:
+            for xml_file in xml_files:
+                entry = reused.get(xml_file)
 
-            savings_indicator_ratio = (
-                round(
-                    rev_minus_exp / total_expenses,
-                    3
-                )
-                if total_expenses > 0
-                else 0
-            )
+                if entry is not None:
+                    yield xml_file, entry["result"], False
+                    continue
 
-            operating_margin = (
-                round(
-                    rev_minus_exp / total_revenue,
-                    3
-                )
-                if total_revenue > 0
-                else 0
-            )
+                # Read back from the checkpoint one file at a time
+                if xml_file in resumed:
+                    yield xml_file, run_checkpoint.result(xml_file), False
+                    continue
 
-            program_expense_ratio = (
-                round(
-                    program_expenses / total_expenses,
-                    3
-                )
-                if total_expenses > 0
-                else 0
-            )
+                if control is not None:
+                    control.check()
 
-            # -------------------------------------------------
-            # Detailed revenue and expense categories
-            # -------------------------------------------------
+                yield xml_file, next(file_results), True
 
-            irs990 = soup.find("IRS990")
-            current_expense_rows = []
-            current_revenue_rows = []
+        finally:
+            file_results.close()
 
-            # Broad Part VIII revenue categories.
-            broad_revenue_tags = [
-                ("Contributions and Grants", "CYContributionsGrantsAmt"),
-                ("Program Service Revenue", "CYProgramServiceRevenueAmt"),
-                ("Investment Income", "CYInvestmentIncomeAmt"),
-                ("Other Revenue", "CYOtherRevenueAmt"),
-            ]
+    # ---------------------------------------------------------
+    # Process each local XML file
+    # ---------------------------------------------------------
 
-            for revenue_category, revenue_tag in broad_revenue_tags:
-                amount = safe_int(irs990, revenue_tag)
-                share = amount / total_revenue if total_revenue else 0
-                row = {
-                    "org_id": org_id,
-                    "ein": ein,
-                    "org_name": org_name,
-                    "year": year,
-                    "category_level": "broad_source",
-                    "revenue_category": revenue_category,
-                    "business_code": "",
-                    "amount": amount,
-                    "share_of_total_revenue": share,
-                }
-                current_revenue_rows.append(row)
-                df_revenue_detail.loc[len(df_revenue_detail)] = row
-
-            # Named Part VIII program-service revenue sources.
-            if irs990 is not None:
-                for revenue_group in irs990.find_all(
-                    "ProgramServiceRevenueGrp",
-                    recursive=False
-                ):
-                    revenue_category = safe_text(
-                        revenue_group,
-                        "Desc",
-                        "Unnamed Program Service Revenue"
-                    )
-                    amount = safe_int(revenue_group, "TotalRevenueColumnAmt")
-                    business_code = safe_text(revenue_group, "BusinessCd")
-                    share = amount / total_revenue if total_revenue else 0
-                    row = {
-                        "org_id": org_id,
-                        "ein": ein,
-                        "org_name": org_name,
-                        "year": year,
-                        "category_level": "program_service",
-                        "revenue_category": revenue_category,
-                        "business_code": business_code,
-                        "amount": amount,
-                        "share_of_total_revenue": share,
-                    }
-                    current_revenue_rows.append(row)
-                    df_revenue_detail.loc[len(df_revenue_detail)] = row
-
-            # Part IX functional-expense groups. Each group may report
-            # total, program-service, management/general, and fundraising.
-            if irs990 is not None:
-                expense_groups = []
-                for child in irs990.find_all(recursive=False):
-                    if child.name == "OtherExpensesGrp":
-                        expense_groups.append(child)
-                    elif (
-                        child.name
-                        and child.name.endswith("Grp")
-                        and child.find("TotalAmt", recursive=False) is not None
-                        and (
-                            child.find("ProgramServicesAmt", recursive=False) is not None
-                            or child.find("ManagementAndGeneralAmt", recursive=False) is not None
-                            or child.find("FundraisingAmt", recursive=False) is not None
-                        )
-                        and child.name not in {
-                            "TotalFunctionalExpensesGrp",
-                            "TotalRevenueGrp",
-                        }
-                    ):
-                        expense_groups.append(child)
-
-                for expense_group in expense_groups:
-                    if expense_group.name == "OtherExpensesGrp":
-                        expense_category = safe_text(
-                            expense_group,
-                            "Desc",
-                            "Other Expense"
-                        )
-                    else:
-                        expense_category = format_category_name(expense_group.name)
-
-                    total_amount = safe_int(expense_group, "TotalAmt")
-                    program_amount = safe_int(expense_group, "ProgramServicesAmt")
-                    management_amount = safe_int(
-                        expense_group,
-                        "ManagementAndGeneralAmt"
-                    )
-                    fundraising_amount = safe_int(expense_group, "FundraisingAmt")
-                    share = total_amount / total_expenses if total_expenses else 0
-                    program_share = (
-                        program_amount / total_amount if total_amount else 0
-                    )
+    parsed_index = 0
 
-                    row = {
-                        "org_id": org_id,
-                        "ein": ein,
-                        "org_name": org_name,
-                        "year": year,
-                        "expense_category": expense_category,
-                        "total_amount": total_amount,
-                        "program_services_amount": program_amount,
-                        "management_general_amount": management_amount,
-                        "fundraising_amount": fundraising_amount,
-                        "share_of_total_expenses": share,
-                        "program_services_share": program_share,
-                    }
-                    current_expense_rows.append(row)
-                    df_expense_detail.loc[len(df_expense_detail)] = row
+    if event_callback is not None:
+        emit(
+            "start",
+            total_files=len(files_to_parse),
+            total_bytes=sum(map(source_size, files_to_parse))
+        )
 
-            # -------------------------------------------------
-            # People & compensation
-            # -------------------------------------------------
+    profiler.lap("setup")
 
-            comp_list = []
+    try:
 
-            for x in soup.find_all(
-                "Form990PartVIISectionAGrp"
-            ):
+        for xml_file, result, parsed in iter_all_results():
 
-                name = safe_text(
-                    x,
-                    "PersonNm",
-                    "Unknown"
-                ).title()
+            filename = source_name(xml_file)
 
-                job_title = safe_text(
-                    x,
-                    "TitleTxt",
-                    "Unknown"
-                ).title()
+            if parsed:
 
-                comp = safe_int(
-                    x,
-                    "ReportableCompFromOrgAmt"
-                )
+                parsed_index += 1
 
-                reportable_comp = safe_int(
-                    x,
-                    "ReportableCompFromRltdOrgAmt"
+                report(
+                    f"Processing file {parsed_index}/{len(files_to_parse)}: "
+                    f"{filename}"
                 )
 
-                other_comp = safe_int(
-                    x,
-                    "OtherCompensationAmt"
-                )
+                for message in result["messages"]:
+                    report(message)
 
-                total_comp = (
-                    comp
-                    + reportable_comp
-                    + other_comp
-                )
+                if event_callback is not None:
+                    emit(
+                        "file",
+                        done=parsed_index,
+                        total_files=len(files_to_parse),
+                        bytes=source_size(xml_file),
+                        status=result["status"]
+                    )
 
-                comp_list.append(
-                    total_comp
-                )
+                if result.get("cache_hit"):
+                    cache_hits += 1
+                elif result["status"] == "processed":
+                    cache_misses += 1
 
-                tag_names = [
-                    t.name
-                    for t in x
-                    if t.name
-                ]
+                if "profile" in result:
+                    profiler.add_file(
+                        xml_file,
+                        result["status"],
+                        result["profile"]
+                    )
 
-                role = (
-                    "Board Member"
-                    if (
-                        "IndividualTrusteeOrDirectorInd"
-                        in tag_names
-                        or
-                        "InstitutionalTrusteeInd"
-                        in tag_names
+                if run_checkpoint is not None:
+                    run_checkpoint.add(
+                        xml_file,
+                        without_profile(result),
+                        changed.get(xml_file)
                     )
-                    else "Employee"
-                )
 
-                df_people.loc[
-                    len(df_people)
-                ] = [
-                    org_id,
-                    org_name,
-                    year,
-                    name,
-                    role,
-                    job_title,
-                    comp,
-                    reportable_comp,
-                    other_comp,
-                    total_comp
-                ]
+            # Parsed by this run, or by the interrupted run it resumes
+            new_result = parsed or xml_file in resumed
 
-            # -------------------------------------------------
-            # Highest compensation
-            # -------------------------------------------------
+            if new_result and result["org"] is not None:
+                affected_orgs.add(result["org"]["org_name"])
 
-            comp_list.sort(
-                reverse=True
-            )
+            if incremental:
 
-            high = (
-                comp_list[0]
-                if comp_list
-                else 0
-            )
+                if xml_file in changed:
+                    signature = changed[xml_file]
+                else:
+                    signature = reused[xml_file]
 
-            df_highest = df_people[
-                (df_people["total_comp"] == high)
-                &
-                (df_people["year"] == year)
-                &
-                (df_people["org_name"] == org_name)
-            ]
+                manifest_files[manifest_key(xml_file)] = {
+                    "size": signature["size"],
+                    "mtime_ns": signature["mtime_ns"],
+                    "sha256": signature["sha256"],
+                    "result": without_profile(result),
+                }
 
-            highest_comp_name = (
-                df_highest["name"].iloc[0]
-                if not df_highest.empty
-                else "NA"
-            )
+            if result["error"] is not None:
+                error_rows.append(result["error"])
 
-            highest_comp_title = (
-                df_highest["job_title"].iloc[0]
-                if not df_highest.empty
-                else "NA"
-            )
+            routing.add(result["route"], result["return_type"])
 
-            # -------------------------------------------------
-            # Append organization data
-            # -------------------------------------------------
+            if result["return_version"] is not None:
+                field_coverage.add(
+                    result["return_version"],
+                    result["found_fields"],
+                    result["route"]
+                )
 
-            df_orgs.loc[
-                len(df_orgs)
-            ] = [
-                org_id,
-                ein,
-                org_name,
-                year,
-                voting_members,
-                employees,
-                highest_comp_name,
-                highest_comp_title,
-                high
-            ]
+            if result["status"] == "skipped":
+                skipped_count += 1
+                continue
 
-            # -------------------------------------------------
-            # Append financial data
-            # -------------------------------------------------
+            if result["status"] == "error":
+                error_count += 1
+                continue
 
-            df_financial.loc[
-                len(df_financial)
-            ] = [
-                org_id,
-                ein,
-                org_name,
-                year,
-                employees,
-                total_revenue,
-                total_expenses,
-                salaries,
-                rev_minus_exp,
-                assets,
-                liabilities,
-                unrestricted_net_assets,
-                program_expenses,
-                current_ratio,
-                debt_ratio,
-                savings_indicator_ratio,
-                operating_margin,
-                program_expense_ratio
-            ]
+            # -----------------------------------------------------
+            # Append this filing's records
+            # -----------------------------------------------------
 
-            # -------------------------------------------------
-            # HTML summary per organization
-            # -------------------------------------------------
+            org = result["org"]
+            financial = result["financial"]
 
-            top_expenses = sorted(
-                current_expense_rows,
-                key=lambda row: row["total_amount"],
-                reverse=True
-            )[:10]
-            top_revenue_sources = sorted(
-                [
-                    row for row in current_revenue_rows
-                    if row["category_level"] == "broad_source"
-                ],
-                key=lambda row: row["amount"],
-                reverse=True
-            )
-            top_program_revenue = sorted(
-                [
-                    row for row in current_revenue_rows
-                    if row["category_level"] == "program_service"
-                ],
-                key=lambda row: row["amount"],
-                reverse=True
-            )[:10]
+            if store is None:
+                revenue_detail_table.extend(result["revenue_detail"])
+                expense_detail_table.extend(result["expense_detail"])
+                people_table.extend(result["people"])
+                top_compensation_table.extend(result["top_compensation"])
 
-            expense_table = html_table(
-                ["Expense category", "Total", "% of expenses", "Program", "Management", "Fundraising"],
-                [
-                    [
-                        row["expense_category"],
-                        f'${row["total_amount"]:,}',
-                        f'{row["share_of_total_expenses"]:.1%}',
-                        f'${row["program_services_amount"]:,}',
-                        f'${row["management_general_amount"]:,}',
-                        f'${row["fundraising_amount"]:,}',
-                    ]
-                    for row in top_expenses
-                ]
-            )
+                orgs_table.append(org)
+                financial_table.append(financial)
 
-            revenue_table = html_table(
-                ["Revenue source", "Amount", "% of revenue"],
-                [
-                    [
-                        row["revenue_category"],
-                        f'${row["amount"]:,}',
-                        f'{row["share_of_total_revenue"]:.1%}',
-                    ]
-                    for row in top_revenue_sources
-                ]
-            )
+            # Unchanged files of an incremental run are already stored,
+            # unless the database is new
+            elif new_result or store.created:
+                store.add(result, manifest_key(xml_file))
 
-            program_revenue_table = html_table(
-                ["Program revenue source", "Amount", "% of revenue"],
-                [
-                    [
-                        row["revenue_category"],
-                        f'${row["amount"]:,}',
-                        f'{row["share_of_total_revenue"]:.1%}',
-                    ]
-                    for row in top_program_revenue
-                ]
+            detail_rows = summary_detail_rows(
+                result["revenue_detail"],
+                result["expense_detail"],
+                result["top_compensation"]
             )
 
-            summary_text = f"""
-            <section class="organization-card" id="{org_id}">
-                <h2>{org_name} - {year}</h2>
+            summary_report.add(org, financial, detail_rows)
 
-                <h3>Organization Overview</h3>
-                <ul>
-                    <li><b>Tax Year:</b> {year}</li>
-                    <li><b>EIN:</b> {ein}</li>
-                    <li><b>Voting Members:</b> {voting_members:,}</li>
-                    <li><b>Employees:</b> {employees:,}</li>
-                </ul>
+            processed_count += 1
 
-                <h3>Financial Overview</h3>
-                <ul>
-                    <li><b>Total Revenue:</b> ${total_revenue:,}</li>
-                    <li><b>Total Expenses:</b> ${total_expenses:,}</li>
-                    <li><b>Revenue Less Expenses:</b> ${rev_minus_exp:,}</li>
-                    <li><b>Salaries and Employee Benefits:</b> ${salaries:,}</li>
-                    <li><b>Program Service Expenses:</b> ${program_expenses:,}</li>
-                    <li><b>Total Assets:</b> ${assets:,}</li>
-                    <li><b>Total Liabilities:</b> ${liabilities:,}</li>
-                    <li><b>Unrestricted Net Assets:</b> ${unrestricted_net_assets:,}</li>
-                </ul>
+    except RunCancelled:
+
+        # Keep what was parsed; a later run with checkpoint=True
+        # resumes from here
+        if run_checkpoint is not None:
+            run_checkpoint.save()
+
+        if store is not None:
+            store.flush()
+            store.close()
+
+        elif streaming:
+            for table in (
+                orgs_table,
+                people_table,
+                top_compensation_table,
+                financial_table,
+                expense_detail_table,
+                revenue_detail_table,
+                error_rows,
+            ):
+                table.close()
 
-                <h3>Financial Ratios</h3>
-                <ul>
-                    <li><b>Current Ratio:</b> {current_ratio:.3f}</li>
-                    <li><b>Debt Ratio:</b> {debt_ratio:.3f}</li>
-                    <li><b>Savings Indicator Ratio:</b> {savings_indicator_ratio:.1%}</li>
-                    <li><b>Operating Margin:</b> {operating_margin:.1%}</li>
-                    <li><b>Program Expense Ratio:</b> {program_expense_ratio:.1%}</li>
-                </ul>
+        summary_report.close()
 
-                <h3>Largest Expense Categories</h3>
-                {expense_table}
+        report(
+            f"Run cancelled after {parsed_index} of "
+            f"{len(files_to_parse)} file(s)."
+        )
 
-                <h3>Revenue Sources</h3>
-                {revenue_table}
+        if run_checkpoint is not None:
+            report(
+                f"Checkpoint saved to {run_checkpoint.path}; run again "
+                "with checkpoint=True to resume."
+            )
 
-                <h3>Program Service Revenue Sources</h3>
-                {program_revenue_table}
+        emit(
+            "cancelled",
+            done=parsed_index,
+            total_files=len(files_to_parse)
+        )
 
-                <h3>Compensation Overview</h3>
-                <ul>
-                    <li><b>Highest-Paid Person:</b> {highest_comp_name}</li>
-                    <li><b>Title:</b> {highest_comp_title}</li>
-                    <li><b>Total Compensation:</b> ${high:,}</li>
-                </ul>
-            </section>
-            """
+        raise
 
-            df_report.loc[
-                len(df_report)
-            ] = [
-                org_id,
-                summary_text
-            ]
+    except BaseException:
 
-            processed_count += 1
+        if run_checkpoint is not None:
+            run_checkpoint.save()
 
-            report(
-                f"  Successfully processed: "
-                f"{org_name} - {year}"
-            )
+        raise
 
-        except Exception as e:
+    profiler.lap("file_processing")
 
-            error_count += 1
+    if store is None and not streaming:
 
-            error_message = str(e)
+        # ---------------------------------------------------------
+        # Build DataFrames once all files are processed
+        # ---------------------------------------------------------
 
-            report(
-                f"  ERROR processing {filename}: "
-                f"{error_message}"
-            )
+        df_orgs = orgs_table.to_frame()
+        df_people = people_table.to_frame()
+        df_top_compensation = top_compensation_table.to_frame()
+        df_financial = add_financial_ratios(financial_table.to_frame())
+        df_expense_detail = expense_detail_table.to_frame()
+        df_revenue_detail = revenue_detail_table.to_frame()
 
-            error_rows.append(
-                {
-                    "filename": filename,
-                    "file_path": xml_file,
-                    "error": error_message
-                }
-            )
+        profiler.lap("dataframe_build")
 
     # ---------------------------------------------------------
     # Save processing errors
@@ -992,430 +1916,281 @@ def run_990_parser(
 
     if error_rows:
 
-        pd.DataFrame(
-            error_rows
-        ).to_csv(
-            errors_csv,
-            index=False
-        )
+        if streaming:
+            error_rows.finish()
+
+        else:
+            pd.DataFrame(
+                error_rows,
+                columns=ERROR_COLUMNS
+            ).to_csv(
+                errors_csv,
+                index=False
+            )
 
         report(
             f"Processing errors saved to: "
             f"{errors_csv}"
         )
 
+        profiler.lap("write:processing_errors.csv")
+
+    elif streaming:
+
+        error_rows.close()
+
     # ---------------------------------------------------------
     # Save main CSV files
     # ---------------------------------------------------------
 
-    df_people.sort_values(
-        [
-            "org_name",
-            "year"
-        ],
-        ascending=[
-            True,
-            False
-        ]
-    ).to_csv(
-        people_csv,
-        index=False
-    )
+    def save_table(df, name):
+        path = write_table(
+            df,
+            results_dir,
+            name,
+            output_format,
+            partition_by_year
+        )
 
-    df_orgs.sort_values(
-        [
-            "org_name",
-            "year"
-        ],
-        ascending=[
-            True,
-            False
-        ]
-    ).to_csv(
-        orgs_csv,
-        index=False
-    )
+        profiler.lap(f"write:{os.path.basename(path)}")
 
-    df_financial.sort_values(
-        [
-            "org_name",
-            "year"
-        ],
-        ascending=[
-            True,
-            False
-        ]
-    ).to_csv(
-        financial_csv,
-        index=False
-    )
+        return path
 
-    report(
-        f"Saved people.csv to {people_csv}"
-    )
+    if store is not None:
 
-    report(
-        f"Saved orgs.csv to {orgs_csv}"
-    )
+        store.flush()
+        profiler.lap(f"write:{os.path.basename(store.path)}")
 
-    report(
-        f"Saved financial.csv to {financial_csv}"
-    )
+    elif streaming:
 
-    df_expense_detail.sort_values(
-        ["org_name", "year", "total_amount"],
-        ascending=[True, False, False]
-    ).to_csv(expense_detail_csv, index=False)
+        people_path = people_table.finish()
+        profiler.lap("write:people.csv")
 
-    df_revenue_detail.sort_values(
-        ["org_name", "year", "category_level", "amount"],
-        ascending=[True, False, True, False]
-    ).to_csv(revenue_detail_csv, index=False)
+        top_compensation_path = top_compensation_table.finish()
+        profiler.lap("write:top_compensation.csv")
 
-    report(f"Saved expense_detail.csv to {expense_detail_csv}")
-    report(f"Saved revenue_detail.csv to {revenue_detail_csv}")
+        orgs_path = orgs_table.finish()
+        profiler.lap("write:orgs.csv")
 
-    # ---------------------------------------------------------
-    # Multi-year financial changes
-    # ---------------------------------------------------------
+        financial_path = financial_table.finish()
+        profiler.lap("write:financial.csv")
 
-    change_rows = []
+        expense_detail_path = expense_detail_table.finish()
+        profiler.lap("write:expense_detail.csv")
 
-    df_financial_sorted = (
-        df_financial.sort_values(
-            [
-                "org_name",
-                "year"
-            ]
-        )
-    )
+        revenue_detail_path = revenue_detail_table.finish()
+        profiler.lap("write:revenue_detail.csv")
 
-    def pct_change(curr, prev):
+    else:
 
-        if (
-            prev in [0, None]
-            or curr is None
-        ):
-            return 0
+        people_path = save_table(
+            df_people.sort_values(
+                [
+                    "org_name",
+                    "year"
+                ],
+                ascending=[
+                    True,
+                    False
+                ]
+            ),
+            "people"
+        )
 
-        return (
-            (curr - prev)
-            / prev
-        ) * 100
+        top_compensation_path = save_table(
+            df_top_compensation.sort_values(
+                ["org_name", "year", "rank"],
+                ascending=[True, False, True]
+            ),
+            "top_compensation"
+        )
 
-    for org, g in df_financial_sorted.groupby(
-        "org_name"
-    ):
+        orgs_path = save_table(
+            df_orgs.sort_values(
+                [
+                    "org_name",
+                    "year"
+                ],
+                ascending=[
+                    True,
+                    False
+                ]
+            ),
+            "orgs"
+        )
 
-        g = g.sort_values(
-            "year"
+        financial_path = save_table(
+            df_financial.sort_values(
+                [
+                    "org_name",
+                    "year"
+                ],
+                ascending=[
+                    True,
+                    False
+                ]
+            ),
+            "financial"
         )
 
-        first = g.iloc[0]
+        expense_detail_path = save_table(
+            df_expense_detail.sort_values(
+                ["org_name", "year", "total_amount"],
+                ascending=[True, False, False]
+            ),
+            "expense_detail"
+        )
 
-        last = g.iloc[-1]
+        revenue_detail_path = save_table(
+            df_revenue_detail.sort_values(
+                ["org_name", "year", "category_level", "amount"],
+                ascending=[True, False, True, False]
+            ),
+            "revenue_detail"
+        )
 
-        # -----------------------------------------------------
-        # Overall change
-        # -----------------------------------------------------
+    if store is not None:
 
-        change_rows.append(
-            {
-                "org_name": org,
-
-                "start_year":
-                    first["year"],
-
-                "end_year":
-                    last["year"],
-
-                "type":
-                    "overall",
-
-                "revenue_change":
-                    last["total_revenue"]
-                    - first["total_revenue"],
-
-                "revenue_change_pct":
-                    pct_change(
-                        last["total_revenue"],
-                        first["total_revenue"]
-                    ),
-
-                "expenses_change":
-                    last["total_expenses"]
-                    - first["total_expenses"],
-
-                "expenses_change_pct":
-                    pct_change(
-                        last["total_expenses"],
-                        first["total_expenses"]
-                    ),
-
-                "assets_change":
-                    last["assets"]
-                    - first["assets"],
-
-                "operating_margin_change_pct":
-                    pct_change(
-                        last["operating_margin"],
-                        first["operating_margin"]
-                    ),
-
-                "program_expense_ratio_change_pct":
-                    pct_change(
-                        last["program_expense_ratio"],
-                        first["program_expense_ratio"]
-                    ),
-
-                "debt_ratio_change_pct":
-                    pct_change(
-                        last["debt_ratio"],
-                        first["debt_ratio"]
-                    ),
-
-                "current_ratio_change_pct":
-                    pct_change(
-                        last["current_ratio"],
-                        first["current_ratio"]
-                    )
-            }
+        report(
+            f"Saved {store.filings} filing(s) to {store.path}"
         )
 
-        # -----------------------------------------------------
-        # Year-to-year changes
-        # -----------------------------------------------------
+    else:
 
-        for i in range(
-            1,
-            len(g)
-        ):
+        report(
+            f"Saved {os.path.basename(people_path)} to {people_path}"
+        )
 
-            prev = g.iloc[
-                i - 1
-            ]
+        report(
+            f"Saved {os.path.basename(top_compensation_path)} to "
+            f"{top_compensation_path}"
+        )
 
-            curr = g.iloc[
-                i
-            ]
+        report(
+            f"Saved {os.path.basename(orgs_path)} to {orgs_path}"
+        )
 
-            change_rows.append(
-                {
-                    "org_name": org,
-
-                    "start_year":
-                        prev["year"],
-
-                    "end_year":
-                        curr["year"],
-
-                    "type":
-                        "year_to_year",
-
-                    "revenue_change":
-                        curr["total_revenue"]
-                        - prev["total_revenue"],
-
-                    "revenue_change_pct":
-                        pct_change(
-                            curr["total_revenue"],
-                            prev["total_revenue"]
-                        ),
-
-                    "expenses_change":
-                        curr["total_expenses"]
-                        - prev["total_expenses"],
-
-                    "expenses_change_pct":
-                        pct_change(
-                            curr["total_expenses"],
-                            prev["total_expenses"]
-                        ),
-
-                    "assets_change":
-                        curr["assets"]
-                        - prev["assets"],
-
-                    "operating_margin_change_pct":
-                        pct_change(
-                            curr["operating_margin"],
-                            prev["operating_margin"]
-                        ),
-
-                    "program_expense_ratio_change_pct":
-                        pct_change(
-                            curr["program_expense_ratio"],
-                            prev["program_expense_ratio"]
-                        ),
-
-                    "debt_ratio_change_pct":
-                        pct_change(
-                            curr["debt_ratio"],
-                            prev["debt_ratio"]
-                        ),
-
-                    "current_ratio_change_pct":
-                        pct_change(
-                            curr["current_ratio"],
-                            prev["current_ratio"]
-                        )
-                }
-            )
+        report(
+            f"Saved {os.path.basename(financial_path)} to {financial_path}"
+        )
+
+        report(
+            f"Saved {os.path.basename(expense_detail_path)} to "
+            f"{expense_detail_path}"
+        )
+        report(
+            f"Saved {os.path.basename(revenue_detail_path)} to "
+            f"{revenue_detail_path}"
+        )
 
     pd.DataFrame(
-        change_rows
-    ).to_csv(
-        financial_changes_csv,
-        index=False
-    )
+        field_coverage.rows(),
+        columns=FIELD_COVERAGE_COLUMNS
+    ).to_csv(field_coverage_csv, index=False)
 
-    report(
-        f"Saved financial_changes.csv to "
-        f"{financial_changes_csv}"
-    )
+    profiler.lap("write:field_coverage.csv")
+
+    report(f"Saved field_coverage.csv to {field_coverage_csv}")
 
     # ---------------------------------------------------------
-    # HTML summary
+    # Multi-year financial changes
     # ---------------------------------------------------------
 
-    doc_intro = """
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>Form 990 Summary</title>
-        <style>
-            body {
-                font-family: Arial, Helvetica, sans-serif;
-                max-width: 1000px;
-                margin: 0 auto;
-                padding: 24px;
-                line-height: 1.5;
-                color: #222;
-                background: #f5f5f5;
-            }
-
-            h1, h2, h3 {
-                color: #1f2937;
-            }
+    if store is not None:
+        store.update_financial_changes(change_windows)
+        store.close()
 
-            .report-header,
-            .organization-card {
-                background: #ffffff;
-                border: 1px solid #d1d5db;
-                border-radius: 8px;
-                padding: 20px;
-                margin-bottom: 24px;
-                box-shadow: 0 2px 6px rgba(0, 0, 0, 0.06);
-            }
+        profiler.lap("financial_changes")
 
-            .organization-card h2 {
-                margin-top: 0;
-                padding-bottom: 10px;
-                border-bottom: 2px solid #e5e7eb;
-            }
+        report(f"Updated financial_changes in {store.path}")
 
-            ul {
-                padding-left: 24px;
-            }
+    elif streaming:
+        stream_financial_changes(
+            financial_path,
+            financial_changes_path,
+            change_windows,
+            chunk_rows
+        )
 
-            li {
-                margin-bottom: 6px;
-            }
+        profiler.lap("financial_changes")
 
-            a {
-                color: #1d4ed8;
-                text-decoration: none;
-            }
+    else:
 
-            a:hover {
-                text-decoration: underline;
-            }
+        if incremental and previous_manifest:
+            df_changes = patch_financial_changes(
+                financial_changes_path,
+                df_financial,
+                affected_orgs,
+                change_windows,
+                output_format
+            )
+        else:
+            df_changes = build_financial_changes(
+                df_financial,
+                change_windows
+            )
 
-            .table-wrap {
-                overflow-x: auto;
-                margin-bottom: 18px;
-            }
+        profiler.lap("financial_changes")
 
-            table {
-                width: 100%;
-                border-collapse: collapse;
-                font-size: 0.92rem;
-            }
+        save_table(df_changes, "financial_changes")
 
-            th, td {
-                border: 1px solid #d1d5db;
-                padding: 8px 10px;
-                text-align: right;
-                white-space: nowrap;
-            }
+    if store is None:
+        report(
+            f"Saved {os.path.basename(financial_changes_path)} to "
+            f"{financial_changes_path}"
+        )
 
-            th:first-child, td:first-child {
-                text-align: left;
-                white-space: normal;
-            }
+    # ---------------------------------------------------------
+    # HTML summary
+    # ---------------------------------------------------------
 
-            th {
-                background: #f3f4f6;
-            }
+    pages_dir = summary_report.write_html()
 
-            .muted {
-                color: #6b7280;
-                font-style: italic;
-            }
-        </style>
-    </head>
-    <body>
-    <div class="report-header">
-        <h1>Summary of Form 990s</h1>
-        <h2>Organizations and Tax Years</h2>
-        <ul>
-    """
+    profiler.lap("write:summary.html")
 
-    doc_body = ""
+    report(
+        f"Saved HTML summary to "
+        f"{html_filename}"
+    )
 
-    for _, y in df_orgs.iterrows():
+    if pages_dir is not None:
 
-        doc_intro += (
-            f'<li>'
-            f'<a href="#{y["org_id"]}">'
-            f'{y["org_name"]} - {y["year"]}'
-            f'</a>'
-            f'</li>'
+        report(
+            f"Saved organization pages to "
+            f"{pages_dir}"
         )
 
-        matching_report = df_report[
-            df_report["org_id"]
-            == y["org_id"]
-        ]
+    # ---------------------------------------------------------
+    # Save incremental manifest
+    # ---------------------------------------------------------
 
-        if not matching_report.empty:
+    if incremental:
 
-            doc_body += (
-                matching_report[
-                    "summary_text"
-                ].iloc[0]
-            )
+        save_manifest(
+            results_dir,
+            EXTRACTOR_VERSION,
+            manifest_files
+        )
 
-        doc_body += ""
+        report(
+            f"Saved manifest to "
+            f"{manifest_path(results_dir)}"
+        )
 
-    doc_intro += "</ul></div>"
+        profiler.lap("write:manifest")
 
-    doc_footer = """
-    </body>
-    </html>
-    """
+    # Every output is written; the run no longer needs resuming
+    if run_checkpoint is not None:
+        run_checkpoint.remove()
 
-    write_file(
-        html_filename,
-        doc_intro + doc_body + doc_footer
-    )
+    if profile:
 
-    report(
-        f"Saved HTML summary to "
-        f"{html_filename}"
-    )
+        profile_json = profiler.write(results_dir)
+
+        report(
+            f"Saved run profile to "
+            f"{profile_json}"
+        )
 
     # ---------------------------------------------------------
     # Processing summary
@@ -1442,6 +2217,33 @@ def run_990_parser(
         f"Files with errors: {error_count}"
     )
 
+    for line in routing.summary_lines():
+        report(line)
+
+    for line in field_coverage.summary_lines():
+        report(line)
+
+    if cache_dir is not None:
+
+        evicted = ParseCache(
+            cache_dir,
+            EXTRACTOR_VERSION,
+            cache_max_bytes
+        ).prune()
+
+        report(
+            f"Parse cache: {cache_hits} hit(s), "
+            f"{cache_misses} parsed, "
+            f"{evicted} evicted"
+        )
+
+    if profile:
+
+        report("Run profile:")
+
+        for line in profiler.summary_lines():
+            report(line)
+
     report(
         f"Results folder: {results_dir}"
     )
@@ -1450,11 +2252,18 @@ def run_990_parser(
         "==================================="
     )
 
+    emit(
+        "finish",
+        processed=processed_count,
+        skipped=skipped_count,
+        errors=error_count
+    )
+
     # ---------------------------------------------------------
     # Open HTML summary
     # ---------------------------------------------------------
 
-    if os.path.exists(
+    if open_browser and os.path.exists(
         html_filename
     ):
 
@@ -1468,28 +2277,51 @@ def run_990_parser(
     # Return output paths
     # ---------------------------------------------------------
 
-    outputs = {
-        "people_csv":
-            people_csv,
+    if store is not None:
 
-        "orgs_csv":
-            orgs_csv,
+        outputs = {
+            "sqlite_database":
+                store.path
+        }
 
-        "financial_csv":
-            financial_csv,
+    else:
 
-        "financial_changes_csv":
-            financial_changes_csv,
+        outputs = {
+            f"people_{output_format}":
+                people_path,
 
-        "expense_detail_csv":
-            expense_detail_csv,
+            f"top_compensation_{output_format}":
+                top_compensation_path,
 
-        "revenue_detail_csv":
-            revenue_detail_csv,
+            f"orgs_{output_format}":
+                orgs_path,
 
-        "html_summary":
-            html_filename
-    }
+            f"financial_{output_format}":
+                financial_path,
+
+            f"financial_changes_{output_format}":
+                financial_changes_path,
+
+            f"expense_detail_{output_format}":
+                expense_detail_path,
+
+            f"revenue_detail_{output_format}":
+                revenue_detail_path
+        }
+
+    outputs[
+        "field_coverage_csv"
+    ] = field_coverage_csv
+
+    outputs[
+        "html_summary"
+    ] = html_filename
+
+    if pages_dir is not None:
+
+        outputs[
+            "html_pages"
+        ] = pages_dir
 
     if error_rows:
 
@@ -1497,6 +2329,12 @@ def run_990_parser(
             "processing_errors_csv"
         ] = errors_csv
 
+    if profile:
+
+        outputs[
+            "run_profile_json"
+        ] = profile_json
+
     return outputs
 
 
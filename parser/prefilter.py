@@ -0,0 +1,249 @@
+"""
+Return-type sniffing before the full parse.
+
+Every e-filed return starts with a ``ReturnHeader`` of a few KB that
+names the return type (``ReturnTypeCd``), the schema version, the filer
+and the tax year. ``sniff_header`` reads just that header, at most
+PREFILTER_BYTES of the file, with an incremental lxml parser and stops as
+soon as the header closes. ``route_filing`` then decides what happens to
+the filing:
+
+    990, 990EZ, 990PF  parsed by that form's extractor (parser.extract)
+    unsupported        any other return type, such as 990-T; skipped
+    no_return          no Return element; skipped
+    no_filer           a header without a Filer; skipped
+
+Skipped files are never parsed in full. A filing whose header does not
+fit in PREFILTER_BYTES, or that does not name its return type, goes to
+the Form 990 extractor, which also rejects files without a Return or
+Filer element.
+
+The bytes read while sniffing are replayed in front of the rest of the
+stream (PrefixedReader), so every file is opened and read only once.
+"""
+
+import re
+from collections import Counter, namedtuple
+
+from lxml import etree
+
+from parser.extract import local_name
+
+
+# Most headers are 2-4 KB; give up on finding the end well after that
+PREFILTER_BYTES = 64 * 1024
+
+CHUNK_SIZE = 4 * 1024
+
+# Return types with their own extractor
+SUPPORTED_RETURN_TYPES = ("990", "990EZ", "990PF")
+
+SKIP_ROUTES = ("no_return", "no_filer", "unsupported")
+
+ROUTE_LABELS = {
+    "990": "Form 990",
+    "990EZ": "Form 990-EZ",
+    "990PF": "Form 990-PF",
+    "no_return": "without a Return element",
+    "no_filer": "without a Filer element",
+    "unsupported": "unsupported return type",
+}
+
+
+# What the header says about a filing.
+#   complete:        the header ended (or the file did) within the limit
+#   return_type:     ReturnTypeCd without punctuation ("990EZ"), or ""
+ReturnHeader = namedtuple(
+    "ReturnHeader",
+    [
+        "complete",
+        "return_found",
+        "filer_found",
+        "return_type",
+        "return_version",
+        "ein",
+        "tax_year",
+    ]
+)
+
+
+class PrefixedReader:
+    """Read ``prefix`` and then the rest of ``stream``."""
+
+    def __init__(self, prefix, stream):
+        self.prefix = prefix
+        self.offset = 0
+        self.stream = stream
+
+    def read(self, size=-1):
+        if self.offset < len(self.prefix):
+            if size is None or size < 0:
+                data = self.prefix[self.offset:] + self.stream.read()
+                self.offset = len(self.prefix)
+                return data
+
+            data = self.prefix[self.offset:self.offset + size]
+            self.offset += len(data)
+            return data
+
+        return self.stream.read(size)
+
+
+def normalize_return_type(code):
+    """"990-EZ", "990ez" and "990EZ" all become "990EZ"."""
+    return re.sub(r"[^0-9A-Z]", "", (code or "").upper())
+
+
+def sniff_header(stream, limit=PREFILTER_BYTES):
+    """
+    Read the return header from the start of a binary stream.
+
+    Returns (ReturnHeader, bytes read); pass the bytes to PrefixedReader
+    to parse the whole stream afterwards.
+    """
+    parser = etree.XMLPullParser(
+        events=("start", "end"),
+        recover=True,
+        remove_comments=True,
+        remove_pis=True
+    )
+
+    chunks = []
+    read = 0
+
+    found = {
+        "complete": False,
+        "return_found": False,
+        "filer_found": False,
+        "return_type": "",
+        "return_version": "",
+        "ein": "",
+        "tax_year": "",
+    }
+
+    def consume(events):
+        for event, element in events:
+            name = local_name(element.tag)
+
+            if event == "start":
+                if name == "Return" and not found["return_found"]:
+                    found["return_found"] = True
+                    found["return_version"] = element.get("returnVersion", "")
+
+                elif name == "Filer":
+                    found["filer_found"] = True
+
+                # A return without a header is as far as we need to go
+                elif name == "ReturnData":
+                    return True
+
+                continue
+
+            if name == "ReturnHeader":
+                return True
+
+            text = (element.text or "").strip()
+
+            if name == "ReturnTypeCd" and not found["return_type"]:
+                found["return_type"] = normalize_return_type(text)
+
+            elif name == "EIN" and found["filer_found"] and not found["ein"]:
+                found["ein"] = text
+
+            elif name == "TaxYr" and not found["tax_year"]:
+                found["tax_year"] = text
+
+        return False
+
+    try:
+        while read < limit:
+            chunk = stream.read(CHUNK_SIZE)
+
+            if not chunk:
+                parser.close()
+                found["complete"] = True
+                consume(parser.read_events())
+                break
+
+            chunks.append(chunk)
+            read += len(chunk)
+            parser.feed(chunk)
+
+            if consume(parser.read_events()):
+                found["complete"] = True
+                break
+
+    except etree.XMLSyntaxError:
+        # Unreadable documents end the header where they break
+        found["complete"] = True
+
+    return ReturnHeader(**found), b"".join(chunks)
+
+
+def route_filing(header):
+    """The route of a filing (see the module docstring)."""
+    if header.complete and not header.return_found:
+        return "no_return"
+
+    if header.complete and not header.filer_found:
+        return "no_filer"
+
+    if not header.return_type:
+        return "990"
+
+    if header.return_type in SUPPORTED_RETURN_TYPES:
+        return header.return_type
+
+    return "unsupported"
+
+
+class RoutingCounts:
+    """Count where the prefilter sent each file, for the run summary."""
+
+    def __init__(self):
+        self.routes = Counter()
+        self.unsupported = Counter()
+
+    def add(self, route, return_type):
+        if route is None:
+            return
+
+        self.routes[route] += 1
+
+        if route == "unsupported":
+            self.unsupported[return_type or "unknown"] += 1
+
+    def summary_lines(self):
+        lines = []
+
+        parsed = [
+            f"{ROUTE_LABELS[route]}: {self.routes[route]}"
+            for route in SUPPORTED_RETURN_TYPES
+            if self.routes[route]
+        ]
+
+        if parsed:
+            lines.append("Routed to extractors: " + ", ".join(parsed))
+
+        skipped = []
+
+        for route in SKIP_ROUTES:
+            if not self.routes[route]:
+                continue
+
+            label = f"{ROUTE_LABELS[route]}: {self.routes[route]}"
+
+            if route == "unsupported":
+                label += " (" + ", ".join(
+                    f"{return_type} {count}"
+                    for return_type, count in sorted(self.unsupported.items())
+                ) + ")"
+
+            skipped.append(label)
+
+        if skipped:
+            lines.append(
+                "Skipped before extraction: " + ", ".join(skipped)
+            )
+
+        return lines
@@ -0,0 +1,211 @@
+"""
+Structured stage timing for parser runs.
+
+With ``run_990_parser(profile=True)`` every file records how long it
+spent reading bytes, inside lxml, in field extraction, building detail
+group rows and building people rows, together with its byte count. The
+run itself records DataFrame construction, each output file write and
+HTML assembly. Everything is written to ``run_profile.json`` in the
+results folder: a per-stage summary, the slowest files, and one entry
+per file.
+
+Timing the parse/extraction split costs a clock read on every parser
+event, so it only happens when profiling is requested.
+"""
+
+import json
+import os
+import time
+
+
+PROFILE_FILENAME = "run_profile.json"
+
+# Per-file stages, in pipeline order. "cache_read" replaces the others
+# for files loaded from the parse cache.
+FILE_STAGES = [
+    "prefilter",
+    "file_read",
+    "xml_parse",
+    "field_extraction",
+    "detail_groups",
+    "people",
+    "cache_read",
+]
+
+
+class StageTimer:
+    """Accumulates wall-clock seconds per stage name."""
+
+    def __init__(self):
+        self.stages = {}
+        self.last = time.perf_counter()
+
+    def add(self, stage, seconds):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def lap(self, stage=None):
+        """
+        Charge the time since the previous lap to ``stage``.
+
+        With stage=None the interval is dropped; use it to restart the
+        clock after work that was timed some other way.
+        """
+        now = time.perf_counter()
+
+        if stage is not None:
+            self.add(stage, now - self.last)
+
+        self.last = now
+
+
+class TimedReader:
+    """A binary file wrapper that counts the time and bytes read."""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.seconds = 0.0
+        self.bytes = 0
+
+    def read(self, size=-1):
+        start = time.perf_counter()
+        data = self.raw.read(size)
+        self.seconds += time.perf_counter() - start
+        self.bytes += len(data)
+        return data
+
+
+def timed_events(context, reader, timer):
+    """
+    Yield iterparse events, splitting the elapsed time three ways.
+
+    Time spent waiting for the next event is lxml's, less what the
+    reader spent reading the file; time between yielding an event and
+    being asked for the next one is the caller's extraction work.
+    """
+    clock = time.perf_counter
+    parsing = 0.0
+    handling = 0.0
+    mark = clock()
+
+    try:
+        for item in context:
+            now = clock()
+            parsing += now - mark
+
+            yield item
+
+            mark = clock()
+            handling += mark - now
+
+    finally:
+        timer.add("file_read", reader.seconds)
+        timer.add("xml_parse", parsing - reader.seconds)
+        timer.add("field_extraction", handling)
+
+
+class RunProfile:
+    """Per-file and run-level timings for one run_990_parser call."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.timer = StageTimer()
+        self.files = []
+
+    def lap(self, stage=None):
+        self.timer.lap(stage)
+
+    def add_file(self, xml_file, status, file_profile):
+        """Record one file's profile, as returned in its result."""
+        self.files.append(
+            {
+                "file": xml_file,
+                "status": status,
+                "bytes": file_profile["bytes"],
+                "seconds": file_profile["seconds"],
+                "stages": file_profile["stages"],
+            }
+        )
+
+    def stage_rows(self):
+        """
+        Per-stage totals: file stages first, then run stages.
+
+        File stages are summed over files (and so over worker processes);
+        together they make up the run's "file_processing" stage. Each
+        row's share is of its own scope's total.
+        """
+        totals = {}
+        counts = {}
+
+        for entry in self.files:
+            for stage, seconds in entry["stages"].items():
+                totals[stage] = totals.get(stage, 0.0) + seconds
+                counts[stage] = counts.get(stage, 0) + 1
+
+        file_total = sum(totals.values()) or 1.0
+        run_total = sum(self.timer.stages.values()) or 1.0
+
+        rows = [
+            {
+                "scope": "file",
+                "stage": stage,
+                "seconds": totals[stage],
+                "share": totals[stage] / file_total,
+                "files": counts[stage],
+            }
+            for stage in FILE_STAGES
+            if stage in totals
+        ]
+
+        rows += [
+            {
+                "scope": "run",
+                "stage": stage,
+                "seconds": seconds,
+                "share": seconds / run_total,
+                "files": None,
+            }
+            for stage, seconds in self.timer.stages.items()
+        ]
+
+        return rows
+
+    def to_dict(self, slowest=20):
+        wall_seconds = time.perf_counter() - self.started
+
+        slowest_files = sorted(
+            self.files,
+            key=lambda entry: entry["seconds"],
+            reverse=True
+        )[:slowest]
+
+        return {
+            "wall_seconds": wall_seconds,
+            "files": len(self.files),
+            "bytes": sum(entry["bytes"] for entry in self.files),
+            "file_seconds": sum(entry["seconds"] for entry in self.files),
+            "stages": self.stage_rows(),
+            "slowest_files": slowest_files,
+            "per_file": self.files,
+        }
+
+    def write(self, results_dir, slowest=20):
+        """Write run_profile.json and return its path."""
+        path = os.path.join(results_dir, PROFILE_FILENAME)
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(slowest), f, indent=2)
+
+        return path
+
+    def summary_lines(self):
+        """A short stage table for the end-of-run report."""
+        lines = [f"  {'scope':<5} {'stage':<28} {'seconds':>10} {'share':>7}"]
+
+        for row in self.stage_rows():
+            lines.append(
+                f"  {row['scope']:<5} {row['stage']:<28} "
+                f"{row['seconds']:>10.3f} {row['share']:>7.1%}"
+            )
+
+        return lines
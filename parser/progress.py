@@ -0,0 +1,103 @@
+"""
+Structured progress events.
+
+Besides its text messages, run_990_parser(event_callback=...) reports
+progress as dicts, one per event:
+
+    {"event": "start", "total_files": N, "total_bytes": B}
+    {"event": "file", "done": n, "total_files": N, "bytes": b,
+     "status": "processed" | "skipped" | "error"}
+    {"event": "finish", "processed": p, "skipped": s, "errors": e}
+
+total_files and done count the files parsed in this run; unchanged files
+of an incremental run are not included. ProgressMeter turns the events
+into files/sec, MB/sec and an ETA for a progress display. Nothing here
+imports the parser, so a GUI can use it before the parser is loaded.
+"""
+
+import time
+
+
+class ProgressMeter:
+    """Running totals and rates over the events of one run."""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.started = None
+        self.finished = None
+        self.total_files = 0
+        self.total_bytes = 0
+        self.done = 0
+        self.bytes = 0
+
+    def update(self, event):
+        if event["event"] == "start":
+            self.started = self.clock()
+            self.finished = None
+            self.total_files = event["total_files"]
+            self.total_bytes = event["total_bytes"]
+            self.done = 0
+            self.bytes = 0
+
+        elif event["event"] == "file":
+            self.done = event["done"]
+            self.bytes += event["bytes"]
+
+        elif event["event"] == "finish":
+            self.finished = self.clock()
+
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+
+        if self.finished is not None:
+            return self.finished - self.started
+
+        return self.clock() - self.started
+
+    def fraction(self):
+        """Share of the run done, by bytes when sizes are known."""
+        if self.total_bytes:
+            return min(self.bytes / self.total_bytes, 1.0)
+
+        if self.total_files:
+            return self.done / self.total_files
+
+        return 0.0
+
+    def files_per_second(self):
+        elapsed = self.elapsed()
+        return self.done / elapsed if elapsed else 0.0
+
+    def megabytes_per_second(self):
+        elapsed = self.elapsed()
+        return self.bytes / 1e6 / elapsed if elapsed else 0.0
+
+    def eta_seconds(self):
+        """Seconds left at the average rate so far, or None if unknown."""
+        fraction = self.fraction()
+
+        if not fraction:
+            return None
+
+        return self.elapsed() * (1 - fraction) / fraction
+
+    def status_line(self):
+        """E.g. "1,200/5,000 files, 85.1 files/sec, 6.2 MB/sec, ETA 0:00:44"."""
+        eta = self.eta_seconds()
+
+        return (
+            f"{self.done:,}/{self.total_files:,} files, "
+            f"{self.files_per_second():,.1f} files/sec, "
+            f"{self.megabytes_per_second():,.1f} MB/sec, "
+            f"ETA {format_duration(eta) if eta is not None else '--'}"
+        )
+
+
+def format_duration(seconds):
+    """Seconds as H:MM:SS."""
+    seconds = int(round(seconds))
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
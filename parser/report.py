@@ -0,0 +1,335 @@
+"""
+Streaming HTML report.
+
+summary.html is built from the page templates below without holding the
+report in memory. Summary cards are rendered in batches (each batch's
+financial ratios are computed together) and spooled to a temporary file
+as they arrive, the table of contents goes to a second one, and both are
+copied into the page at the end. A filing whose org_id was already seen
+reuses that card, found by key rather than by searching earlier cards.
+
+With pages=True the report is split instead: every organization (by EIN)
+gets its own page in summary_pages/, and its cards are appended to it as
+they are rendered. summary.html becomes a light index with one link per
+filing and no cards.
+"""
+
+import html
+import os
+import re
+import shutil
+import tempfile
+from string import Template
+
+import pandas as pd
+
+from parser.analytics import RATIO_COLUMNS, add_financial_ratios
+
+
+PAGES_DIRNAME = "summary_pages"
+
+# Every page is PAGE_HEAD, the <li> entries of its list, "</ul></div>",
+# its summary cards, then PAGE_FOOT.
+PAGE_HEAD = Template("""
+    <!DOCTYPE html>
+    <html lang="en">
+    <head>
+        <meta charset="UTF-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <title>$title</title>
+        <style>
+            body {
+                font-family: Arial, Helvetica, sans-serif;
+                max-width: 1000px;
+                margin: 0 auto;
+                padding: 24px;
+                line-height: 1.5;
+                color: #222;
+                background: #f5f5f5;
+            }
+
+            h1, h2, h3 {
+                color: #1f2937;
+            }
+
+            .report-header,
+            .organization-card {
+                background: #ffffff;
+                border: 1px solid #d1d5db;
+                border-radius: 8px;
+                padding: 20px;
+                margin-bottom: 24px;
+                box-shadow: 0 2px 6px rgba(0, 0, 0, 0.06);
+            }
+
+            .organization-card h2 {
+                margin-top: 0;
+                padding-bottom: 10px;
+                border-bottom: 2px solid #e5e7eb;
+            }
+
+            ul {
+                padding-left: 24px;
+            }
+
+            li {
+                margin-bottom: 6px;
+            }
+
+            a {
+                color: #1d4ed8;
+                text-decoration: none;
+            }
+
+            a:hover {
+                text-decoration: underline;
+            }
+
+            .table-wrap {
+                overflow-x: auto;
+                margin-bottom: 18px;
+            }
+
+            table {
+                width: 100%;
+                border-collapse: collapse;
+                font-size: 0.92rem;
+            }
+
+            th, td {
+                border: 1px solid #d1d5db;
+                padding: 8px 10px;
+                text-align: right;
+                white-space: nowrap;
+            }
+
+            th:first-child, td:first-child {
+                text-align: left;
+                white-space: normal;
+            }
+
+            th {
+                background: #f3f4f6;
+            }
+
+            .muted {
+                color: #6b7280;
+                font-style: italic;
+            }
+        </style>
+    </head>
+    <body>
+    <div class="report-header">
+        <h1>$heading</h1>
+        <h2>$subheading</h2>
+        <ul>
+    """)
+
+PAGE_FOOT = """
+    </body>
+    </html>
+    """
+
+SUMMARY_HTML_HEAD = PAGE_HEAD.substitute(
+    title="Form 990 Summary",
+    heading="Summary of Form 990s",
+    subheading="Organizations and Tax Years"
+)
+
+SUMMARY_HTML_FOOT = PAGE_FOOT
+
+
+def page_name(org):
+    """File name of an organization's page."""
+    ein = re.sub("[^0-9A-Za-z]", "", org["ein"]) or "unknown"
+    return f"{ein}.html"
+
+
+def toc_entry(org, href):
+    return (
+        f'<li>'
+        f'<a href="{href}">'
+        f'{org["org_name"]} - {org["year"]}'
+        f'</a>'
+        f'</li>'
+    )
+
+
+class SummaryReport:
+    """
+    Render summary cards in batches and stream them to disk.
+
+    ``render_card(org, financial, detail_rows)`` returns one card's
+    HTML; ``financial`` includes the ratio columns. The table of
+    contents lists every filing in processing order.
+    """
+
+    def __init__(
+        self,
+        html_filename,
+        render_card,
+        financial_columns,
+        pages=False,
+        batch_size=1000
+    ):
+        self.html_filename = html_filename
+        self.render_card = render_card
+        self.financial_columns = financial_columns
+        self.batch_size = batch_size
+
+        self.pending = []
+        self.toc = tempfile.TemporaryFile("w+", encoding="utf-8")
+        self.body = None
+        self.pages_dir = None
+        self.pages = set()
+
+        # org_id -> (offset, length) of its card in body, or its page
+        self.first_cards = {}
+
+        if pages:
+            self.pages_dir = os.path.join(
+                os.path.dirname(html_filename),
+                PAGES_DIRNAME
+            )
+            shutil.rmtree(self.pages_dir, ignore_errors=True)
+            os.makedirs(self.pages_dir)
+        else:
+            self.body = tempfile.TemporaryFile("w+b")
+
+    def add(self, org, financial, detail_rows):
+        self.pending.append((org, financial, detail_rows))
+
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+
+        df = add_financial_ratios(
+            pd.DataFrame(
+                [financial for _, financial, _ in self.pending],
+                columns=self.financial_columns
+            )
+        )
+        ratio_rows = df[RATIO_COLUMNS].to_dict("records")
+
+        # page -> (org, cards) for this batch, written once per page
+        page_cards = {}
+
+        for (org, financial, detail_rows), ratios in zip(
+            self.pending,
+            ratio_rows
+        ):
+            org_id = org["org_id"]
+            first = self.first_cards.get(org_id)
+
+            if self.pages_dir is not None:
+                page = first or page_name(org)
+
+                self.toc.write(
+                    toc_entry(org, f"{PAGES_DIRNAME}/{page}#{org_id}")
+                )
+
+                if first is None:
+                    self.first_cards[org_id] = page
+                    page_cards.setdefault(page, (org, []))[1].append(
+                        self.render_card(
+                            org,
+                            {**financial, **ratios},
+                            detail_rows
+                        )
+                    )
+
+                continue
+
+            self.toc.write(toc_entry(org, f"#{org_id}"))
+
+            if first is None:
+                # Stored as the bytes a text-mode write would produce
+                card = self.render_card(
+                    org,
+                    {**financial, **ratios},
+                    detail_rows
+                ).replace("\n", os.linesep).encode("utf-8")
+            else:
+                offset, length = first
+                self.body.seek(offset)
+                card = self.body.read(length)
+                self.body.seek(0, os.SEEK_END)
+
+            offset = self.body.tell()
+            self.body.write(card)
+
+            if first is None:
+                self.first_cards[org_id] = (offset, len(card))
+
+        for page, (org, cards) in page_cards.items():
+            self.write_page(page, org, cards)
+
+        self.pending = []
+
+    def write_page(self, page, org, cards):
+        """Start an organization's page, or append cards to it."""
+        path = os.path.join(self.pages_dir, page)
+
+        if page in self.pages:
+            mode = "a"
+            head = ""
+        else:
+            self.pages.add(page)
+            mode = "w"
+            name = html.escape(org["org_name"])
+            head = PAGE_HEAD.substitute(
+                title=f"{name} - Form 990 Summary",
+                heading=name,
+                subheading="Form 990 Filings"
+            ) + (
+                f'<li><a href="../{os.path.basename(self.html_filename)}">'
+                f'All organizations</a></li>'
+                f'</ul></div>'
+            )
+
+        with open(path, mode, encoding="utf-8") as f:
+            f.write(head)
+            f.write("".join(cards))
+
+    def write_html(self):
+        """
+        Write summary.html (and finish the organization pages).
+
+        Returns the path of the pages folder, or None for a single page.
+        """
+        self.flush()
+
+        self.toc.seek(0)
+
+        with open(self.html_filename, "w", encoding="utf-8") as f:
+            f.write(SUMMARY_HTML_HEAD)
+            shutil.copyfileobj(self.toc, f)
+            f.write("</ul></div>")
+
+            if self.body is not None:
+                f.flush()
+                self.body.seek(0)
+                shutil.copyfileobj(self.body, f.buffer)
+
+            f.write(SUMMARY_HTML_FOOT)
+
+        for page in self.pages:
+            with open(
+                os.path.join(self.pages_dir, page),
+                "a",
+                encoding="utf-8"
+            ) as f:
+                f.write(PAGE_FOOT)
+
+        self.close()
+
+        return self.pages_dir
+
+    def close(self):
+        self.toc.close()
+
+        if self.body is not None:
+            self.body.close()
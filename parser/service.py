@@ -0,0 +1,417 @@
+"""
+Parse single filings over HTTP.
+
+A small local service for tools that need one filing decoded on demand.
+The parser is loaded once, and the process pool is started with the
+server, so a request pays for the parse alone: no imports, no output
+files, no browser.
+
+    POST /parse[?filename=NAME]
+        The body is one filing's XML, plain or gzip/bzip2/Zstandard
+        compressed. The response is the filing's records as JSON: org,
+        financial (with the ratio columns), people, top_compensation,
+        revenue_detail and expense_detail, plus status, route and
+        messages as returned by process_xml_file. NAME is the file name
+        given in the "error" row of a filing that was skipped or could
+        not be parsed (default "request.xml"); the other records have
+        no file column.
+
+        200  the filing was parsed
+        422  it was skipped or could not be parsed; "error" says why
+        411  no Content-Length; 413 the body is over max_bytes
+        503  max_concurrency parses are already in flight; retry
+        504  the parse took longer than timeout seconds. A parse that
+             has started runs to the end in its worker and counts
+             against max_concurrency until then.
+
+    GET /health
+        Pool size, parses in flight and request counts.
+
+The server binds to 127.0.0.1 by default. Run from the repository root:
+
+    python -m parser.service --port 8990 --workers 4
+
+and, for example:
+
+    curl --data-binary @filing.xml http://127.0.0.1:8990/parse
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from parser.parse_990 import FINANCIAL_COLUMNS, process_xml_file
+from parser.streaming import financial_chunk_with_ratios
+
+
+DEFAULT_HOST = "127.0.0.1"
+
+DEFAULT_PORT = 8990
+
+DEFAULT_FILENAME = "request.xml"
+
+# Largest accepted request body
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+
+# Seconds one parse may take before the request gets a 504
+DEFAULT_TIMEOUT = 60.0
+
+add_ratios = financial_chunk_with_ratios(FINANCIAL_COLUMNS)
+
+
+def parse_document(body, filename=DEFAULT_FILENAME):
+    """
+    Parse one filing given as bytes; the unit of work of the pool.
+
+    The bytes are written to a private temporary folder under
+    ``filename`` so that process_xml_file reads them like any other
+    file, compressed or not.
+    """
+    with tempfile.TemporaryDirectory(prefix="form990-") as tmp_dir:
+        xml_file = os.path.join(tmp_dir, filename)
+
+        with open(xml_file, "wb") as f:
+            f.write(body)
+
+        result = process_xml_file(xml_file)
+
+    if result["error"] is not None:
+        result["error"]["file_path"] = filename
+
+    if result["financial"] is not None:
+        result["financial"] = add_ratios([result["financial"]])[0]
+
+    return result
+
+
+def warm_up():
+    """Run once per worker at startup, so every process is forked early."""
+    return os.getpid()
+
+
+def request_filename(query):
+    """The ?filename= of a request, without any folder part."""
+    name = parse_qs(query).get("filename", [""])[0]
+    name = os.path.basename(name.replace("\\", "/"))
+
+    if name in ("", ".", ".."):
+        return DEFAULT_FILENAME
+
+    return name
+
+
+class ParseServer(ThreadingHTTPServer):
+    """A threading HTTP server with a pool of parser processes."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address,
+        workers=None,
+        max_concurrency=None,
+        max_bytes=DEFAULT_MAX_BYTES,
+        timeout=DEFAULT_TIMEOUT,
+        quiet=False
+    ):
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        if workers < 1:
+            raise ValueError("workers must be at least 1.")
+
+        if max_concurrency is None:
+            max_concurrency = workers * 2
+
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1.")
+
+        self.workers = workers
+        self.max_concurrency = max_concurrency
+        self.max_bytes = max_bytes
+        self.parse_timeout = timeout
+        self.quiet = quiet
+
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.in_flight = 0
+        self.counts = {
+            "processed": 0,
+            "skipped": 0,
+            "error": 0,
+            "rejected": 0,
+            "timeout": 0,
+        }
+
+        super().__init__(address, ParseRequestHandler)
+
+        try:
+            self.start_pool()
+        except BaseException:
+            super().server_close()
+            raise
+
+    def start_pool(self):
+        """Start the worker processes and wait until they are all up."""
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+
+        for future in [
+            self.pool.submit(warm_up)
+            for _ in range(self.workers)
+        ]:
+            future.result()
+
+    def count(self, key):
+        with self.lock:
+            self.counts[key] += 1
+
+    def parse(self, body, filename):
+        """
+        Parse body in the pool; returns (HTTP status, payload).
+
+        At most max_concurrency parses run or wait in the pool at once;
+        requests beyond that are turned away at once.
+        """
+        if not self.slots.acquire(blocking=False):
+            self.count("rejected")
+            return HTTPStatus.SERVICE_UNAVAILABLE, {
+                "error": "The service is busy; retry shortly."
+            }
+
+        with self.lock:
+            self.in_flight += 1
+
+        pool = self.pool
+
+        try:
+            future = pool.submit(parse_document, body, filename)
+
+        except BrokenProcessPool:
+            self.release_slot()
+            return self.restart_pool(pool)
+
+        # The slot is held until the worker is done, not until the
+        # request gives up on it
+        future.add_done_callback(lambda future: self.release_slot())
+
+        try:
+            result = future.result(timeout=self.parse_timeout)
+
+        except FutureTimeoutError:
+            # Only a parse that has not started yet can be cancelled
+            future.cancel()
+            self.count("timeout")
+            return HTTPStatus.GATEWAY_TIMEOUT, {
+                "error": f"Parsing took longer than "
+                         f"{self.parse_timeout:g} seconds."
+            }
+
+        except BrokenProcessPool:
+            return self.restart_pool(pool)
+
+        self.count(result["status"])
+
+        if result["status"] == "processed":
+            return HTTPStatus.OK, result
+
+        return HTTPStatus.UNPROCESSABLE_ENTITY, result
+
+    def release_slot(self):
+        with self.lock:
+            self.in_flight -= 1
+
+        self.slots.release()
+
+    def restart_pool(self, pool):
+        """Replace a pool broken by a dead worker (out of memory, killed)."""
+        with self.lock:
+            if self.pool is pool:
+                pool.shutdown(wait=False)
+                self.start_pool()
+
+        self.count("error")
+        return HTTPStatus.INTERNAL_SERVER_ERROR, {
+            "error": "A parser process failed; the pool was restarted."
+        }
+
+    def health(self):
+        with self.lock:
+            return {
+                "status": "ok",
+                "workers": self.workers,
+                "max_concurrency": self.max_concurrency,
+                "in_flight": self.in_flight,
+                "uptime_seconds": round(time.monotonic() - self.started, 1),
+                "requests": dict(self.counts),
+            }
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(cancel_futures=True)
+
+
+class ParseRequestHandler(BaseHTTPRequestHandler):
+
+    server_version = "Form990Parser/1.0"
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload, default=str).encode("utf-8")
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+
+        if status == HTTPStatus.SERVICE_UNAVAILABLE:
+            self.send_header("Retry-After", "1")
+
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if urlparse(self.path).path != "/health":
+            self.send_json(HTTPStatus.NOT_FOUND, {"error": "Not found."})
+            return
+
+        self.send_json(HTTPStatus.OK, self.server.health())
+
+    def do_POST(self):
+        url = urlparse(self.path)
+
+        if url.path != "/parse":
+            self.send_json(HTTPStatus.NOT_FOUND, {"error": "Not found."})
+            return
+
+        length = self.headers.get("Content-Length")
+
+        if length is None or not length.isdigit():
+            self.send_json(
+                HTTPStatus.LENGTH_REQUIRED,
+                {"error": "Send the XML with a Content-Length header."}
+            )
+            return
+
+        if int(length) > self.server.max_bytes:
+            # The body is not read, so the connection cannot be reused
+            self.close_connection = True
+            self.send_json(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                {"error": f"The body is over {self.server.max_bytes:,} bytes."}
+            )
+            return
+
+        body = self.rfile.read(int(length))
+
+        status, payload = self.server.parse(
+            body,
+            request_filename(url.query)
+        )
+
+        self.send_json(status, payload)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def make_server(
+    host=DEFAULT_HOST,
+    port=DEFAULT_PORT,
+    workers=None,
+    max_concurrency=None,
+    max_bytes=DEFAULT_MAX_BYTES,
+    timeout=DEFAULT_TIMEOUT,
+    quiet=False
+):
+    """
+    Start the worker pool and bind the server; call serve_forever() on
+    the result. Port 0 picks a free port (see server_address).
+    """
+    return ParseServer(
+        (host, port),
+        workers=workers,
+        max_concurrency=max_concurrency,
+        max_bytes=max_bytes,
+        timeout=timeout,
+        quiet=quiet
+    )
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    arg_parser.add_argument(
+        "--host",
+        default=DEFAULT_HOST,
+        help="Address to bind (default: %(default)s)"
+    )
+    arg_parser.add_argument(
+        "--port",
+        type=int,
+        default=DEFAULT_PORT,
+        help="Port to listen on (default: %(default)s)"
+    )
+    arg_parser.add_argument(
+        "--workers",
+        type=int,
+        help="Parser processes (default: one per CPU core)"
+    )
+    arg_parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        help="Parses running or queued at once before requests get a 503 "
+             "(default: twice the workers)"
+    )
+    arg_parser.add_argument(
+        "--max-bytes",
+        type=int,
+        default=DEFAULT_MAX_BYTES,
+        help="Largest request body in bytes (default: %(default)s)"
+    )
+    arg_parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        help="Seconds per parse before a 504 (default: %(default)s)"
+    )
+    arg_parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Do not log requests"
+    )
+    args = arg_parser.parse_args(argv)
+
+    server = make_server(
+        args.host,
+        args.port,
+        workers=args.workers,
+        max_concurrency=args.max_concurrency,
+        max_bytes=args.max_bytes,
+        timeout=args.timeout,
+        quiet=args.quiet
+    )
+
+    host, port = server.server_address[:2]
+    print(f"Parsing filings at http://{host}:{port}/parse "
+          f"with {server.workers} worker(s)")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,340 @@
+"""
+XML sources: files on disk and members of ZIP archives.
+
+A source is a string. A file on disk is its path; a member of a ZIP
+archive is ``"<archive path>::<member name>"``, for example
+``"data/2023_TEOS_XML_01A.zip::202301239349300000_public.xml"``. Members
+are streamed straight out of the archive into the parser, so the IRS bulk
+archives never have to be extracted.
+
+Every process keeps the archives it reads open, so the central directory
+of a large archive is read once per process rather than once per member.
+Open archives are keyed by process id: a worker forked after the parent
+opened an archive gets its own handle instead of sharing a file offset.
+
+Files and members may also be compressed one by one: ``*.xml.gz``,
+``*.xml.bz2`` and ``*.xml.zst`` are listed next to ``*.xml``. A source is
+decompressed as it is read, detected from its leading bytes rather than
+its name, so nothing is ever decompressed into memory or onto disk
+first. Zstandard needs the zstandard package; gzip and bzip2 are in the
+standard library.
+"""
+
+import bz2
+import gzip
+import hashlib
+import os
+import time
+import zipfile
+
+
+ARCHIVE_SEPARATOR = "::"
+
+ARCHIVE_EXTENSIONS = (".zip",)
+
+COMPRESSION_SUFFIXES = (".gz", ".bz2", ".zst")
+
+XML_EXTENSIONS = (".xml",) + tuple(
+    ".xml" + suffix for suffix in COMPRESSION_SUFFIXES
+)
+
+# Leading bytes of a compressed stream -> compression
+COMPRESSION_MAGIC = {
+    b"\x1f\x8b": "gzip",
+    b"BZh": "bz2",
+    b"\x28\xb5\x2f\xfd": "zstd",
+}
+
+# (archive path) -> (pid, size, mtime_ns, ZipFile)
+_open_archives = {}
+
+
+def is_archive(path):
+    return path.lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+def is_xml(path):
+    """True for *.xml files and their compressed forms."""
+    return path.lower().endswith(XML_EXTENSIONS)
+
+
+def plain_name(filename):
+    """A file name without its compression suffix, "a.xml.gz" -> "a.xml"."""
+    lower = filename.lower()
+
+    for suffix in COMPRESSION_SUFFIXES:
+        if lower.endswith(".xml" + suffix):
+            return filename[:-len(suffix)]
+
+    return filename
+
+
+def split_source(source):
+    """Return (path, member); member is None for a file on disk."""
+    path, separator, member = source.partition(ARCHIVE_SEPARATOR)
+
+    if not separator:
+        return source, None
+
+    return path, member
+
+
+def member_source(archive, member):
+    return f"{archive}{ARCHIVE_SEPARATOR}{member}"
+
+
+def open_archive(path):
+    """This process's open ZipFile for an archive, reopened if it changed."""
+    stat = os.stat(path)
+    entry = _open_archives.get(path)
+
+    if entry is not None:
+        pid, size, mtime_ns, archive = entry
+
+        if (
+            pid == os.getpid()
+            and size == stat.st_size
+            and mtime_ns == stat.st_mtime_ns
+        ):
+            return archive
+
+    archive = zipfile.ZipFile(path)
+    _open_archives[path] = (
+        os.getpid(),
+        stat.st_size,
+        stat.st_mtime_ns,
+        archive
+    )
+
+    return archive
+
+
+def archive_members(path, names=None):
+    """
+    XML members of an archive, as sources, sorted by file name.
+
+    With ``names`` (a set of lower-case file names) only members with
+    those names, compressed or not, are returned.
+    """
+    try:
+        archive = open_archive(path)
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"Not a readable ZIP archive:\n{path}") from e
+
+    members = [
+        info.filename
+        for info in archive.infolist()
+        if not info.is_dir()
+        and is_xml(info.filename)
+        and (
+            names is None
+            or plain_name(os.path.basename(info.filename)).lower() in names
+        )
+    ]
+
+    members.sort(key=lambda name: (os.path.basename(name).lower(), name))
+
+    return [member_source(path, member) for member in members]
+
+
+class DecompressedSource:
+    """A decompressing reader that also closes the stream it reads from."""
+
+    def __init__(self, reader, raw):
+        self.reader = reader
+        self.raw = raw
+
+    def read(self, size=-1):
+        return self.reader.read(size)
+
+    def close(self):
+        try:
+            self.reader.close()
+        finally:
+            self.raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def compression(raw):
+    """The compression of a stream, from its leading bytes, or None."""
+    head = raw.peek(4)[:4]
+
+    for magic, name in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return name
+
+    return None
+
+
+def zstd_reader(raw):
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError(
+            "Zstandard-compressed XML needs the zstandard package "
+            "(pip install zstandard)."
+        ) from e
+
+    return zstandard.ZstdDecompressor().stream_reader(raw)
+
+
+def open_source(source):
+    """
+    Open a source for binary reading.
+
+    Compressed sources are decompressed as they are read.
+    """
+    path, member = split_source(source)
+
+    if member is None:
+        raw = open(path, "rb")
+    else:
+        raw = open_archive(path).open(member)
+
+    try:
+        kind = compression(raw)
+
+        if kind is None:
+            return raw
+
+        if kind == "gzip":
+            reader = gzip.GzipFile(fileobj=raw)
+        elif kind == "bz2":
+            reader = bz2.BZ2File(raw)
+        else:
+            reader = zstd_reader(raw)
+
+    except BaseException:
+        raw.close()
+        raise
+
+    return DecompressedSource(reader, raw)
+
+
+def source_name(source):
+    """The file name shown in progress messages and processing errors."""
+    path, member = split_source(source)
+    return os.path.basename(member if member is not None else path)
+
+
+def source_key(source):
+    """A source with its file or archive path made absolute."""
+    path, member = split_source(source)
+    path = os.path.abspath(path)
+
+    if member is None:
+        return path
+
+    return member_source(path, member)
+
+
+def source_stat(source):
+    """
+    (size, mtime_ns) of a source.
+
+    For archive members these are the uncompressed size and the member's
+    own timestamp, so rewriting an archive does not invalidate members
+    that did not change.
+    """
+    path, member = split_source(source)
+
+    if member is None:
+        stat = os.stat(path)
+        return stat.st_size, stat.st_mtime_ns
+
+    info = open_archive(path).getinfo(member)
+    mtime = time.mktime(info.date_time + (0, 0, -1))
+
+    return info.file_size, int(mtime) * 1_000_000_000
+
+
+def source_size(source):
+    try:
+        return source_stat(source)[0]
+    except (OSError, KeyError):
+        return 0
+
+
+def source_sha256(source, chunk_size=1024 * 1024):
+    """Hash a source's decompressed bytes without reading them all at once."""
+    digest = hashlib.sha256()
+
+    with open_source(source) as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def find_sources(paths, names=None):
+    """
+    List the XML sources under one or more paths.
+
+    Each path may be a folder, a ZIP archive or a single XML file. A
+    folder contributes its *.xml files, compressed or not (sorted by
+    name), followed by the XML members of the archives in it; an archive
+    contributes its XML members. Paths are listed in the order given.
+
+    With ``names`` (a set of lower-case file names, see parser.index)
+    only sources with those file names are listed; nothing else is
+    opened.
+    """
+    def wanted(filename):
+        return names is None or plain_name(filename).lower() in names
+
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+
+    sources = []
+
+    for path in map(os.fspath, paths):
+
+        if os.path.isdir(path):
+            xml_files = []
+            archives = []
+
+            # Names are checked before anything is stat'ed, so a large
+            # folder costs one listing when only a few files are wanted
+            for filename in os.listdir(path):
+                if is_xml(filename):
+                    if not wanted(filename):
+                        continue
+                    found = xml_files
+                elif is_archive(filename):
+                    found = archives
+                else:
+                    continue
+
+                full_path = os.path.join(path, filename)
+
+                if os.path.isfile(full_path):
+                    found.append(full_path)
+
+            # Sort files alphabetically for predictable processing order
+            xml_files.sort(key=lambda x: os.path.basename(x).lower())
+            archives.sort(key=lambda x: os.path.basename(x).lower())
+
+            sources += xml_files
+
+            for archive in archives:
+                sources += archive_members(archive, names)
+
+        elif os.path.isfile(path) and is_archive(path):
+            sources += archive_members(path, names)
+
+        elif os.path.isfile(path) and is_xml(path):
+            if wanted(os.path.basename(path)):
+                sources.append(path)
+
+        else:
+            raise ValueError(
+                "The XML source folder does not exist or is not a folder "
+                f"or ZIP archive:\n{path}"
+            )
+
+    return sources
@@ -0,0 +1,375 @@
+"""
+SQLite output store.
+
+With ``output_format="sqlite"`` every output table is written to one
+database, ``form990.sqlite`` in the results folder, instead of one file
+per table. Each filing is a row of ``filings``, identified by EIN, tax
+year and return timestamp (``ReturnHeader/ReturnTs``); the rows of the
+other tables point at it through ``filing_id``. Storing a filing that is
+already in the database replaces its rows, so repeated and incremental
+runs update the database in place, and filings from earlier runs stay in
+it.
+
+Every table with an ``ein``, ``year`` or ``org_id`` column is indexed on
+it. Tables without an ``ein`` column are reached through ``filings``:
+
+    SELECT people.* FROM people JOIN filings USING (filing_id)
+    WHERE filings.ein = ?
+
+Filings are buffered and written in batches, one transaction per batch,
+with ``executemany`` for every table.
+"""
+
+import os
+import sqlite3
+
+import pandas as pd
+
+from parser.analytics import (
+    RATIO_COLUMNS,
+    add_financial_ratios,
+    build_financial_changes,
+    change_columns,
+)
+
+
+DATABASE_FILENAME = "form990.sqlite"
+
+DEFAULT_BATCH_SIZE = 500
+
+# filings columns after filing_id; (ein, year, return_ts) is the key
+FILING_COLUMNS = [
+    "ein",
+    "year",
+    "return_ts",
+    "return_version",
+    "org_id",
+    "org_name",
+    "source_file",
+]
+
+INDEXED_COLUMNS = ("ein", "year", "org_id")
+
+# Output table -> result entry holding its row (a dict) or rows (a list)
+RESULT_ENTRIES = {
+    "orgs": "org",
+    "financial": "financial",
+    "people": "people",
+    "top_compensation": "top_compensation",
+    "expense_detail": "expense_detail",
+    "revenue_detail": "revenue_detail",
+}
+
+TEXT_COLUMNS = {
+    "org_id",
+    "ein",
+    "org_name",
+    "return_ts",
+    "return_type",
+    "return_version",
+    "source_file",
+    "name",
+    "role",
+    "job_title",
+    "expense_category",
+    "category_level",
+    "revenue_category",
+    "business_code",
+    "type",
+}
+
+REAL_COLUMNS = set(RATIO_COLUMNS) | {
+    "share_of_total_expenses",
+    "program_services_share",
+    "share_of_total_revenue",
+}
+
+
+def database_path(results_dir):
+    return os.path.join(results_dir, DATABASE_FILENAME)
+
+
+def column_type(column):
+    """Declared SQLite type of an output column."""
+    if column in TEXT_COLUMNS:
+        return "TEXT"
+
+    if column in REAL_COLUMNS or column.endswith("_pct"):
+        return "REAL"
+
+    return "INTEGER"
+
+
+def column_definitions(columns):
+    return ", ".join(
+        f"{column} {column_type(column)}"
+        for column in columns
+    )
+
+
+class SQLiteStore:
+    """
+    Upsert parsed filings into a SQLite database.
+
+    ``tables`` maps each output table name to its columns. The financial
+    columns include the ratio columns, which are computed here for each
+    batch.
+    """
+
+    def __init__(self, path, tables, batch_size=DEFAULT_BATCH_SIZE):
+        self.path = path
+        self.tables = {name: list(columns) for name, columns in tables.items()}
+        self.batch_size = batch_size
+
+        self.created = not os.path.exists(path)
+        self.connection = sqlite3.connect(path)
+
+        self.pending = []
+        self.affected_orgs = set()
+        self.filings = 0
+
+        self.create_schema()
+
+    def create_schema(self):
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS filings ("
+                "filing_id INTEGER PRIMARY KEY, "
+                f"{column_definitions(FILING_COLUMNS)}, "
+                "UNIQUE (ein, year, return_ts))"
+            )
+            self.check_columns("filings", ["filing_id"] + FILING_COLUMNS)
+
+            for column in ("year", "org_id", "source_file"):
+                self.create_index("filings", column)
+
+            for name, columns in self.tables.items():
+                self.connection.execute(
+                    f"CREATE TABLE IF NOT EXISTS {name} ("
+                    "filing_id INTEGER NOT NULL "
+                    "REFERENCES filings (filing_id), "
+                    f"{column_definitions(columns)})"
+                )
+                self.check_columns(name, ["filing_id"] + columns)
+
+                self.create_index(name, "filing_id")
+
+                for column in INDEXED_COLUMNS:
+                    if column in columns:
+                        self.create_index(name, column)
+
+    def create_index(self, table, column):
+        self.connection.execute(
+            f"CREATE INDEX IF NOT EXISTS {table}_{column} "
+            f"ON {table} ({column})"
+        )
+
+    def table_columns(self, table):
+        return [
+            row[1]
+            for row in self.connection.execute(f"PRAGMA table_info({table})")
+        ]
+
+    def check_columns(self, table, columns):
+        existing = self.table_columns(table)
+
+        if existing != columns:
+            raise ValueError(
+                f"The {table} table in {self.path} has different columns "
+                "than this parser writes. Delete the database or choose "
+                "another results folder."
+            )
+
+    def add(self, result, source_file):
+        """Queue one processed filing; written with the next batch."""
+        self.pending.append((result, source_file))
+
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def upsert_filing(self, cursor, result, source_file):
+        """Insert or update a filings row and return its filing_id."""
+        org = result["org"]
+        key = (org["ein"], org["year"], result["return_ts"])
+
+        existing = cursor.execute(
+            "SELECT filing_id, org_name FROM filings "
+            "WHERE ein = ? AND year = ? AND return_ts = ?",
+            key
+        ).fetchone()
+
+        cursor.execute(
+            f"INSERT INTO filings ({', '.join(FILING_COLUMNS)}) "
+            f"VALUES ({', '.join('?' * len(FILING_COLUMNS))}) "
+            "ON CONFLICT (ein, year, return_ts) DO UPDATE SET "
+            + ", ".join(
+                f"{column} = excluded.{column}"
+                for column in FILING_COLUMNS[3:]
+            ),
+            key + (
+                result["return_version"],
+                org["org_id"],
+                org["org_name"],
+                source_file,
+            )
+        )
+
+        self.affected_orgs.add(org["org_name"])
+
+        if existing is None:
+            return cursor.lastrowid
+
+        self.affected_orgs.add(existing[1])
+
+        return existing[0]
+
+    def flush(self):
+        """Write the queued filings in one transaction."""
+        if not self.pending:
+            return
+
+        with self.connection:
+            cursor = self.connection.cursor()
+
+            # A filing seen twice in one batch keeps its last rows
+            by_filing = {}
+
+            for result, source_file in self.pending:
+                filing_id = self.upsert_filing(cursor, result, source_file)
+                by_filing.pop(filing_id, None)
+                by_filing[filing_id] = result
+
+            filing_ids = [(filing_id,) for filing_id in by_filing]
+
+            for name in self.tables:
+                cursor.executemany(
+                    f"DELETE FROM {name} WHERE filing_id = ?",
+                    filing_ids
+                )
+
+            ratio_rows = add_financial_ratios(
+                pd.DataFrame(
+                    [result["financial"] for result in by_filing.values()]
+                )
+            )[RATIO_COLUMNS].to_dict("records")
+
+            financial_rows = [
+                {**result["financial"], **ratios}
+                for result, ratios in zip(by_filing.values(), ratio_rows)
+            ]
+
+            for name, columns in self.tables.items():
+                rows = []
+
+                for index, (filing_id, result) in enumerate(by_filing.items()):
+                    if name == "financial":
+                        records = [financial_rows[index]]
+                    else:
+                        records = result[RESULT_ENTRIES[name]]
+
+                        if isinstance(records, dict):
+                            records = [records]
+
+                    rows.extend(
+                        [filing_id] + [record[column] for column in columns]
+                        for record in records
+                    )
+
+                cursor.executemany(
+                    f"INSERT INTO {name} (filing_id, {', '.join(columns)}) "
+                    f"VALUES ({', '.join('?' * (len(columns) + 1))})",
+                    rows
+                )
+
+        self.filings += len(self.pending)
+        self.pending = []
+
+    def remove_sources(self, source_files):
+        """Delete the filings last stored from the given source files."""
+        with self.connection:
+            cursor = self.connection.cursor()
+
+            for source_file in source_files:
+                rows = cursor.execute(
+                    "SELECT filing_id, org_name FROM filings "
+                    "WHERE source_file = ?",
+                    (source_file,)
+                ).fetchall()
+
+                for filing_id, org_name in rows:
+                    self.affected_orgs.add(org_name)
+
+                    for name in self.tables:
+                        cursor.execute(
+                            f"DELETE FROM {name} WHERE filing_id = ?",
+                            (filing_id,)
+                        )
+
+                    cursor.execute(
+                        "DELETE FROM filings WHERE filing_id = ?",
+                        (filing_id,)
+                    )
+
+    def update_financial_changes(self, windows):
+        """
+        Recompute financial_changes for the organizations touched so far.
+
+        The table is rebuilt from every stored filing when it does not
+        exist yet or was written with other change windows.
+        """
+        self.flush()
+
+        columns = change_columns(windows)
+        financial_columns = ", ".join(self.tables["financial"])
+
+        with self.connection:
+            cursor = self.connection.cursor()
+
+            if self.table_columns("financial_changes") != columns:
+                cursor.execute("DROP TABLE IF EXISTS financial_changes")
+                cursor.execute(
+                    "CREATE TABLE financial_changes "
+                    f"({column_definitions(columns)})"
+                )
+                self.create_index("financial_changes", "org_name")
+
+                query = f"SELECT {financial_columns} FROM financial"
+
+            else:
+                cursor.execute(
+                    "CREATE TEMP TABLE IF NOT EXISTS affected_orgs "
+                    "(org_name TEXT PRIMARY KEY)"
+                )
+                cursor.execute("DELETE FROM affected_orgs")
+                cursor.executemany(
+                    "INSERT OR IGNORE INTO affected_orgs VALUES (?)",
+                    [(org_name,) for org_name in self.affected_orgs]
+                )
+                cursor.execute(
+                    "DELETE FROM financial_changes WHERE org_name IN "
+                    "(SELECT org_name FROM affected_orgs)"
+                )
+
+                query = (
+                    f"SELECT {financial_columns} FROM financial "
+                    "WHERE org_name IN (SELECT org_name FROM affected_orgs)"
+                )
+
+            df_financial = pd.read_sql_query(
+                query + " ORDER BY org_name, year DESC, filing_id",
+                self.connection
+            )
+
+            df_changes = build_financial_changes(df_financial, windows)
+
+            if not df_changes.empty:
+                cursor.executemany(
+                    "INSERT INTO financial_changes "
+                    f"VALUES ({', '.join('?' * len(columns))})",
+                    df_changes[columns].itertuples(index=False, name=None)
+                )
+
+        self.affected_orgs = set()
+
+    def close(self):
+        self.connection.close()
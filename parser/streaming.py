@@ -0,0 +1,268 @@
+"""
+Bounded-memory output for streaming runs.
+
+In a streaming run no output table is held in memory. Each table is a
+``SortedCSVWriter``: rows are buffered up to ``chunk_rows``, sorted, and
+spilled to a temporary run file. ``finish()`` then merges the runs with
+``heapq.merge`` straight into the final CSV. Sorting is stable end to
+end (each run is sorted stably, runs are spilled in processing order and
+``heapq.merge`` prefers earlier runs on ties), so the files match what
+``DataFrame.sort_values`` produces in a normal run.
+
+Memory is bounded by ``chunk_rows`` per table rather than by the corpus.
+A buffered row is a dict of roughly 0.5-1 KB, so at the default of
+DEFAULT_CHUNK_ROWS a full buffer holds about 100-200 MB. A run has seven
+tables and each can be full at the same time, so the peak is around a
+gigabyte; run_990_parser(chunk_rows=...) lowers it, at the cost of more
+run files to write and merge.
+
+financial_changes.csv is built from the sorted financial.csv one group
+of organizations at a time. Summary cards are streamed to disk by
+parser.report, as in every run.
+"""
+
+import csv
+import heapq
+import os
+import pickle
+import shutil
+import tempfile
+from operator import itemgetter
+
+import pandas as pd
+
+from parser.analytics import add_financial_ratios, build_financial_changes
+
+
+DEFAULT_CHUNK_ROWS = 200_000
+
+# Records per pickle frame in a run file; bounds the merge's read buffer.
+RUN_FRAME_RECORDS = 1024
+
+
+def csv_value(value, is_float=False):
+    """Format one value the way DataFrame.to_csv writes it."""
+    if value is None:
+        return ""
+
+    if is_float:
+        value = float(value)
+
+        if value != value:
+            return ""
+
+        return repr(value)
+
+    return str(value)
+
+
+def write_run(records, directory):
+    """Spill sorted records to a run file; return its path."""
+    fd, path = tempfile.mkstemp(dir=directory, suffix=".run")
+
+    with os.fdopen(fd, "wb") as f:
+        for start in range(0, len(records), RUN_FRAME_RECORDS):
+            pickle.dump(
+                records[start:start + RUN_FRAME_RECORDS],
+                f,
+                pickle.HIGHEST_PROTOCOL
+            )
+
+    return path
+
+
+def read_run(path):
+    """Yield the records of a run file in order."""
+    with open(path, "rb") as f:
+        while True:
+            try:
+                frame = pickle.load(f)
+            except EOFError:
+                return
+
+            yield from frame
+
+
+class SortedCSVWriter:
+    """
+    Write a sorted CSV without holding the table in memory.
+
+    ``sort_key(row)`` orders the output; ``float_columns`` are always
+    written as floats, as pandas does for a float column. With
+    ``prepare_chunk``, every buffered chunk of row dicts is passed
+    through it before sorting (used to add computed columns).
+    """
+
+    def __init__(
+        self,
+        path,
+        columns,
+        sort_key,
+        float_columns=(),
+        prepare_chunk=None,
+        chunk_rows=DEFAULT_CHUNK_ROWS
+    ):
+        self.path = path
+        self.columns = list(columns)
+        self.sort_key = sort_key
+        self.float_flags = [
+            column in float_columns
+            for column in self.columns
+        ]
+        self.prepare_chunk = prepare_chunk
+        self.chunk_rows = chunk_rows
+
+        self.buffer = []
+        self.runs = []
+        self.run_dir = None
+        self.rows = 0
+
+    def __len__(self):
+        return self.rows
+
+    def append(self, row):
+        self.buffer.append(row)
+        self.rows += 1
+
+        if len(self.buffer) >= self.chunk_rows:
+            self.spill()
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def sorted_chunk(self):
+        rows = self.buffer
+        self.buffer = []
+
+        if self.prepare_chunk is not None:
+            rows = self.prepare_chunk(rows)
+
+        records = [
+            (
+                self.sort_key(row),
+                [
+                    csv_value(row[column], is_float)
+                    for column, is_float in zip(self.columns, self.float_flags)
+                ]
+            )
+            for row in rows
+        ]
+
+        records.sort(key=itemgetter(0))
+
+        return records
+
+    def spill(self):
+        if not self.buffer:
+            return
+
+        if self.run_dir is None:
+            self.run_dir = tempfile.mkdtemp(
+                prefix=".spill-",
+                dir=os.path.dirname(os.path.abspath(self.path))
+            )
+
+        self.runs.append(write_run(self.sorted_chunk(), self.run_dir))
+
+    def finish(self):
+        """Merge everything written so far into the output CSV."""
+        if self.runs:
+            self.spill()
+            sources = [read_run(path) for path in self.runs]
+            records = heapq.merge(*sources, key=itemgetter(0))
+        else:
+            records = self.sorted_chunk()
+
+        try:
+            with open(self.path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f, lineterminator=os.linesep)
+                writer.writerow(self.columns)
+
+                for _, values in records:
+                    writer.writerow(values)
+
+        finally:
+            self.close()
+
+        return self.path
+
+    def close(self):
+        """Remove the spilled runs."""
+        if self.run_dir is not None:
+            shutil.rmtree(self.run_dir, ignore_errors=True)
+            self.run_dir = None
+
+        self.runs = []
+
+
+def financial_chunk_with_ratios(financial_columns):
+    """A prepare_chunk that adds the ratio columns to financial rows."""
+
+    def prepare(rows):
+        df = pd.DataFrame(rows, columns=financial_columns)
+        return add_financial_ratios(df).to_dict("records")
+
+    return prepare
+
+
+def stream_financial_changes(
+    financial_csv,
+    financial_changes_csv,
+    windows,
+    chunk_rows=DEFAULT_CHUNK_ROWS
+):
+    """
+    Build financial_changes.csv from a financial.csv sorted by org_name.
+
+    The file is read in chunks; each chunk's last organization is held
+    back until its remaining rows arrive, so every organization is
+    computed from all of its filings.
+    """
+    carry = None
+    wrote_header = False
+
+    def write(df):
+        nonlocal wrote_header
+
+        changes = build_financial_changes(df, windows)
+
+        if changes.empty:
+            return
+
+        changes.to_csv(
+            financial_changes_csv,
+            mode="a" if wrote_header else "w",
+            header=not wrote_header,
+            index=False
+        )
+        wrote_header = True
+
+    reader = pd.read_csv(
+        financial_csv,
+        dtype={"org_name": str, "org_id": str, "ein": str},
+        keep_default_na=False,
+        float_precision="round_trip",
+        chunksize=chunk_rows
+    )
+
+    for chunk in reader:
+        if chunk.empty:
+            continue
+
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index=True)
+
+        last_org = chunk["org_name"].iloc[-1]
+        is_last = chunk["org_name"] == last_org
+
+        carry = chunk[is_last]
+        write(chunk[~is_last])
+
+    if carry is not None:
+        write(carry)
+
+    if not wrote_header:
+        pd.DataFrame().to_csv(financial_changes_csv, index=False)
+
+    return financial_changes_csv
@@ -0,0 +1,44 @@
+"""
+Row accumulators for the parser's output tables.
+
+Appending to a DataFrame one row at a time with ``df.loc[len(df)] = row``
+copies and re-indexes the frame on every insert, which makes a run
+quadratic in the number of rows. TableBuilder keeps one plain list per
+column instead, so each append is O(1), and builds the DataFrame once.
+"""
+
+import pandas as pd
+
+
+class TableBuilder:
+    """Collect rows column by column and build a DataFrame at the end."""
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.data = {column: [] for column in self.columns}
+        self._appenders = [self.data[column].append for column in self.columns]
+
+    def __len__(self):
+        return len(self.data[self.columns[0]]) if self.columns else 0
+
+    def append(self, row):
+        """Append one row given as a dict keyed by column or a sequence."""
+        if isinstance(row, dict):
+            for column, add in zip(self.columns, self._appenders):
+                add(row[column])
+        else:
+            if len(row) != len(self.columns):
+                raise ValueError(
+                    f"Expected {len(self.columns)} values, got {len(row)}"
+                )
+
+            for value, add in zip(row, self._appenders):
+                add(value)
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def to_frame(self):
+        """Build the DataFrame from the accumulated columns."""
+        return pd.DataFrame(self.data, columns=self.columns)
@@ -0,0 +1,780 @@
+"""
+Watch a folder and parse filings as they arrive.
+
+watch_folder keeps the outputs of a results folder up to date with an XML
+folder that another process, such as utilities.downloader, keeps adding
+to. It runs until it is stopped:
+
+    - New, changed and deleted files are noticed through file system
+      events when the watchdog package is installed (inotify on Linux),
+      and by scanning the folder every poll_seconds otherwise. With
+      events the folder is still rescanned every RESCAN_SECONDS in case
+      an event was missed.
+    - A file is parsed once its size and mtime have not changed for
+      settle_seconds, so files that are still being written are left
+      alone. ``*.part`` files, as written by the downloader, are never
+      picked up.
+    - The first run is an incremental run_990_parser run (see
+      parser.manifest), which parses whatever arrived since the outputs
+      were last written and rewrites them. After that, settled files are
+      parsed in batches and their rows added to the outputs in place
+      (see parser.batch), so a batch costs as much as its own files, not
+      the whole folder. A file whose contents did not change is not
+      parsed again. Files that settle while a batch is being parsed are
+      in the next one. Every batch is parsed in a process pool that
+      stays up between runs.
+    - In place means SQLite or CSV output. With CSV, a batch in which a
+      file changed or was deleted, and with Parquet or Arrow, every
+      batch, still goes through run_990_parser.
+    - Once every file has been deleted, the outputs are emptied
+      (see parser.batch.clear_outputs).
+
+A batch whose run fails is put back on the queue and retried after
+retry_seconds, together with whatever arrived in the meantime; the run
+after a failure is a full one. Until a file's rows are written it is
+listed in the failed_files of watch_status.json with the error.
+
+watch_status.json in the results folder is rewritten on every loop with
+the number of queued files and the latency from a file's arrival to the
+run that wrote its rows.
+
+Run from the repository root:
+
+    python -m parser.watch data/xml results --workers 4
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import queue
+import signal
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+from parser.analytics import DEFAULT_CHANGE_WINDOWS
+from parser.batch import UPDATABLE_FORMATS, clear_outputs, update_outputs
+from parser.cache import DEFAULT_MAX_BYTES as DEFAULT_CACHE_MAX_BYTES
+from parser.control import RunCancelled, RunControl
+from parser.manifest import file_signature, load_manifest, manifest_key
+from parser.outputs import OUTPUT_FORMATS
+from parser.parse_990 import EXTRACTOR_VERSION, find_xml_files, run_990_parser
+from parser.sources import is_archive, is_xml, split_source
+
+
+STATUS_FILENAME = "watch_status.json"
+
+DEFAULT_SETTLE_SECONDS = 2.0
+
+DEFAULT_POLL_SECONDS = 1.0
+
+DEFAULT_RETRY_SECONDS = 30.0
+
+# Full rescans when file system events are used
+RESCAN_SECONDS = 60.0
+
+# Arrivals kept for the latency figures in the status file
+LATENCY_WINDOW = 1000
+
+
+def status_path(results_dir):
+    return os.path.join(results_dir, STATUS_FILENAME)
+
+
+def is_watched(path):
+    return is_xml(path) or is_archive(path)
+
+
+def file_stat(path):
+    """(size, mtime_ns) of a file, or None if it is gone."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    return stat.st_size, stat.st_mtime_ns
+
+
+def source_order(paths):
+    """Files in the order find_sources lists a folder: XML, then archives."""
+    def by_name(path):
+        return os.path.basename(path).lower()
+
+    xml_files = sorted((path for path in paths if is_xml(path)), key=by_name)
+    archives = sorted((path for path in paths if is_archive(path)), key=by_name)
+
+    return xml_files + archives
+
+
+def list_folder(xml_dir):
+    """Paths of the XML files and archives directly in xml_dir."""
+    with os.scandir(xml_dir) as entries:
+        return [
+            os.path.abspath(entry.path)
+            for entry in entries
+            if entry.is_file() and is_watched(entry.name)
+        ]
+
+
+class ArrivalQueue:
+    """
+    Files of the watched folder and how far each has got.
+
+    Every file is in one of three places: ``pending`` while it may still
+    be written, ``ready`` once it has settled and until a run takes it,
+    and ``known`` with the stat it settled at.
+    """
+
+    def __init__(self, settle_seconds=DEFAULT_SETTLE_SECONDS):
+        self.settle_seconds = settle_seconds
+        self.known = {}
+        # path -> [stat, monotonic time of the last change, arrival]
+        self.pending = {}
+        # path -> arrival
+        self.ready = {}
+        self.deleted = False
+        # Monotonic time before which a failed batch is not retried
+        self.retry_at = 0.0
+
+    def depth(self):
+        return len(self.pending) + len(self.ready)
+
+    def touch(self, path):
+        """Note that path may have been added, changed or deleted."""
+        stat = file_stat(path)
+        now = time.monotonic()
+
+        if stat is None:
+            if self.known.pop(path, None) is not None:
+                self.deleted = True
+
+            self.pending.pop(path, None)
+            self.ready.pop(path, None)
+            return
+
+        entry = self.pending.get(path)
+
+        if entry is not None:
+            if entry[0] != stat:
+                entry[0] = stat
+                entry[1] = now
+            return
+
+        if self.known.get(path) == stat:
+            return
+
+        arrival = self.ready.pop(path, now)
+        self.pending[path] = [stat, now, arrival]
+
+        # Files written well before they were noticed are already settled
+        age = time.time() - stat[1] / 1e9
+
+        if age >= self.settle_seconds:
+            self.pending[path][1] = now - self.settle_seconds
+
+    def settle(self):
+        """Move the files that stopped changing from pending to ready."""
+        now = time.monotonic()
+
+        for path, (stat, changed, arrival) in list(self.pending.items()):
+            if now - changed < self.settle_seconds:
+                continue
+
+            current = file_stat(path)
+
+            if current is None:
+                del self.pending[path]
+                continue
+
+            if current != stat:
+                self.pending[path] = [current, now, arrival]
+                continue
+
+            del self.pending[path]
+            self.known[path] = stat
+            self.ready[path] = arrival
+
+    def seconds_to_settle(self):
+        """Seconds until the next pending file may settle, or None."""
+        if not self.pending:
+            return None
+
+        now = time.monotonic()
+
+        return max(
+            min(
+                changed + self.settle_seconds - now
+                for _, changed, _ in self.pending.values()
+            ),
+            0.0
+        )
+
+    def seconds_to_retry(self):
+        """Seconds until a failed batch may be retried, or None."""
+        if not (self.ready or self.deleted):
+            return None
+
+        return max(self.retry_at - time.monotonic(), 0.0)
+
+    def has_work(self):
+        return (
+            (bool(self.ready) or self.deleted)
+            and time.monotonic() >= self.retry_at
+        )
+
+    def take(self):
+        """The ready files with their arrival times; clears the queue."""
+        batch = self.ready
+        self.ready = {}
+        self.deleted = False
+        return batch
+
+    def retry(self, batch, deleted, delay):
+        """Put back a batch whose run failed, to be taken after delay."""
+        for path, arrival in batch.items():
+            # Files that are gone, or being written again, are not ready
+            if path in self.known and path not in self.pending:
+                self.ready[path] = arrival
+
+        self.deleted = self.deleted or deleted
+        self.retry_at = time.monotonic() + delay
+
+    def sources(self):
+        """Settled files in the order find_sources lists a folder."""
+        return source_order(self.known)
+
+
+class WatchStatus:
+    """The contents of watch_status.json."""
+
+    def __init__(self, xml_dir, results_dir, watcher):
+        self.path = status_path(results_dir)
+        self.xml_dir = os.path.abspath(xml_dir)
+        self.watcher = watcher
+        self.state = "starting"
+        self.runs = 0
+        self.files_parsed = 0
+        self.last_run = None
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        # path -> error of the last failed run that had it
+        self.failed = {}
+
+    def record_run(self, started, seconds, batch, finished, error=None):
+        self.runs += 1
+
+        self.last_run = {
+            "started": started,
+            "seconds": round(seconds, 3),
+            "files": len(batch),
+            "status": "failed" if error else "ok",
+        }
+
+        if error:
+            self.last_run["error"] = error
+            self.failed.update(dict.fromkeys(batch, error))
+            return
+
+        for path in batch:
+            self.failed.pop(path, None)
+
+        self.files_parsed += len(batch)
+        self.latencies.extend(finished - arrival for arrival in batch.values())
+
+    def as_dict(self, arrivals):
+        latencies = list(self.latencies)
+
+        return {
+            "state": self.state,
+            "watcher": self.watcher,
+            "xml_dir": self.xml_dir,
+            "updated": utc_now(),
+            "queue_depth": arrivals.depth(),
+            "settling": len(arrivals.pending),
+            "ready": len(arrivals.ready),
+            "files": len(arrivals.known),
+            "runs": self.runs,
+            "files_parsed": self.files_parsed,
+            "last_run": self.last_run,
+            "failed_files": [
+                {"path": path, "error": error}
+                for path, error in sorted(self.failed.items())
+            ],
+            "latency_seconds": {
+                "last": round(latencies[-1], 3),
+                "mean": round(sum(latencies) / len(latencies), 3),
+                "max": round(max(latencies), 3),
+            } if latencies else None,
+        }
+
+    def write(self, arrivals):
+        """Replace watch_status.json atomically."""
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(self.path),
+            suffix=".tmp"
+        )
+
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self.as_dict(arrivals), f, indent=2)
+
+            os.replace(tmp_path, self.path)
+
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+
+def utc_now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def start_observer(xml_dir, changes, wake):
+    """
+    Report file system events in xml_dir as paths on ``changes``.
+
+    Returns the running watchdog observer, or None when watchdog is not
+    installed.
+    """
+    try:
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+    except ImportError:
+        return None
+
+    class Handler(FileSystemEventHandler):
+
+        def on_any_event(self, event):
+            if event.is_directory:
+                return
+
+            for path in (event.src_path, getattr(event, "dest_path", "")):
+                if path and is_watched(os.fsdecode(path)):
+                    changes.put(os.path.abspath(os.fsdecode(path)))
+                    wake.set()
+
+    observer = Observer()
+    observer.schedule(Handler(), xml_dir, recursive=False)
+    observer.daemon = True
+    observer.start()
+
+    return observer
+
+
+def watch_folder(
+    xml_dir,
+    results_dir,
+    workers=1,
+    settle_seconds=DEFAULT_SETTLE_SECONDS,
+    poll_seconds=DEFAULT_POLL_SECONDS,
+    retry_seconds=DEFAULT_RETRY_SECONDS,
+    use_events=True,
+    cache_dir=None,
+    cache_max_bytes=DEFAULT_CACHE_MAX_BYTES,
+    output_format="csv",
+    change_windows=DEFAULT_CHANGE_WINDOWS,
+    progress_callback=None,
+    stop=None,
+    control=None
+):
+    """
+    Parse files as they arrive in xml_dir until ``stop`` is set.
+
+    Args:
+        xml_dir:
+            Folder to watch. Its XML files (compressed or not) and ZIP
+            archives are parsed, as by run_990_parser.
+
+        results_dir:
+            Folder for the outputs, the incremental manifest and
+            watch_status.json.
+
+        workers:
+            Processes in the parser pool, which is started once and
+            kept for every run. 1 parses in this process; None uses
+            every CPU core.
+
+        settle_seconds:
+            How long a file's size and mtime must stay the same before
+            it is parsed.
+
+        poll_seconds:
+            Seconds between folder scans without file system events, and
+            between status file updates.
+
+        retry_seconds:
+            How long to wait before a batch whose run failed is tried
+            again.
+
+        use_events:
+            Use file system events when watchdog is installed. False
+            always polls.
+
+        cache_dir, cache_max_bytes, output_format, change_windows:
+            Passed to run_990_parser.
+
+        progress_callback:
+            Optional function that receives status messages, including
+            those of every run.
+
+        stop:
+            Optional threading.Event; set it to stop watching.
+
+        control:
+            Optional parser.control.RunControl; cancelling it also
+            interrupts a run in progress.
+    """
+    def report(message):
+        print(message)
+
+        if progress_callback is not None:
+            progress_callback(message)
+
+    if settle_seconds < 0:
+        raise ValueError("settle_seconds must not be negative.")
+
+    if poll_seconds <= 0:
+        raise ValueError("poll_seconds must be positive.")
+
+    if retry_seconds < 0:
+        raise ValueError("retry_seconds must not be negative.")
+
+    if not os.path.isdir(xml_dir):
+        raise ValueError(
+            f"The XML source folder does not exist or is not a folder:\n"
+            f"{xml_dir}"
+        )
+
+    os.makedirs(results_dir, exist_ok=True)
+
+    if stop is None:
+        stop = threading.Event()
+
+    if control is None:
+        control = RunControl()
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    changes = queue.SimpleQueue()
+    wake = threading.Event()
+    arrivals = ArrivalQueue(settle_seconds)
+
+    observer = None
+
+    if use_events:
+        observer = start_observer(xml_dir, changes, wake)
+
+        if observer is None:
+            report(
+                "watchdog is not installed (pip install watchdog); "
+                f"polling every {poll_seconds:g} second(s)."
+            )
+
+    status = WatchStatus(
+        xml_dir,
+        results_dir,
+        type(observer).__name__ if observer is not None else "polling"
+    )
+
+    def scan():
+        for path in set(list_folder(xml_dir)) | set(arrivals.known):
+            arrivals.touch(path)
+
+    # Manifest key -> SHA-256 of every file in the outputs, or None
+    # until a run_990_parser run has (re)written them
+    stored = None
+
+    def full_run():
+        nonlocal stored
+
+        sources = arrivals.sources()
+
+        # run_990_parser needs at least one file
+        if not find_xml_files(sources):
+            clear_outputs(results_dir, output_format, change_windows)
+            stored = {}
+            report("No XML files are left; the outputs were emptied.")
+            return
+
+        run_990_parser(
+            sources,
+            results_dir,
+            progress_callback=progress_callback,
+            workers=workers,
+            cache_dir=cache_dir,
+            cache_max_bytes=cache_max_bytes,
+            incremental=True,
+            change_windows=change_windows,
+            output_format=output_format,
+            control=control,
+            open_browser=False,
+            executor=executor
+        )
+
+        stored = {
+            key: entry["sha256"]
+            for key, entry in load_manifest(
+                results_dir,
+                EXTRACTOR_VERSION
+            ).items()
+        }
+
+    def plan_batch(batch, deleted):
+        """
+        ({source: signature}, removed keys) of a batch for
+        update_outputs, or None when it needs a full run.
+        """
+        if stored is None or output_format not in UPDATABLE_FORMATS:
+            return None
+
+        files = {}
+        removed = []
+        batch_keys = set()
+
+        for source in find_xml_files(
+            source_order([path for path in batch if path in arrivals.known])
+        ):
+            key = manifest_key(source)
+            signature = file_signature(source)
+            batch_keys.add(key)
+
+            if stored.get(key) == signature["sha256"]:
+                continue
+
+            if key in stored:
+                removed.append(key)
+
+            files[source] = signature
+
+        # Deleted files, and members no longer in an archive that changed
+        if deleted or any(is_archive(path) for path in batch):
+            for key in stored:
+                path = split_source(key)[0]
+
+                if key not in batch_keys and (
+                    path in batch or path not in arrivals.known
+                ):
+                    removed.append(key)
+
+        if removed and output_format != "sqlite":
+            return None
+
+        return files, removed
+
+    def run(batch, deleted):
+        nonlocal stored
+
+        if batch:
+            report(
+                f"Updating outputs: {len(batch)} file(s) arrived or "
+                f"changed, {arrivals.depth()} still queued."
+            )
+        else:
+            report("Updating outputs: file(s) were deleted.")
+
+        started = utc_now()
+        start = time.monotonic()
+        error = None
+
+        try:
+            plan = plan_batch(batch, deleted)
+
+            if plan is None:
+                full_run()
+
+            elif any(plan):
+                files, removed = plan
+
+                update_outputs(
+                    results_dir,
+                    files,
+                    removed,
+                    workers=workers,
+                    cache_dir=cache_dir,
+                    cache_max_bytes=cache_max_bytes,
+                    output_format=output_format,
+                    change_windows=change_windows,
+                    progress_callback=progress_callback,
+                    control=control,
+                    executor=executor
+                )
+
+                for key in removed:
+                    del stored[key]
+
+                for source, signature in files.items():
+                    stored[manifest_key(source)] = signature["sha256"]
+
+        except RunCancelled:
+            raise
+
+        except Exception as e:
+            # The outputs may be half updated, so the retry is a full run:
+            # it rewrites them from the manifest, which does not have the
+            # batch yet
+            stored = None
+            error = repr(e)
+            arrivals.retry(batch, deleted, retry_seconds)
+            report(
+                f"Run failed: {error}; trying again in "
+                f"{retry_seconds:g} second(s)."
+            )
+
+        finished = time.monotonic()
+        status.record_run(started, finished - start, batch, finished, error)
+
+    report(f"Watching {os.path.abspath(xml_dir)} ({status.watcher})")
+
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers)
+    else:
+        pool = contextlib.nullcontext()
+
+    try:
+        with pool as executor:
+            scan()
+            last_scan = time.monotonic()
+
+            while not stop.is_set() and not control.cancelled:
+                while True:
+                    try:
+                        arrivals.touch(changes.get_nowait())
+                    except queue.Empty:
+                        break
+
+                rescan_every = (
+                    poll_seconds if observer is None else RESCAN_SECONDS
+                )
+
+                if time.monotonic() - last_scan >= rescan_every:
+                    scan()
+                    last_scan = time.monotonic()
+
+                arrivals.settle()
+
+                if arrivals.has_work():
+                    status.state = "parsing"
+                    status.write(arrivals)
+                    deleted = arrivals.deleted
+                    run(arrivals.take(), deleted)
+                    continue
+
+                status.state = "watching"
+                status.write(arrivals)
+
+                timeout = poll_seconds
+
+                for wait in (
+                    arrivals.seconds_to_settle(),
+                    arrivals.seconds_to_retry(),
+                ):
+                    if wait is not None:
+                        timeout = min(timeout, wait)
+
+                wake.wait(timeout)
+                wake.clear()
+
+    except RunCancelled:
+        report("Stopped during a run; its files are parsed on restart.")
+
+    finally:
+        if observer is not None:
+            observer.stop()
+            observer.join()
+
+        status.state = "stopped"
+        status.write(arrivals)
+
+    report("Stopped watching.")
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    arg_parser.add_argument("xml_dir", help="Folder to watch")
+    arg_parser.add_argument("results_dir", help="Results folder")
+    arg_parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Parser processes; 0 uses every CPU core (default: %(default)s)"
+    )
+    arg_parser.add_argument(
+        "--settle",
+        type=float,
+        default=DEFAULT_SETTLE_SECONDS,
+        help="Seconds a file must stay unchanged before it is parsed "
+             "(default: %(default)s)"
+    )
+    arg_parser.add_argument(
+        "--poll",
+        type=float,
+        default=DEFAULT_POLL_SECONDS,
+        help="Seconds between scans when polling (default: %(default)s)"
+    )
+    arg_parser.add_argument(
+        "--retry",
+        type=float,
+        default=DEFAULT_RETRY_SECONDS,
+        help="Seconds before a failed run is tried again "
+             "(default: %(default)s)"
+    )
+    arg_parser.add_argument(
+        "--polling",
+        action="store_true",
+        help="Poll even when watchdog is installed"
+    )
+    arg_parser.add_argument(
+        "--cache-dir",
+        help="Parse cache folder"
+    )
+    arg_parser.add_argument(
+        "--cache-max-bytes",
+        type=int,
+        default=DEFAULT_CACHE_MAX_BYTES,
+        help="Size cap of the parse cache in bytes (default: %(default)s)"
+    )
+    arg_parser.add_argument(
+        "--format",
+        default="csv",
+        choices=OUTPUT_FORMATS,
+        help="Output format of the tables (default: %(default)s)"
+    )
+    args = arg_parser.parse_args(argv)
+
+    stop = threading.Event()
+    control = RunControl()
+
+    def shut_down(signum, frame):
+        stop.set()
+        control.cancel()
+
+    signal.signal(signal.SIGINT, shut_down)
+    signal.signal(signal.SIGTERM, shut_down)
+
+    watch_folder(
+        args.xml_dir,
+        args.results_dir,
+        workers=args.workers or None,
+        settle_seconds=args.settle,
+        poll_seconds=args.poll,
+        retry_seconds=args.retry,
+        use_events=not args.polling,
+        cache_dir=args.cache_dir,
+        cache_max_bytes=args.cache_max_bytes,
+        output_format=args.format,
+        stop=stop,
+        control=control
+    )
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,15 @@
+"""
+Shared fixtures; the helpers they use are in tests.helpers.
+"""
+
+import pytest
+
+from tests.helpers import write_corpus
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    """A folder of six filings: two organizations, three years each."""
+    xml_dir = tmp_path / "xml"
+    write_corpus(xml_dir)
+    return xml_dir
@@ -0,0 +1,95 @@
+"""
+Helpers shared by the tests: small synthetic corpora (see
+benchmarks.generate_corpus), a run_990_parser that never opens a browser,
+and a comparable snapshot of a SQLite results database.
+"""
+
+import os
+import sqlite3
+
+from benchmarks.generate_corpus import PRESETS, generate_corpus
+from parser.parse_990 import run_990_parser
+from parser.sqlite_store import database_path
+
+
+SQLITE_TABLES = (
+    "orgs",
+    "financial",
+    "people",
+    "expense_detail",
+    "revenue_detail",
+)
+
+
+def write_corpus(xml_dir, files=6, orgs=2):
+    """Write ``files`` small filings of ``orgs`` organizations."""
+    sizes = dict(PRESETS["small"], files=files)
+    return generate_corpus(str(xml_dir), orgs=orgs, **sizes)
+
+
+def rewrite(path, old, new):
+    """
+    Replace text in a filing and move its mtime forward.
+
+    The new contents are renamed into place, so a watcher never sees a
+    half-written file.
+    """
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+
+    assert old in text
+
+    stat = os.stat(path)
+    tmp_path = f"{path}.part"
+
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text.replace(old, new))
+
+    os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    os.replace(tmp_path, path)
+
+
+def parse(xml_dir, results_dir, **kwargs):
+    return run_990_parser(
+        str(xml_dir),
+        str(results_dir),
+        open_browser=False,
+        **kwargs
+    )
+
+
+def snapshot(results_dir):
+    """Every table's rows without filing_id, so runs can be compared."""
+    with sqlite3.connect(database_path(str(results_dir))) as connection:
+        rows = {
+            "filings": sorted(
+                connection.execute(
+                    "SELECT ein, year, return_ts, source_file FROM filings"
+                )
+            ),
+            "financial_changes": sorted(
+                connection.execute("SELECT * FROM financial_changes"),
+                key=repr
+            ),
+        }
+
+        for table in SQLITE_TABLES:
+            columns = [
+                row[1]
+                for row in connection.execute(f"PRAGMA table_info({table})")
+                if row[1] != "filing_id"
+            ]
+            rows[table] = sorted(
+                connection.execute(
+                    f"SELECT {', '.join(columns)} FROM {table}"
+                ),
+                key=repr
+            )
+
+            orphans = connection.execute(
+                f"SELECT COUNT(*) FROM {table} WHERE filing_id NOT IN "
+                "(SELECT filing_id FROM filings)"
+            ).fetchone()[0]
+            assert orphans == 0, table
+
+    return rows
@@ -0,0 +1,100 @@
+import os
+
+import pytest
+
+import parser.cache
+from parser.cache import ENTRY_SUFFIX, ParseCache
+from tests.helpers import parse
+
+
+def entry_paths(cache_dir):
+    return sorted(
+        os.path.join(root, name)
+        for root, _, files in os.walk(cache_dir)
+        for name in files
+        if name.endswith(ENTRY_SUFFIX)
+    )
+
+
+def fill(cache, count):
+    """Put count entries, oldest first; return their keys."""
+    keys = []
+
+    for index in range(count):
+        key = cache.key(f"{index:064x}")
+        cache.put(key, {"status": "processed", "rows": list(range(100))})
+
+        os.utime(cache.path(key), (index, index))
+        keys.append(key)
+
+    return keys
+
+
+def test_prune_under_the_cap_does_not_walk(tmp_path, monkeypatch):
+    cache = ParseCache(str(tmp_path / "cache"), "1", max_bytes=10 ** 6)
+    fill(cache, 5)
+
+    # Every put is tracked
+    assert cache.tracked_size() == (
+        sum(map(os.path.getsize, entry_paths(cache.cache_dir))),
+        5
+    )
+
+    def no_walk(*args, **kwargs):
+        raise AssertionError("the cache directory was walked")
+
+    monkeypatch.setattr(parser.cache.os, "walk", no_walk)
+
+    assert cache.prune() == 0
+
+
+def test_prune_over_the_cap_evicts_the_oldest(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    keys = fill(ParseCache(cache_dir, "1"), 5)
+    entry_size = os.path.getsize(ParseCache(cache_dir, "1").path(keys[0]))
+
+    cache = ParseCache(cache_dir, "1", max_bytes=2 * entry_size)
+
+    assert cache.prune() == 3
+    assert entry_paths(cache_dir) == sorted(
+        cache.path(key) for key in keys[3:]
+    )
+
+    # The walk leaves the exact total behind
+    assert cache.tracked_size() == (2 * entry_size, 1)
+
+
+def test_cache_without_a_size_file_is_walked(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    fill(ParseCache(cache_dir, "1"), 3)
+    os.remove(os.path.join(cache_dir, parser.cache.SIZE_FILENAME))
+
+    cache = ParseCache(cache_dir, "1", max_bytes=0)
+
+    assert cache.prune() == 3
+    assert entry_paths(cache_dir) == []
+    assert cache.tracked_size() == (0, 1)
+
+
+def test_cache_max_bytes(corpus, tmp_path):
+    cache_dir = tmp_path / "cache"
+    messages = []
+
+    parse(
+        corpus,
+        tmp_path / "results",
+        cache_dir=str(cache_dir),
+        cache_max_bytes=0,
+        progress_callback=messages.append
+    )
+
+    assert "Parse cache: 0 hit(s), 6 parsed, 6 evicted" in messages
+    assert entry_paths(cache_dir) == []
+
+    with pytest.raises(ValueError, match="cache_max_bytes"):
+        parse(
+            corpus,
+            tmp_path / "results",
+            cache_dir=str(cache_dir),
+            cache_max_bytes=-1
+        )
@@ -0,0 +1,182 @@
+import filecmp
+import glob
+import os
+
+import pytest
+
+from parser.checkpoint import Checkpoint, checkpoint_path
+from parser.control import RunCancelled, RunControl
+from parser.parse_990 import (
+    EXTRACTOR_VERSION,
+    process_xml_file,
+    without_profile,
+)
+from tests.helpers import parse, rewrite
+
+
+TABLES = (
+    "orgs.csv",
+    "people.csv",
+    "top_compensation.csv",
+    "financial.csv",
+    "expense_detail.csv",
+    "revenue_detail.csv",
+    "financial_changes.csv",
+)
+
+
+class Stop(Exception):
+    pass
+
+
+def crash():
+    raise Stop
+
+
+def stop_after(files, action):
+    """A progress callback that calls action on file number files + 1."""
+    def progress(message):
+        if message.startswith(f"Processing file {files + 1}/"):
+            action()
+
+    return progress
+
+
+def assert_same_tables(results_dir, reference):
+    for name in TABLES:
+        assert filecmp.cmp(
+            results_dir / name,
+            reference / name,
+            shallow=False
+        ), name
+
+
+@pytest.fixture
+def reference(corpus, tmp_path):
+    results_dir = tmp_path / "reference"
+    parse(corpus, results_dir)
+    return results_dir
+
+
+def resume(corpus, results_dir):
+    messages = []
+    parse(
+        corpus,
+        results_dir,
+        checkpoint=True,
+        progress_callback=messages.append
+    )
+    return messages
+
+
+def test_cancelled_run_resumes(corpus, reference, tmp_path):
+    results_dir = tmp_path / "results"
+    control = RunControl()
+
+    # Cancelled once the third file has been parsed
+    with pytest.raises(RunCancelled):
+        parse(
+            corpus,
+            results_dir,
+            checkpoint=True,
+            control=control,
+            progress_callback=stop_after(2, control.cancel)
+        )
+
+    assert os.path.exists(checkpoint_path(results_dir))
+
+    messages = resume(corpus, results_dir)
+
+    assert (
+        "Resuming from checkpoint: 3 file(s) already parsed, 3 to go."
+        in messages
+    )
+    assert not os.path.exists(checkpoint_path(results_dir))
+    assert_same_tables(results_dir, reference)
+
+
+def test_changed_file_is_parsed_again(corpus, reference, tmp_path):
+    results_dir = tmp_path / "results"
+
+    with pytest.raises(Stop):
+        parse(
+            corpus,
+            results_dir,
+            checkpoint=True,
+            checkpoint_every=1,
+            progress_callback=stop_after(3, crash)
+        )
+
+    # Changed after it was checkpointed: its records are out of date
+    xml_file = sorted(glob.glob(os.path.join(corpus, "*.xml")))[0]
+    rewrite(xml_file, "<TaxYr>", "<TaxYr> ")
+
+    messages = resume(corpus, results_dir)
+
+    assert (
+        "Resuming from checkpoint: 2 file(s) already parsed, 4 to go."
+        in messages
+    )
+    assert_same_tables(results_dir, reference)
+
+
+def test_damaged_checkpoint_keeps_what_can_be_read(
+    corpus,
+    reference,
+    tmp_path
+):
+    results_dir = tmp_path / "results"
+
+    with pytest.raises(Stop):
+        parse(
+            corpus,
+            results_dir,
+            checkpoint=True,
+            checkpoint_every=1,
+            progress_callback=stop_after(3, crash)
+        )
+
+    # A crash just after a new member was started
+    with open(checkpoint_path(results_dir), "ab") as f:
+        f.write(b"\x1f\x8b\x08\x00" + bytes(20))
+
+    messages = resume(corpus, results_dir)
+
+    assert (
+        "Resuming from checkpoint: 3 file(s) already parsed, 3 to go."
+        in messages
+    )
+    assert_same_tables(results_dir, reference)
+
+
+def test_records_are_read_back_from_the_file(corpus, tmp_path):
+    results_dir = tmp_path / "results"
+
+    # Members of two, two and one file
+    with pytest.raises(Stop):
+        parse(
+            corpus,
+            results_dir,
+            checkpoint=True,
+            checkpoint_every=2,
+            progress_callback=stop_after(5, crash)
+        )
+
+    xml_files = sorted(glob.glob(os.path.join(corpus, "*.xml")))
+    checkpoint = Checkpoint(str(results_dir), EXTRACTOR_VERSION, every=2)
+
+    # Only signatures are held in memory
+    assert len(checkpoint.entries) == 5
+    assert all(
+        all(isinstance(value, int) for value in entry)
+        for entry in checkpoint.entries.values()
+    )
+
+    resumed = checkpoint.resumable(xml_files)
+    assert resumed == set(xml_files[:5])
+
+    # In any order, across members
+    for index in (4, 0, 3, 1, 2):
+        assert checkpoint.result(xml_files[index]) == without_profile(
+            process_xml_file(xml_files[index])
+        )
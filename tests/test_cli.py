@@ -0,0 +1,199 @@
+import json
+import sqlite3
+
+import pytest
+
+import parser.outputs
+from parser.__main__ import (
+    EXIT_FAILED,
+    EXIT_FILE_ERRORS,
+    EXIT_OK,
+    EXIT_USAGE,
+    main,
+)
+from parser.sqlite_store import database_path
+from tests.helpers import rewrite
+
+
+def run_cli(capsys, *args):
+    exit_code = main([str(arg) for arg in args] + ["--no-open", "--quiet"])
+    summary = json.loads(capsys.readouterr().out)
+
+    assert summary["exit_code"] == exit_code
+
+    return summary
+
+
+def test_clean_run(corpus, tmp_path, capsys):
+    summary = run_cli(capsys, corpus, "-o", tmp_path / "results")
+
+    assert summary["status"] == "ok"
+    assert summary["exit_code"] == EXIT_OK
+    assert (summary["files"], summary["processed"]) == (6, 6)
+    assert "financial_csv" in summary["outputs"]
+
+
+def test_files_with_errors(corpus, tmp_path, capsys):
+    # A tax year that is not a number fails the extraction
+    rewrite(
+        sorted(corpus.glob("*.xml"))[0],
+        "<TaxYr>2016</TaxYr>",
+        "<TaxYr></TaxYr>"
+    )
+
+    summary = run_cli(capsys, corpus, "-o", tmp_path / "results")
+
+    assert summary["status"] == "file_errors"
+    assert summary["exit_code"] == EXIT_FILE_ERRORS
+    assert summary["errors"] == 1
+
+
+@pytest.mark.parametrize(
+    "extra",
+    [
+        ["--streaming", "--format", "sqlite"],
+        ["--streaming", "--incremental"],
+        ["--workers", "-1"],
+        ["--checkpoint-every", "0"],
+        ["--streaming", "--chunk-rows", "0"],
+        ["--change-windows", "monthly"],
+        ["--partition-by-year"],
+        ["--ein", "12-3456789"],
+    ]
+)
+def test_bad_arguments(corpus, tmp_path, capsys, extra):
+    results_dir = tmp_path / "results"
+    summary = run_cli(capsys, corpus, "-o", results_dir, *extra)
+
+    assert summary["status"] == "invalid_arguments"
+    assert summary["exit_code"] == EXIT_USAGE
+    assert not results_dir.exists()
+
+
+def test_no_xml_files(tmp_path, capsys):
+    (tmp_path / "empty").mkdir()
+
+    summary = run_cli(capsys, tmp_path / "empty", "-o", tmp_path / "results")
+
+    assert summary["exit_code"] == EXIT_USAGE
+
+
+def test_missing_pyarrow_is_a_usage_error(
+    corpus,
+    tmp_path,
+    capsys,
+    monkeypatch
+):
+    def load_pyarrow():
+        raise ImportError("Parquet and Arrow output need the pyarrow package")
+
+    monkeypatch.setattr(parser.outputs, "load_pyarrow", load_pyarrow)
+
+    summary = run_cli(
+        capsys,
+        corpus,
+        "-o", tmp_path / "results",
+        "--format", "parquet"
+    )
+
+    assert summary["exit_code"] == EXIT_USAGE
+    assert "pyarrow" in summary["message"]
+
+
+def test_error_during_run_is_a_failure(corpus, tmp_path, capsys):
+    results_dir = tmp_path / "results"
+    results_dir.mkdir()
+
+    # A database written by something else: a ValueError mid-run
+    with sqlite3.connect(database_path(str(results_dir))) as connection:
+        connection.execute("CREATE TABLE people (name TEXT)")
+
+    summary = run_cli(
+        capsys,
+        corpus,
+        "-o", results_dir,
+        "--format", "sqlite"
+    )
+
+    assert summary["status"] == "failed"
+    assert summary["exit_code"] == EXIT_FAILED
+    assert "ValueError" in summary["message"]
+
+
+def write_index(path, rows):
+    """An IRS index CSV of (object id, EIN, tax period, return type)."""
+    lines = ["RETURN_ID,EIN,TAX_PERIOD,RETURN_TYPE,OBJECT_ID"]
+
+    for object_id, ein, tax_period, return_type in rows:
+        lines.append(f"1,{ein},{tax_period},{return_type},{object_id}")
+
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def test_index_selection(corpus, tmp_path, capsys):
+    index_path = tmp_path / "index.csv"
+    write_index(
+        index_path,
+        [
+            ("0000000", "100000000", "201612", "990"),
+            ("0000001", "200000000", "201612", "990"),
+            ("0000002", "100000000", "201512", "990"),
+        ]
+    )
+
+    summary = run_cli(
+        capsys,
+        corpus,
+        "-o", tmp_path / "results",
+        "--index", index_path,
+        "--tax-year", "2016"
+    )
+
+    assert summary["status"] == "ok"
+    assert (summary["files"], summary["processed"]) == (2, 2)
+
+
+def test_index_selection_that_matches_nothing(corpus, tmp_path, capsys):
+    index_path = tmp_path / "index.csv"
+    write_index(index_path, [("0000000", "100000000", "201612", "990")])
+
+    results_dir = tmp_path / "results"
+    summary = run_cli(
+        capsys,
+        corpus,
+        "-o", results_dir,
+        "--index", index_path,
+        "--return-type", "990PF"
+    )
+
+    assert summary["status"] == "invalid_arguments"
+    assert summary["exit_code"] == EXIT_USAGE
+    assert not results_dir.exists()
+
+
+@pytest.mark.parametrize("return_type", ["990-EZ", "990ez", "990EZ"])
+def test_index_return_types_are_normalized(
+    corpus,
+    tmp_path,
+    capsys,
+    return_type
+):
+    index_path = tmp_path / "index.csv"
+    write_index(
+        index_path,
+        [
+            ("0000000", "100000000", "201612", "990EZ"),
+            ("0000001", "200000000", "201612", "990-EZ"),
+            ("0000002", "100000000", "201512", "990"),
+        ]
+    )
+
+    summary = run_cli(
+        capsys,
+        corpus,
+        "-o", tmp_path / "results",
+        "--index", index_path,
+        "--return-type", return_type
+    )
+
+    assert summary["files"] == 2
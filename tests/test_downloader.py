@@ -0,0 +1,224 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utilities.downloader import (
+    PART_SUFFIX,
+    VALIDATOR_SUFFIX,
+    download_xml_files,
+)
+
+
+BODY = b"<Return>" + b"x" * 200_000 + b"</Return>"
+CHANGED_BODY = b"<Return>" + b"z" * 150_000 + b"</Return>"
+
+
+class Handler(BaseHTTPRequestHandler):
+    """
+    Serves BODY with ETag "v1" at every path, honouring If-Range and
+    misbehaving as the path says:
+
+        /flaky.xml      503 on the first request
+        /truncated.xml  the first response ends halfway through
+        /changed.xml    as /truncated.xml, then CHANGED_BODY with ETag "v2"
+        /stale.xml      416 to any Range request
+        /missing.xml    404
+        /down.xml       always 500
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+
+        with server.lock:
+            server.requests.setdefault(self.path, []).append(
+                self.headers.get("Range")
+            )
+            server.if_ranges.setdefault(self.path, []).append(
+                self.headers.get("If-Range")
+            )
+            attempt = len(server.requests[self.path])
+
+        if self.path == "/missing.xml":
+            return self.send_status(404)
+
+        if self.path == "/down.xml":
+            return self.send_status(500)
+
+        if self.path == "/flaky.xml" and attempt == 1:
+            return self.send_status(503, {"Retry-After": "0"})
+
+        body, etag = BODY, '"v1"'
+
+        if self.path == "/changed.xml" and attempt > 1:
+            body, etag = CHANGED_BODY, '"v2"'
+
+        range_header = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+
+        # A Range request under an outdated validator gets the whole file
+        if range_header and if_range is not None and if_range != etag:
+            range_header = None
+
+        if range_header:
+            if self.path == "/stale.xml":
+                return self.send_status(416)
+
+            start = int(range_header.split("=")[1].rstrip("-"))
+
+            self.send_response(206)
+            self.send_header("ETag", etag)
+            self.send_header(
+                "Content-Range",
+                f"bytes {start}-{len(body) - 1}/{len(body)}"
+            )
+            self.send_header("Content-Length", str(len(body) - start))
+            self.end_headers()
+            self.wfile.write(body[start:])
+            return
+
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+        if (
+            self.path in ("/truncated.xml", "/changed.xml")
+            and attempt == 1
+        ):
+            self.wfile.write(body[:len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+
+        self.wfile.write(body)
+
+    def send_status(self, status, headers=None):
+        self.send_response(status)
+
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.requests = {}
+    server.if_ranges = {}
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+def download(server, tmp_path, name, retries=2):
+    url = "http://127.0.0.1:%d/%s" % (server.server_address[1], name)
+
+    [result] = download_xml_files(
+        [url],
+        str(tmp_path),
+        workers=1,
+        retries=retries,
+        backoff=0,
+        timeout=5
+    )
+
+    return result
+
+
+def downloaded_bytes(tmp_path, name):
+    with open(tmp_path / name, "rb") as f:
+        return f.read()
+
+
+def test_server_error_is_retried(server, tmp_path):
+    result = download(server, tmp_path, "flaky.xml")
+
+    assert result["status"] == "downloaded"
+    assert result["attempts"] == 2
+    assert downloaded_bytes(tmp_path, "flaky.xml") == BODY
+
+
+def test_dropped_transfer_resumes_with_range(server, tmp_path):
+    result = download(server, tmp_path, "truncated.xml")
+
+    assert result["status"] == "downloaded"
+    assert result["attempts"] == 2
+    assert downloaded_bytes(tmp_path, "truncated.xml") == BODY
+    assert not os.path.exists(tmp_path / ("truncated.xml" + PART_SUFFIX))
+
+    first, second = server.requests["/truncated.xml"]
+
+    assert first is None
+    assert second is not None and second != "bytes=0-"
+    assert server.if_ranges["/truncated.xml"] == [None, '"v1"']
+
+    # Only the missing part was fetched again
+    assert 0 < result["bytes"] < len(BODY)
+    assert not os.path.exists(
+        tmp_path / ("truncated.xml" + PART_SUFFIX + VALIDATOR_SUFFIX)
+    )
+
+
+def test_changed_file_is_downloaded_again_whole(server, tmp_path):
+    result = download(server, tmp_path, "changed.xml")
+
+    assert result["status"] == "downloaded"
+    assert result["attempts"] == 2
+    assert server.if_ranges["/changed.xml"] == [None, '"v1"']
+
+    # The new file, not the old half with the new file's tail
+    assert downloaded_bytes(tmp_path, "changed.xml") == CHANGED_BODY
+    assert sorted(os.listdir(tmp_path)) == ["changed.xml"]
+
+
+def test_stale_partial_file_is_discarded_on_416(server, tmp_path):
+    with open(tmp_path / ("stale.xml" + PART_SUFFIX), "wb") as f:
+        f.write(b"y" * (len(BODY) + 10))
+
+    result = download(server, tmp_path, "stale.xml")
+
+    assert result["status"] == "downloaded"
+    assert result["attempts"] == 2
+    assert server.requests["/stale.xml"] == [f"bytes={len(BODY) + 10}-", None]
+    assert downloaded_bytes(tmp_path, "stale.xml") == BODY
+
+
+def test_client_error_is_not_retried(server, tmp_path):
+    result = download(server, tmp_path, "missing.xml")
+
+    assert result["status"] == "failed"
+    assert result["attempts"] == 1
+    assert not os.path.exists(tmp_path / "missing.xml")
+
+
+def test_retries_are_limited(server, tmp_path):
+    result = download(server, tmp_path, "down.xml", retries=2)
+
+    assert result["status"] == "failed"
+    assert result["attempts"] == 3
+    assert result["error"] == "HTTP 500"
+
+
+def test_existing_files_are_not_downloaded_again(server, tmp_path):
+    (tmp_path / "flaky.xml").write_bytes(b"already here")
+
+    result = download(server, tmp_path, "flaky.xml")
+
+    assert result["status"] == "exists"
+    assert "/flaky.xml" not in server.requests
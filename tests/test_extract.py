@@ -0,0 +1,31 @@
+import filecmp
+import os
+
+import pytest
+
+from tests.helpers import parse
+
+
+# Hand-written filings with the cases the extractor has to get right:
+# several Part VII rows (board members, an institutional trustee, people
+# with no name or title), empty amounts, program-service revenue and
+# expense groups with no description, groups with only some of their
+# amounts, and a filing with no groups at all. The expected tables were
+# written by the BeautifulSoup extractor this one replaced.
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data", "extract")
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+@pytest.mark.parametrize(
+    "table",
+    ["people", "financial", "expense_detail", "revenue_detail"]
+)
+def test_tables_match_the_expected_csv(tmp_path, table, streaming):
+    results_dir = tmp_path / "results"
+    parse(DATA_DIR, results_dir, streaming=streaming)
+
+    assert filecmp.cmp(
+        results_dir / f"{table}.csv",
+        os.path.join(DATA_DIR, "expected", f"{table}.csv"),
+        shallow=False
+    )
@@ -0,0 +1,103 @@
+import io
+
+import pytest
+
+from parser.extract import extract_filing
+from parser.fields import SCHEMA_FIELDS, compile_fields
+
+
+def filing(version, form_body, other_document=""):
+    """A minimal Form 990, with form_body inside IRS990."""
+    return io.BytesIO(
+        f"""<?xml version="1.0" encoding="utf-8"?>
+<Return xmlns="http://www.irs.gov/efile" returnVersion="{version}">
+  <ReturnHeader>
+    <Filer>
+      <EIN>500000009</EIN>
+      <BusinessName><BusinessNameLine1Txt>FIELD TEST</BusinessNameLine1Txt></BusinessName>
+    </Filer>
+    <TaxYr>2014</TaxYr>
+  </ReturnHeader>
+  <ReturnData>
+    {other_document}
+    <IRS990>{form_body}</IRS990>
+  </ReturnData>
+</Return>""".encode("utf-8")
+    )
+
+
+def lookup(compiled, path):
+    node = compiled.root
+
+    for step in path.split("/"):
+        node = node.children[step]
+
+    return node.column
+
+
+@pytest.mark.parametrize("return_type", sorted(SCHEMA_FIELDS))
+def test_versions_from_2013_use_the_registry(return_type):
+    compiled = compile_fields("2013v3.0", return_type)
+
+    assert compiled.mode == "registry"
+    assert compiled.return_type == return_type
+    assert lookup(compiled, "ReturnHeader/TaxYr") == "year"
+
+    # Compiled once per return type and version
+    assert compile_fields("2013v3.0", return_type) is compiled
+
+
+@pytest.mark.parametrize("version", ["2012v1.0", "", "unknown"])
+def test_other_versions_fall_back_to_scoped_tag_search(version):
+    compiled = compile_fields(version)
+
+    assert compiled.mode == "fallback"
+    assert compiled.root is None
+    assert compiled.scopes[None]["TotalEmployeeCnt"] == "employees"
+    assert compiled.scopes["IRS990"]["CYContributionsGrantsAmt"] == (
+        "contributions_grants"
+    )
+    assert compiled.scopes["NoDonorRestrictionNetAssetsGrp"]["EOYAmt"] == (
+        "unrestricted_net_assets"
+    )
+
+
+def test_registry_reads_only_the_mapped_path():
+    extracted = extract_filing(
+        filing(
+            "2019v5.1",
+            "<SomeGrp><TotalEmployeeCnt>7</TotalEmployeeCnt></SomeGrp>"
+            "<TotalEmployeeCnt>12</TotalEmployeeCnt>"
+            "<CYContributionsGrantsAmt>500</CYContributionsGrantsAmt>"
+        )
+    )
+
+    assert extracted.field_map.mode == "registry"
+    assert extracted.values["employees"] == "12"
+    assert extracted.values["contributions_grants"] == "500"
+    assert extracted.values["year"] == "2014"
+
+
+def test_fallback_finds_the_first_tag_in_its_scope():
+    extracted = extract_filing(
+        filing(
+            "2010v3.2",
+            "<SomeGrp><TotalEmployeeCnt>7</TotalEmployeeCnt></SomeGrp>"
+            "<TotalEmployeeCnt>12</TotalEmployeeCnt>"
+            "<CYContributionsGrantsAmt>500</CYContributionsGrantsAmt>",
+            other_document=(
+                "<IRS990ScheduleA>"
+                "<CYContributionsGrantsAmt>1</CYContributionsGrantsAmt>"
+                "</IRS990ScheduleA>"
+            )
+        )
+    )
+
+    assert extracted.field_map.mode == "fallback"
+
+    # Anywhere in the document: the first one wins
+    assert extracted.values["employees"] == "7"
+
+    # Only inside IRS990: the schedule's element is not used
+    assert extracted.values["contributions_grants"] == "500"
+    assert extracted.values["year"] == "2014"
@@ -0,0 +1,90 @@
+import filecmp
+import glob
+import os
+import shutil
+
+from parser.manifest import MANIFEST_FILENAME
+from tests.helpers import parse, rewrite, write_corpus
+
+
+OUTPUTS = (
+    "orgs.csv",
+    "people.csv",
+    "top_compensation.csv",
+    "financial.csv",
+    "financial_changes.csv",
+    "expense_detail.csv",
+    "revenue_detail.csv",
+    "field_coverage.csv",
+)
+
+
+def assert_same_outputs(results_dir, expected_dir):
+    for name in OUTPUTS:
+        assert filecmp.cmp(
+            os.path.join(results_dir, name),
+            os.path.join(expected_dir, name),
+            shallow=False
+        ), name
+
+
+def test_incremental_run_matches_full_run(corpus, tmp_path):
+    results_dir = tmp_path / "results"
+    parse(corpus, results_dir, incremental=True)
+
+    assert os.path.exists(results_dir / MANIFEST_FILENAME)
+
+    xml_files = sorted(glob.glob(os.path.join(corpus, "*.xml")))
+
+    # One changed, one deleted, one new file
+    rewrite(xml_files[1], "<TaxYr>", "<!-- edited --><TaxYr>")
+    rewrite(xml_files[2], "<CYTotalRevenueAmt>", "<CYTotalRevenueAmt>1")
+    os.remove(xml_files[3])
+
+    staging = write_corpus(tmp_path / "staging", files=7)
+    shutil.copy(staging[-1], corpus)
+
+    messages = []
+    parse(
+        corpus,
+        results_dir,
+        incremental=True,
+        progress_callback=messages.append
+    )
+
+    assert (
+        "Incremental run: 3 new or changed, 3 unchanged, 1 deleted file(s)."
+        in messages
+    )
+
+    full_dir = tmp_path / "full"
+    parse(corpus, full_dir)
+
+    assert_same_outputs(results_dir, full_dir)
+
+
+def test_unchanged_files_are_not_parsed_again(corpus, tmp_path):
+    results_dir = tmp_path / "results"
+    parse(corpus, results_dir, incremental=True)
+
+    # A new mtime alone is not a change
+    for xml_file in glob.glob(os.path.join(corpus, "*.xml")):
+        os.utime(xml_file, ns=(0, os.stat(xml_file).st_mtime_ns + 10 ** 9))
+
+    messages = []
+    parse(
+        corpus,
+        results_dir,
+        incremental=True,
+        progress_callback=messages.append
+    )
+
+    assert (
+        "Incremental run: 0 new or changed, 6 unchanged, 0 deleted file(s)."
+        in messages
+    )
+
+    full_dir = tmp_path / "full"
+    parse(corpus, full_dir)
+
+    assert_same_outputs(results_dir, full_dir)
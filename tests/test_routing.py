@@ -0,0 +1,159 @@
+import pandas as pd
+
+from tests.helpers import parse
+
+
+def write_filing(path, return_type_code, ein, name, form):
+    """A filing with the given ReturnTypeCd and ReturnData."""
+    path.write_text(
+        f"""<?xml version="1.0" encoding="utf-8"?>
+<Return xmlns="http://www.irs.gov/efile" returnVersion="2020v4.1">
+  <ReturnHeader>
+    <ReturnTs>2021-05-11T10:00:00-05:00</ReturnTs>
+    <ReturnTypeCd>{return_type_code}</ReturnTypeCd>
+    <Filer>
+      <EIN>{ein}</EIN>
+      <BusinessName>
+        <BusinessNameLine1Txt>{name}</BusinessNameLine1Txt>
+      </BusinessName>
+    </Filer>
+    <TaxYr>2020</TaxYr>
+  </ReturnHeader>
+  <ReturnData>{form}</ReturnData>
+</Return>""",
+        encoding="utf-8"
+    )
+
+
+EZ_FORM = """
+<IRS990EZ>
+  <ContributionsGiftsGrantsEtcAmt>40000</ContributionsGiftsGrantsEtcAmt>
+  <ProgramServiceRevenueAmt>8000</ProgramServiceRevenueAmt>
+  <TotalRevenueAmt>50000</TotalRevenueAmt>
+  <SalariesOtherCompEmplBnftAmt>20000</SalariesOtherCompEmplBnftAmt>
+  <TotalExpensesAmt>45000</TotalExpensesAmt>
+  <ExcessOrDeficitForYearAmt>5000</ExcessOrDeficitForYearAmt>
+  <NetAssetsOrFundBalancesEOYAmt>30000</NetAssetsOrFundBalancesEOYAmt>
+  <SumOfTotalLiabilitiesGrp>
+    <BOYAmt>1000</BOYAmt>
+    <EOYAmt>2000</EOYAmt>
+  </SumOfTotalLiabilitiesGrp>
+  <TotalProgramServiceExpensesAmt>36000</TotalProgramServiceExpensesAmt>
+  <OfficerDirectorTrusteeEmplGrp>
+    <PersonNm>dana lee</PersonNm>
+    <TitleTxt>president</TitleTxt>
+    <CompensationAmt>18000</CompensationAmt>
+    <EmployeeBenefitProgramAmt>1000</EmployeeBenefitProgramAmt>
+    <ExpenseAccountOtherAllwncAmt>500</ExpenseAccountOtherAllwncAmt>
+  </OfficerDirectorTrusteeEmplGrp>
+</IRS990EZ>
+"""
+
+PF_FORM = """
+<IRS990PF>
+  <AnalysisOfRevenueAndExpenses>
+    <ContriRcvdRevAndExpnssAmt>900000</ContriRcvdRevAndExpnssAmt>
+    <TotalRevAndExpnssAmt>1000000</TotalRevAndExpnssAmt>
+    <TotalExpensesRevAndExpnssAmt>400000</TotalExpensesRevAndExpnssAmt>
+    <ExcessRevenueOverExpensesAmt>600000</ExcessRevenueOverExpensesAmt>
+    <TotalExpensesDsbrsChrtblAmt>350000</TotalExpensesDsbrsChrtblAmt>
+  </AnalysisOfRevenueAndExpenses>
+  <Form990PFBalanceSheetsGrp>
+    <TotalLiabilitiesEOYAmt>10000</TotalLiabilitiesEOYAmt>
+    <TotNetAstOrFundBalancesEOYAmt>5000000</TotNetAstOrFundBalancesEOYAmt>
+  </Form990PFBalanceSheetsGrp>
+  <OfficerDirTrstKeyEmplInfoGrp>
+    <OfficerDirTrstKeyEmplGrp>
+      <PersonNm>eli park</PersonNm>
+      <TitleTxt>trustee</TitleTxt>
+      <CompensationAmt>0</CompensationAmt>
+    </OfficerDirTrstKeyEmplGrp>
+    <OfficerDirTrstKeyEmplGrp>
+      <PersonNm>fay cole</PersonNm>
+      <TitleTxt>director</TitleTxt>
+      <CompensationAmt>60000</CompensationAmt>
+      <EmployeeBenefitProgramAmt>4000</EmployeeBenefitProgramAmt>
+    </OfficerDirTrstKeyEmplGrp>
+  </OfficerDirTrstKeyEmplInfoGrp>
+</IRS990PF>
+"""
+
+
+def test_each_return_type_goes_to_its_extractor(corpus, tmp_path):
+    write_filing(
+        corpus / "ez.xml",
+        "990EZ",
+        "600000001",
+        "SMALL CLUB",
+        EZ_FORM
+    )
+    write_filing(
+        corpus / "pf.xml",
+        "990PF",
+        "600000002",
+        "CEDAR FOUNDATION",
+        PF_FORM
+    )
+    write_filing(
+        corpus / "990t.xml",
+        "990T",
+        "600000003",
+        "UNRELATED BUSINESS",
+        "<IRS990T/>"
+    )
+
+    messages = []
+    results_dir = tmp_path / "results"
+    parse(corpus, results_dir, progress_callback=messages.append)
+
+    assert (
+        "Routed to extractors: Form 990: 6, Form 990-EZ: 1, Form 990-PF: 1"
+        in messages
+    )
+
+    orgs = pd.read_csv(results_dir / "orgs.csv", dtype=str)
+    assert orgs["return_type"].value_counts().to_dict() == {
+        "990": 6,
+        "990EZ": 1,
+        "990PF": 1,
+    }
+
+    financial = pd.read_csv(
+        results_dir / "financial.csv",
+        dtype={"ein": str}
+    ).set_index("ein")
+
+    columns = [
+        "total_revenue",
+        "total_expenses",
+        "salaries",
+        "rev_minus_exp",
+        "assets",
+        "liabilities",
+        "program_expenses",
+    ]
+
+    assert financial.loc["600000001", columns].tolist() == [
+        50000, 45000, 20000, 5000, 30000, 2000, 36000
+    ]
+
+    # 990-PF has no salaries line
+    assert financial.loc["600000002", columns].tolist() == [
+        1000000, 400000, 0, 600000, 5000000, 10000, 350000
+    ]
+
+    people = pd.read_csv(results_dir / "people.csv")
+    people = people[people["role"] == "Officer/Director"]
+
+    assert people[
+        ["name", "role", "comp", "reportable_comp", "other_comp", "total_comp"]
+    ].values.tolist() == [
+        ["Eli Park", "Officer/Director", 0, 0, 0, 0],
+        ["Fay Cole", "Officer/Director", 60000, 0, 4000, 64000],
+        ["Dana Lee", "Officer/Director", 18000, 0, 1500, 19500],
+    ]
+
+    errors = pd.read_csv(results_dir / "processing_errors.csv")
+    assert errors[["filename", "error"]].values.tolist() == [
+        ["990t.xml", "Unsupported return type: 990T"]
+    ]
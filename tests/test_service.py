@@ -0,0 +1,140 @@
+import csv
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from benchmarks.generate_corpus import PRESETS, generate_corpus
+from parser.service import make_server
+from tests.helpers import parse
+
+
+@pytest.fixture
+def start_server():
+    servers = []
+
+    def start(**kwargs):
+        server = make_server(port=0, workers=1, quiet=True, **kwargs)
+        servers.append(server)
+
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        return server
+
+    yield start
+
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def request(server, path, body=None):
+    """(HTTP status, decoded JSON) of a GET, or a POST when body is given."""
+    url = "http://127.0.0.1:%d%s" % (server.server_address[1], path)
+
+    try:
+        with urllib.request.urlopen(url, data=body, timeout=30) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        with e:
+            return e.code, json.loads(e.read())
+
+
+def huge_filing(tmp_path):
+    """One filing large enough to take a noticeable time to parse."""
+    [xml_file] = generate_corpus(
+        str(tmp_path / "huge"),
+        **dict(PRESETS["huge"], files=1)
+    )
+
+    with open(xml_file, "rb") as f:
+        return f.read()
+
+
+def test_parse_matches_batch_run(start_server, corpus, tmp_path):
+    server = start_server()
+
+    results_dir = tmp_path / "results"
+    parse(corpus, results_dir)
+
+    with open(results_dir / "financial.csv", newline="") as f:
+        expected = list(csv.DictReader(f))
+
+    xml_file = sorted(corpus.glob("*.xml"))[0]
+    status, result = request(server, "/parse", xml_file.read_bytes())
+
+    assert status == 200
+    assert result["status"] == "processed"
+    assert result["error"] is None
+    assert {
+        column: "" if value is None else str(value)
+        for column, value in result["financial"].items()
+    } in expected
+
+
+def test_filing_that_cannot_be_parsed(start_server):
+    server = start_server()
+
+    status, result = request(
+        server,
+        "/parse?filename=../../bad.xml",
+        b"<NotAReturn/>"
+    )
+
+    assert status == 422
+    assert result["status"] == "skipped"
+    assert result["error"]["filename"] == "bad.xml"
+    assert result["error"]["file_path"] == "bad.xml"
+
+
+def test_body_over_max_bytes(start_server):
+    server = start_server(max_bytes=100)
+
+    status, result = request(server, "/parse", b"<Return>" + b"x" * 100)
+
+    assert status == 413
+    assert "100" in result["error"]
+
+
+def test_timed_out_parse_keeps_its_slot(start_server, tmp_path):
+    server = start_server(max_concurrency=1, timeout=0.05)
+    body = huge_filing(tmp_path)
+
+    status, _ = request(server, "/parse", body)
+    assert status == 504
+
+    # The parse is still running, so there is no room for another
+    status, _ = request(server, "/parse", b"<NotAReturn/>")
+    assert status == 503
+
+    status, health = request(server, "/health")
+    assert status == 200
+    assert health["in_flight"] == 1
+
+    deadline = time.monotonic() + 30
+
+    while health["in_flight"] and time.monotonic() < deadline:
+        time.sleep(0.05)
+        _, health = request(server, "/health")
+
+    assert health["in_flight"] == 0
+
+    status, _ = request(server, "/parse", b"<NotAReturn/>")
+    assert status == 422
+
+
+def test_health(start_server):
+    server = start_server(max_concurrency=3)
+
+    request(server, "/parse", b"<NotAReturn/>")
+    status, health = request(server, "/health")
+
+    assert status == 200
+    assert health["status"] == "ok"
+    assert (health["workers"], health["max_concurrency"]) == (1, 3)
+    assert health["in_flight"] == 0
+    assert health["requests"]["skipped"] == 1
@@ -0,0 +1,168 @@
+import bz2
+import filecmp
+import gzip
+import os
+import zipfile
+
+import pandas as pd
+import pytest
+
+from parser.sources import find_sources
+from tests.helpers import parse, write_corpus
+
+
+TABLES = (
+    "orgs.csv",
+    "people.csv",
+    "financial.csv",
+    "expense_detail.csv",
+    "revenue_detail.csv",
+    "financial_changes.csv",
+)
+
+
+@pytest.fixture
+def reference(corpus, tmp_path):
+    """The outputs of the six-filing corpus read from plain files."""
+    results_dir = tmp_path / "reference"
+    parse(corpus, results_dir)
+    return results_dir
+
+
+def assert_same_tables(results_dir, reference):
+    for name in TABLES:
+        assert filecmp.cmp(
+            results_dir / name,
+            reference / name,
+            shallow=False
+        ), name
+
+
+def test_archive_members_are_read_in_place(corpus, reference, tmp_path):
+    xml_dir = tmp_path / "mixed"
+    xml_dir.mkdir()
+
+    xml_files = sorted(corpus.glob("*.xml"))
+
+    # Two filings on disk, four in an archive with a folder inside it
+    for xml_file in xml_files[:2]:
+        (xml_dir / xml_file.name).write_bytes(xml_file.read_bytes())
+
+    with zipfile.ZipFile(xml_dir / "bulk.zip", "w") as archive:
+        for xml_file in xml_files[2:]:
+            archive.write(xml_file, f"2021/{xml_file.name}")
+
+        archive.writestr("2021/README.txt", "not a filing")
+        archive.writestr("2021/bad.xml", "<NotAReturn/>")
+
+    results_dir = tmp_path / "results"
+    parse(xml_dir, results_dir)
+
+    assert_same_tables(results_dir, reference)
+
+    errors = pd.read_csv(results_dir / "processing_errors.csv")
+    assert errors[["filename", "file_path"]].values.tolist() == [
+        ["bad.xml", f"{xml_dir / 'bulk.zip'}::2021/bad.xml"]
+    ]
+
+    # Nothing was extracted next to the archive
+    assert sorted(os.listdir(xml_dir)) == sorted(
+        [xml_file.name for xml_file in xml_files[:2]] + ["bulk.zip"]
+    )
+
+
+def test_archive_given_directly(corpus, reference, tmp_path):
+    archive_path = tmp_path / "bulk.zip"
+
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        for xml_file in sorted(corpus.glob("*.xml")):
+            archive.write(xml_file, xml_file.name)
+
+    results_dir = tmp_path / "results"
+    parse(archive_path, results_dir)
+
+    assert_same_tables(results_dir, reference)
+
+
+def test_changed_archive_member_is_parsed_again(tmp_path):
+    xml_files = write_corpus(tmp_path / "staging", files=7)
+    archive_path = tmp_path / "bulk.zip"
+
+    def write_archive(members):
+        with zipfile.ZipFile(archive_path, "w") as archive:
+            for member in members:
+                archive.write(member, os.path.basename(member))
+
+    write_archive(xml_files[:6])
+
+    results_dir = tmp_path / "results"
+    parse(archive_path, results_dir, incremental=True)
+
+    # The archive is rewritten with one more member
+    write_archive(xml_files)
+
+    messages = []
+    parse(
+        archive_path,
+        results_dir,
+        incremental=True,
+        progress_callback=messages.append
+    )
+
+    assert (
+        "Incremental run: 1 new or changed, 6 unchanged, 0 deleted file(s)."
+        in messages
+    )
+
+
+def test_compressed_files_are_read_by_their_leading_bytes(
+    corpus,
+    reference,
+    tmp_path
+):
+    zstandard = pytest.importorskip("zstandard")
+
+    xml_dir = tmp_path / "compressed"
+    xml_dir.mkdir()
+
+    xml_files = sorted(corpus.glob("*.xml"))
+    data = [xml_file.read_bytes() for xml_file in xml_files]
+
+    (xml_dir / f"{xml_files[0].name}.gz").write_bytes(gzip.compress(data[0]))
+    (xml_dir / f"{xml_files[1].name}.bz2").write_bytes(bz2.compress(data[1]))
+    (xml_dir / f"{xml_files[2].name}.zst").write_bytes(
+        zstandard.ZstdCompressor().compress(data[2])
+    )
+
+    # The name does not decide: gzip named .xml, plain XML named .xml.gz
+    (xml_dir / xml_files[3].name).write_bytes(gzip.compress(data[3]))
+    (xml_dir / f"{xml_files[4].name}.gz").write_bytes(data[4])
+
+    # A compressed member of an archive
+    with zipfile.ZipFile(xml_dir / "bulk.zip", "w") as archive:
+        archive.writestr(f"{xml_files[5].name}.bz2", bz2.compress(data[5]))
+
+    results_dir = tmp_path / "results"
+    parse(xml_dir, results_dir)
+
+    assert not (results_dir / "processing_errors.csv").exists()
+    assert_same_tables(results_dir, reference)
+
+    # Nothing was decompressed onto disk
+    assert len(os.listdir(xml_dir)) == 6
+
+
+def test_only_selected_files_are_looked_at(corpus, monkeypatch):
+    isfile = os.path.isfile
+    checked = []
+
+    def recording_isfile(path):
+        checked.append(os.path.basename(path))
+        return isfile(path)
+
+    monkeypatch.setattr(os.path, "isfile", recording_isfile)
+
+    sources = find_sources(corpus, {"0000003_public.xml"})
+
+    assert sources == [str(corpus / "0000003_public.xml")]
+    assert checked == ["0000003_public.xml"]
@@ -0,0 +1,54 @@
+import glob
+import os
+
+import pytest
+
+from tests.helpers import parse, rewrite, snapshot
+
+
+@pytest.mark.parametrize(
+    "old, new",
+    [
+        ("-05-11T10:00:00", "-06-30T09:30:00"),
+        ("<TaxYr>2016</TaxYr>", "<TaxYr>2015</TaxYr>"),
+    ],
+    ids=["return_ts", "tax_year"]
+)
+def test_incremental_replaces_filing_whose_key_changed(
+    corpus,
+    tmp_path,
+    old,
+    new
+):
+    results_dir = tmp_path / "results"
+    parse(corpus, results_dir, output_format="sqlite", incremental=True)
+
+    edited = sorted(glob.glob(os.path.join(corpus, "*.xml")))[0]
+    rewrite(edited, old, new)
+
+    parse(corpus, results_dir, output_format="sqlite", incremental=True)
+
+    rows = snapshot(results_dir)
+    sources = [row[3] for row in rows["filings"]]
+
+    assert len(sources) == len(set(sources)) == 6
+
+    # The same as a database built from scratch over the edited files
+    fresh_dir = tmp_path / "fresh"
+    parse(corpus, fresh_dir, output_format="sqlite", incremental=True)
+
+    assert rows == snapshot(fresh_dir)
+
+
+def test_incremental_drops_deleted_files(corpus, tmp_path):
+    results_dir = tmp_path / "results"
+    parse(corpus, results_dir, output_format="sqlite", incremental=True)
+
+    os.remove(sorted(glob.glob(os.path.join(corpus, "*.xml")))[-1])
+
+    parse(corpus, results_dir, output_format="sqlite", incremental=True)
+
+    fresh_dir = tmp_path / "fresh"
+    parse(corpus, fresh_dir, output_format="sqlite", incremental=True)
+
+    assert snapshot(results_dir) == snapshot(fresh_dir)
@@ -0,0 +1,53 @@
+import filecmp
+import os
+
+import pytest
+
+from tests.helpers import parse
+
+
+OUTPUTS = (
+    "orgs.csv",
+    "people.csv",
+    "top_compensation.csv",
+    "financial.csv",
+    "financial_changes.csv",
+    "expense_detail.csv",
+    "revenue_detail.csv",
+    "processing_errors.csv",
+)
+
+
+def test_streaming_matches_normal_run(corpus, tmp_path):
+    # Files that end up in processing_errors.csv, spread through the run
+    for name in ("0000000_a_bad.xml", "0000003_a_bad.xml", "zzz_bad.xml"):
+        (corpus / name).write_text("<NotAReturn/>", encoding="utf-8")
+
+    normal_dir = tmp_path / "normal"
+    parse(corpus, normal_dir)
+
+    # Spill every couple of rows so the merge is exercised
+    streaming_dir = tmp_path / "streaming"
+    parse(corpus, streaming_dir, streaming=True, chunk_rows=2)
+
+    for name in OUTPUTS:
+        assert filecmp.cmp(
+            os.path.join(normal_dir, name),
+            os.path.join(streaming_dir, name),
+            shallow=False
+        ), name
+
+    assert not [
+        name for name in os.listdir(streaming_dir)
+        if name.startswith(".spill-")
+    ]
+
+
+def test_streaming_rejects_incremental(corpus, tmp_path):
+    with pytest.raises(ValueError, match="incremental"):
+        parse(corpus, tmp_path / "results", streaming=True, incremental=True)
+
+
+def test_chunk_rows_must_be_positive(corpus, tmp_path):
+    with pytest.raises(ValueError, match="chunk_rows"):
+        parse(corpus, tmp_path / "results", streaming=True, chunk_rows=0)
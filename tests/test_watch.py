@@ -0,0 +1,381 @@
+import filecmp
+import glob
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import zipfile
+
+import pandas as pd
+import pytest
+
+import parser.watch
+from parser.manifest import load_manifest
+from parser.parse_990 import EXTRACTOR_VERSION
+from parser.watch import status_path, watch_folder
+from tests.helpers import parse, rewrite, snapshot, write_corpus
+
+
+TABLES = (
+    "orgs.csv",
+    "people.csv",
+    "top_compensation.csv",
+    "financial.csv",
+    "expense_detail.csv",
+    "revenue_detail.csv",
+)
+
+
+class Watcher:
+    """watch_folder in a thread, polling, with its messages kept."""
+
+    def __init__(self, xml_dir, results_dir, **kwargs):
+        self.messages = []
+        self.stop = threading.Event()
+        self.thread = threading.Thread(
+            target=watch_folder,
+            args=(str(xml_dir), str(results_dir)),
+            kwargs=dict(
+                settle_seconds=0,
+                poll_seconds=0.05,
+                use_events=False,
+                progress_callback=self.messages.append,
+                stop=self.stop,
+                **kwargs
+            ),
+            daemon=True
+        )
+        self.thread.start()
+
+    def count(self, prefix):
+        return sum(message.startswith(prefix) for message in self.messages)
+
+    def updated(self):
+        """(processed, skipped, errors) over every in-place update."""
+        totals = [0, 0, 0]
+
+        for message in self.messages:
+            match = re.match(
+                r"Updated outputs: (\d+) processed, (\d+) skipped, "
+                r"(\d+) with errors", message
+            )
+
+            if match:
+                for index, value in enumerate(match.groups()):
+                    totals[index] += int(value)
+
+        return tuple(totals)
+
+    def wait_until(self, condition, timeout=30):
+        deadline = time.monotonic() + timeout
+
+        while not condition():
+            assert time.monotonic() < deadline, self.messages
+            assert self.thread.is_alive(), self.messages
+            time.sleep(0.02)
+
+    def wait_for(self, prefix, count=1):
+        self.wait_until(lambda: self.count(prefix) >= count)
+
+    def close(self):
+        self.stop.set()
+        self.thread.join(30)
+
+
+@pytest.fixture
+def start_watcher():
+    watchers = []
+
+    def start(xml_dir, results_dir, **kwargs):
+        watcher = Watcher(xml_dir, results_dir, **kwargs)
+        watchers.append(watcher)
+        return watcher
+
+    yield start
+
+    for watcher in watchers:
+        watcher.close()
+
+
+def drop_in(source, xml_dir):
+    """Copy a file in the way the downloader does: write, then rename."""
+    target = os.path.join(xml_dir, os.path.basename(source))
+    shutil.copy(source, target + ".part")
+    os.replace(target + ".part", target)
+
+
+def sorted_lines(path):
+    with open(path, encoding="utf-8") as f:
+        header = f.readline()
+        return header, sorted(f)
+
+
+def test_new_files_are_appended(corpus, tmp_path, start_watcher):
+    results_dir = tmp_path / "results"
+    watcher = start_watcher(corpus, results_dir)
+    watcher.wait_for("PARSING COMPLETE")
+
+    # Two more filings of the same organizations, and one that is skipped
+    staging = write_corpus(tmp_path / "staging", files=8)
+
+    for source in staging[6:]:
+        drop_in(source, corpus)
+
+    (corpus / "zzz_bad.xml").write_text("<NotAReturn/>", encoding="utf-8")
+
+    watcher.wait_until(lambda: watcher.updated() == (2, 1, 0))
+    watcher.close()
+
+    assert watcher.count("PARSING COMPLETE") == 1
+
+    full_dir = tmp_path / "full"
+    parse(corpus, full_dir)
+
+    # The same rows as a full run; new rows follow the ones written before
+    for name in TABLES + ("processing_errors.csv",):
+        assert sorted_lines(results_dir / name) == (
+            sorted_lines(full_dir / name)
+        ), name
+
+    assert filecmp.cmp(
+        results_dir / "financial_changes.csv",
+        full_dir / "financial_changes.csv",
+        shallow=False
+    )
+
+    # The manifest journal has the new files: nothing is parsed again
+    messages = []
+    parse(
+        corpus,
+        results_dir,
+        incremental=True,
+        progress_callback=messages.append
+    )
+
+    assert (
+        "Incremental run: 0 new or changed, 9 unchanged, 0 deleted file(s)."
+        in messages
+    )
+
+    for name in TABLES + ("financial_changes.csv",):
+        assert filecmp.cmp(
+            results_dir / name,
+            full_dir / name,
+            shallow=False
+        ), name
+
+
+def test_sqlite_is_updated_in_place(corpus, tmp_path, start_watcher):
+    results_dir = tmp_path / "results"
+    watcher = start_watcher(corpus, results_dir, output_format="sqlite")
+    watcher.wait_for("PARSING COMPLETE")
+
+    xml_files = sorted(glob.glob(os.path.join(corpus, "*.xml")))
+
+    # One filing moves to another tax year, one is deleted, one is new
+    rewrite(xml_files[0], "<TaxYr>2016</TaxYr>", "<TaxYr>2015</TaxYr>")
+    os.remove(xml_files[3])
+    drop_in(write_corpus(tmp_path / "staging", files=7)[-1], corpus)
+
+    fresh_dir = tmp_path / "fresh"
+    parse(corpus, fresh_dir, output_format="sqlite", incremental=True)
+    expected = snapshot(fresh_dir)
+
+    watcher.wait_until(lambda: watcher.updated()[0] == 2)
+    watcher.wait_until(lambda: snapshot(results_dir) == expected)
+    watcher.close()
+
+    assert watcher.count("PARSING COMPLETE") == 1
+
+
+def test_sqlite_archive_members(corpus, tmp_path, start_watcher):
+    results_dir = tmp_path / "results"
+    watcher = start_watcher(corpus, results_dir, output_format="sqlite")
+    watcher.wait_for("PARSING COMPLETE")
+
+    staging = write_corpus(tmp_path / "staging", files=9)
+
+    def write_archive(members):
+        path = tmp_path / "bulk.zip"
+
+        with zipfile.ZipFile(path, "w") as archive:
+            for member in members:
+                archive.write(member, os.path.basename(member))
+
+        drop_in(path, corpus)
+
+    write_archive(staging[6:])
+    watcher.wait_until(lambda: watcher.updated()[0] == 3)
+
+    # The archive is replaced by one with a member fewer
+    write_archive(staging[6:8])
+
+    fresh_dir = tmp_path / "fresh"
+    parse(corpus, fresh_dir, output_format="sqlite", incremental=True)
+    expected = snapshot(fresh_dir)
+
+    watcher.wait_until(lambda: snapshot(results_dir) == expected)
+    watcher.close()
+
+    assert watcher.count("PARSING COMPLETE") == 1
+
+    # Members that did not change are not parsed again
+    assert watcher.updated()[0] == 3
+
+
+def test_changed_csv_file_rewrites_the_outputs(
+    corpus,
+    tmp_path,
+    start_watcher
+):
+    results_dir = tmp_path / "results"
+    watcher = start_watcher(corpus, results_dir)
+    watcher.wait_for("PARSING COMPLETE")
+
+    rewrite(
+        sorted(glob.glob(os.path.join(corpus, "*.xml")))[1],
+        "<CYTotalRevenueAmt>",
+        "<CYTotalRevenueAmt>1"
+    )
+
+    watcher.wait_for("PARSING COMPLETE", 2)
+    watcher.close()
+
+    full_dir = tmp_path / "full"
+    parse(corpus, full_dir)
+
+    for name in TABLES + ("financial_changes.csv",):
+        assert filecmp.cmp(
+            results_dir / name,
+            full_dir / name,
+            shallow=False
+        ), name
+
+
+def test_failed_batch_is_retried(corpus, tmp_path, start_watcher, monkeypatch):
+    update_outputs = parser.watch.update_outputs
+    calls = []
+
+    def fail_once(*args, **kwargs):
+        calls.append(args)
+
+        if len(calls) == 1:
+            raise OSError("No space left on device")
+
+        return update_outputs(*args, **kwargs)
+
+    monkeypatch.setattr(parser.watch, "update_outputs", fail_once)
+
+    results_dir = tmp_path / "results"
+    watcher = start_watcher(corpus, results_dir, retry_seconds=1)
+    watcher.wait_for("PARSING COMPLETE")
+
+    new_file = write_corpus(tmp_path / "staging", files=7)[-1]
+    drop_in(new_file, corpus)
+
+    def status():
+        with open(status_path(results_dir), encoding="utf-8") as f:
+            return json.load(f)
+
+    watcher.wait_until(lambda: status()["failed_files"])
+
+    failed = status()["failed_files"]
+
+    assert [entry["path"] for entry in failed] == [
+        os.path.join(corpus, os.path.basename(new_file))
+    ]
+    assert "No space left on device" in failed[0]["error"]
+
+    # The retry rewrites the outputs, which may be half updated
+    watcher.wait_for("PARSING COMPLETE", 2)
+    watcher.wait_until(lambda: not status()["failed_files"])
+    watcher.close()
+
+    assert status()["last_run"]["status"] == "ok"
+
+    full_dir = tmp_path / "full"
+    parse(corpus, full_dir)
+
+    for name in TABLES + ("financial_changes.csv",):
+        assert filecmp.cmp(
+            results_dir / name,
+            full_dir / name,
+            shallow=False
+        ), name
+
+
+def read_tables(results_dir, output_format):
+    """Every output table as a DataFrame, or the SQLite snapshot."""
+    if output_format == "sqlite":
+        return snapshot(results_dir)
+
+    read = pd.read_csv if output_format == "csv" else pd.read_parquet
+
+    return {
+        name: read(results_dir / name.replace(".csv", f".{output_format}"))
+        for name in TABLES + ("financial_changes.csv",)
+    }
+
+
+@pytest.mark.parametrize("output_format", ["csv", "parquet", "sqlite"])
+def test_deleting_every_file_empties_the_outputs(
+    corpus,
+    tmp_path,
+    start_watcher,
+    output_format
+):
+    results_dir = tmp_path / "results"
+    watcher = start_watcher(
+        corpus,
+        results_dir,
+        output_format=output_format
+    )
+    watcher.wait_for("PARSING COMPLETE")
+
+    before = read_tables(results_dir, output_format)
+
+    for xml_file in glob.glob(os.path.join(corpus, "*.xml")):
+        os.remove(xml_file)
+
+    watcher.wait_until(
+        lambda: not load_manifest(str(results_dir), EXTRACTOR_VERSION)
+    )
+
+    after = read_tables(results_dir, output_format)
+
+    for name, table in after.items():
+        assert len(before[name]) > 0, name
+        assert len(table) == 0, name
+
+        if output_format != "sqlite":
+            assert list(table.columns) == list(before[name].columns), name
+
+    # The watcher keeps going: a filing that arrives later is parsed
+    new_file = write_corpus(tmp_path / "staging", files=7)[-1]
+    drop_in(new_file, corpus)
+
+    watcher.wait_until(
+        lambda: len(load_manifest(str(results_dir), EXTRACTOR_VERSION)) == 1
+    )
+    watcher.close()
+
+    assert not watcher.count("Run failed:")
+
+    full_dir = tmp_path / "full"
+    parse(corpus, full_dir, output_format=output_format, incremental=True)
+
+    if output_format == "csv":
+        for name in TABLES + ("financial_changes.csv",):
+            assert sorted_lines(results_dir / name) == (
+                sorted_lines(full_dir / name)
+            ), name
+    else:
+        expected = read_tables(full_dir, output_format)
+
+        for name, table in read_tables(results_dir, output_format).items():
+            if output_format == "sqlite":
+                assert table == expected[name], name
+            else:
+                pd.testing.assert_frame_equal(table, expected[name])
@@ -0,0 +1,443 @@
+"""
+Bulk download of Form 990 XML files.
+
+Reads a CSV of XML links in the format the README describes (a "source"
+header line, then one link per line) and downloads every file into the
+folder run_990_parser reads; find_xml_files picks up each *.xml file
+there.
+
+All downloads share one requests.Session from prep_request(), so
+connections are pooled and kept alive. The pool is sized to the number
+of worker threads, which is also the concurrency limit. Connection
+errors, timeouts and 429/5xx responses are retried with exponential
+backoff (a Retry-After header is honoured). Bytes go to
+``<name>.xml.part`` and the file is renamed once it is complete, so the
+parser never sees a partial file; an interrupted download resumes from
+the partial file with a Range request when the server supports it. The
+ETag or Last-Modified date of the response the partial file came from is
+kept in ``<name>.xml.part.validator`` and sent as If-Range, so a file
+that changed on the server in the meantime comes back whole instead of
+being appended to the old bytes.
+
+Links are fetched exactly as given, so a local HTTP server can stand in
+for the real host.
+
+Run from the repository root:
+
+    python -m utilities.downloader links.csv data/xml --workers 8
+"""
+
+import argparse
+import csv
+import hashlib
+import os
+import random
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utilities.helpers import prep_request
+
+
+DEFAULT_WORKERS = 8
+DEFAULT_RETRIES = 4
+DEFAULT_BACKOFF = 1.0
+DEFAULT_TIMEOUT = 60
+CHUNK_SIZE = 64 * 1024
+
+PART_SUFFIX = ".part"
+
+# Next to the partial file: the validator it was downloaded under
+VALIDATOR_SUFFIX = ".validator"
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class RetryableError(Exception):
+    """A failed attempt that is worth repeating."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def read_source_csv(csv_path):
+    """
+    Return the links in a source CSV, in order and without duplicates.
+
+    The "source" header line is optional; blank lines are ignored.
+    """
+    urls = []
+    seen = set()
+
+    with open(csv_path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.reader(f):
+            url = row[0].strip() if row else ""
+
+            if not url or url.lower() == "source":
+                continue
+
+            if url not in seen:
+                seen.add(url)
+                urls.append(url)
+
+    return urls
+
+
+def target_filename(url):
+    """
+    Local file name for a link.
+
+    Links that end in a file name keep it; ProPublica's download-xml
+    links are named after their object_id. Anything else gets a name
+    derived from a hash of the link.
+    """
+    parsed = urlparse(url)
+    basename = os.path.basename(parsed.path)
+
+    if basename.lower().endswith(".xml"):
+        return basename
+
+    object_id = parse_qs(parsed.query).get("object_id")
+
+    if object_id and re.fullmatch(r"[0-9A-Za-z_-]+", object_id[0]):
+        return f"{object_id[0]}_public.xml"
+
+    digest = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+
+    return f"{digest}.xml"
+
+
+def plan_downloads(urls):
+    """Map each link to a distinct file name."""
+    plan = []
+    used = set()
+
+    for url in urls:
+        filename = target_filename(url)
+
+        if filename.lower() in used:
+            digest = hashlib.sha1(url.encode("utf-8")).hexdigest()[:8]
+            stem, extension = os.path.splitext(filename)
+            filename = f"{stem}_{digest}{extension}"
+
+        used.add(filename.lower())
+        plan.append((url, filename))
+
+    return plan
+
+
+def pooled_session(workers):
+    """A prep_request() session with one pooled connection per worker."""
+    session = prep_request()
+
+    adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    return session
+
+
+def retry_after_seconds(response):
+    value = response.headers.get("Retry-After", "")
+    return float(value) if value.isdigit() else None
+
+
+def response_validator(response):
+    """
+    The response's strong ETag, or its Last-Modified date, for If-Range;
+    None when it has neither. Weak ETags cannot be used in If-Range.
+    """
+    etag = response.headers.get("ETag", "")
+
+    if etag and not etag.startswith("W/"):
+        return etag
+
+    return response.headers.get("Last-Modified") or None
+
+
+def read_validator(validator_path):
+    try:
+        with open(validator_path, encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def write_validator(validator_path, validator):
+    """Keep the validator of a new partial file, or remove a stale one."""
+    if validator is None:
+        remove_file(validator_path)
+        return
+
+    with open(validator_path, "w", encoding="utf-8") as f:
+        f.write(validator)
+
+
+def remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def fetch_once(session, url, path, timeout):
+    """
+    One download attempt into ``path + ".part"``; return bytes received.
+
+    Resumes from an existing partial file, with If-Range when its
+    validator is known. Raises RetryableError for failures worth retrying
+    and requests.HTTPError for the rest.
+    """
+    part_path = path + PART_SUFFIX
+    validator_path = part_path + VALIDATOR_SUFFIX
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+
+    # Byte ranges only make sense on the unencoded body
+    headers = {"Accept-Encoding": "identity"}
+
+    if offset:
+        headers["Range"] = f"bytes={offset}-"
+
+        validator = read_validator(validator_path)
+
+        if validator is not None:
+            headers["If-Range"] = validator
+
+    try:
+        with session.get(
+            url,
+            headers=headers,
+            stream=True,
+            timeout=timeout
+        ) as response:
+
+            if response.status_code == 416 and offset:
+                # The partial file does not fit the current file; start over
+                os.remove(part_path)
+                remove_file(validator_path)
+                raise RetryableError("stale partial download")
+
+            if response.status_code in RETRY_STATUSES:
+                raise RetryableError(
+                    f"HTTP {response.status_code}",
+                    retry_after_seconds(response)
+                )
+
+            response.raise_for_status()
+
+            # A 200 to a Range request is the whole file again, either
+            # because ranges are not supported or because it changed
+            if response.status_code == 206:
+                mode = "ab"
+            else:
+                mode = "wb"
+                write_validator(validator_path, response_validator(response))
+
+            received = 0
+
+            with open(part_path, mode) as f:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    f.write(chunk)
+                    received += len(chunk)
+
+    except (
+        requests.ConnectionError,
+        requests.Timeout,
+        requests.exceptions.ChunkedEncodingError
+    ) as e:
+        raise RetryableError(str(e)) from e
+
+    os.replace(part_path, path)
+    remove_file(validator_path)
+
+    return received
+
+
+def download_file(
+    session,
+    url,
+    path,
+    retries=DEFAULT_RETRIES,
+    backoff=DEFAULT_BACKOFF,
+    timeout=DEFAULT_TIMEOUT
+):
+    """
+    Download one link to ``path``, retrying with exponential backoff.
+
+    Returns a result row: url, path, status ("downloaded", "exists" or
+    "failed"), bytes, attempts and error.
+    """
+    result = {
+        "url": url,
+        "path": path,
+        "status": "exists",
+        "bytes": 0,
+        "attempts": 0,
+        "error": "",
+    }
+
+    if os.path.exists(path):
+        return result
+
+    while True:
+        result["attempts"] += 1
+
+        try:
+            result["bytes"] += fetch_once(session, url, path, timeout)
+            result["status"] = "downloaded"
+            return result
+
+        except RetryableError as e:
+            if result["attempts"] > retries:
+                result["status"] = "failed"
+                result["error"] = str(e)
+                return result
+
+            delay = e.retry_after
+            if delay is None:
+                delay = backoff * 2 ** (result["attempts"] - 1)
+                delay += random.uniform(0, backoff)
+
+            time.sleep(delay)
+
+        except (requests.RequestException, OSError) as e:
+            result["status"] = "failed"
+            result["error"] = str(e)
+            return result
+
+
+def download_xml_files(
+    urls,
+    xml_dir,
+    workers=DEFAULT_WORKERS,
+    retries=DEFAULT_RETRIES,
+    backoff=DEFAULT_BACKOFF,
+    timeout=DEFAULT_TIMEOUT,
+    session=None,
+    progress_callback=None
+):
+    """
+    Download every link into xml_dir, ``workers`` at a time.
+
+    Files already in xml_dir are not downloaded again. Returns one
+    result row per link, in input order (see download_file).
+    """
+
+    def report(message):
+        print(message)
+
+        if progress_callback is not None:
+            progress_callback(message)
+
+    if workers < 1:
+        raise ValueError("workers must be at least 1.")
+
+    os.makedirs(xml_dir, exist_ok=True)
+
+    if session is None:
+        session = pooled_session(workers)
+
+    plan = plan_downloads(urls)
+    done = 0
+
+    def fetch(item):
+        url, filename = item
+        return download_file(
+            session,
+            url,
+            os.path.join(xml_dir, filename),
+            retries=retries,
+            backoff=backoff,
+            timeout=timeout
+        )
+
+    results = []
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for result in executor.map(fetch, plan):
+            done += 1
+            results.append(result)
+
+            message = (
+                f"Download {done}/{len(plan)}: "
+                f"{os.path.basename(result['path'])} {result['status']}"
+            )
+
+            if result["error"]:
+                message += f" ({result['error']})"
+
+            report(message)
+
+    counts = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+
+    report(
+        f"Downloaded {counts.get('downloaded', 0)}, "
+        f"already present {counts.get('exists', 0)}, "
+        f"failed {counts.get('failed', 0)}."
+    )
+
+    return results
+
+
+def download_from_csv(csv_path, xml_dir, **kwargs):
+    """Download every link in a source CSV; see download_xml_files."""
+    urls = read_source_csv(csv_path)
+
+    if not urls:
+        raise ValueError(f"No links were found in {csv_path}.")
+
+    return download_xml_files(urls, xml_dir, **kwargs)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    arg_parser.add_argument("csv_path", help="CSV of XML links")
+    arg_parser.add_argument("xml_dir", help="Folder to download into")
+    arg_parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Concurrent downloads (default: %(default)s)"
+    )
+    arg_parser.add_argument(
+        "--retries",
+        type=int,
+        default=DEFAULT_RETRIES,
+        help="Retries per file (default: %(default)s)"
+    )
+    arg_parser.add_argument(
+        "--backoff",
+        type=float,
+        default=DEFAULT_BACKOFF,
+        help="First retry delay in seconds, doubled each retry "
+             "(default: %(default)s)"
+    )
+    arg_parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        help="Connect/read timeout in seconds (default: %(default)s)"
+    )
+    args = arg_parser.parse_args(argv)
+
+    results = download_from_csv(
+        args.csv_path,
+        args.xml_dir,
+        workers=args.workers,
+        retries=args.retries,
+        backoff=args.backoff,
+        timeout=args.timeout
+    )
+
+    return 1 if any(r["status"] == "failed" for r in results) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())